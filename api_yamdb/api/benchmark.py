@@ -0,0 +1,416 @@
+"""Данные и сценарии нагрузочного прогона API (команда benchmark_api)."""
+import io
+import json
+import math
+import time
+from urllib.parse import urlsplit
+from wsgiref.util import setup_testing_defaults
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from reviews.models import Category, Comment, Genre, GenreTitle, Review, Title
+from users.authentication import ClaimsAccessToken
+
+User = get_user_model()
+
+EXPECTED_STATUS = {'GET': 200, 'POST': 201, 'PATCH': 200, 'DELETE': 204}
+# Объектов в одном запросе пакетных сценариев
+BULK_SIZE = 10
+
+
+def generate_dataset(rng, users=50, titles=500, genres=20, categories=10,
+                     reviews_per_title=5, comments_per_review=2):
+    """Создаёт пользователей, каталог, отзывы и комментарии пачками.
+
+    Отзывы произведению пишут первые reviews_per_title пользователей,
+    остальные остаются свободными для сценария создания отзыва.
+    """
+    reviews_per_title = min(reviews_per_title, users - 1)
+    User.objects.bulk_create(
+        (User(username=f'bench_user_{number}',
+              email=f'bench_user_{number}@yamdb.fake',
+              role=User.ADMIN if number == 0 else User.USER,
+              confirmation_code='bench')
+         for number in range(users))
+    )
+    Category.objects.bulk_create(
+        Category(name=f'Категория {number}', slug=f'bench-category-{number}')
+        for number in range(categories)
+    )
+    Genre.objects.bulk_create(
+        Genre(name=f'Жанр {number}', slug=f'bench-genre-{number}')
+        for number in range(genres)
+    )
+    user_ids = list(User.objects.filter(
+        username__startswith='bench_user_'
+    ).order_by('id').values_list('id', flat=True))
+    category_ids = list(Category.objects.filter(
+        slug__startswith='bench-category-'
+    ).values_list('id', flat=True))
+    genre_ids = list(Genre.objects.filter(
+        slug__startswith='bench-genre-'
+    ).values_list('id', flat=True))
+
+    Title.objects.bulk_create(
+        (Title(name=f'Произведение {number}', year=rng.randint(1900, 2020),
+               description=f'Описание произведения {number}',
+               category_id=rng.choice(category_ids))
+         for number in range(titles))
+    )
+    title_ids = list(Title.objects.filter(
+        name__startswith='Произведение '
+    ).order_by('id').values_list('id', flat=True))
+    GenreTitle.objects.bulk_create(
+        (GenreTitle(title_id=title_id, genre_id=genre_id)
+         for title_id in title_ids
+         for genre_id in rng.sample(genre_ids, min(2, len(genre_ids))))
+    )
+    Review.objects.bulk_create(
+        (Review(title_id=title_id, author_id=author_id, text='Отзыв',
+                score=rng.randint(1, 10))
+         for title_id in title_ids
+         for author_id in user_ids[:reviews_per_title])
+    )
+    review_ids = list(Review.objects.filter(
+        title_id__in=title_ids
+    ).values_list('id', 'title_id', 'author_id'))
+    Comment.objects.bulk_create(
+        (Comment(review_id=review_id, author_id=rng.choice(user_ids),
+                 text='Комментарий')
+         for review_id, _, _ in review_ids
+         for _ in range(comments_per_review))
+    )
+    Title.objects.filter(pk__in=title_ids).rebuild_rating()
+    Title.objects.filter(pk__in=title_ids).rebuild_trend()
+    Title.objects.filter(pk__in=title_ids).rebuild_stats()
+    Review.objects.filter(title__in=title_ids).rebuild_comment_count()
+    return {
+        'users': user_ids,
+        'reviewers': reviews_per_title,
+        'titles': title_ids,
+        'genres': list(Genre.objects.filter(
+            pk__in=genre_ids).values_list('slug', flat=True)),
+        'categories': list(Category.objects.filter(
+            pk__in=category_ids).values_list('slug', flat=True)),
+        'reviews': review_ids,
+        'comments': list(Comment.objects.filter(
+            review__title_id__in=title_ids
+        ).values_list('id', 'review_id', 'review__title_id', 'author_id')),
+    }
+
+
+def call(application, method, path, data=None, token=None):
+    """Выполняет запрос через WSGI-приложение, возвращает статус и тело."""
+    url = urlsplit(path)
+    body = json.dumps(data).encode('utf-8') if data is not None else b''
+    environ = {
+        'REQUEST_METHOD': method,
+        'PATH_INFO': url.path,
+        'QUERY_STRING': url.query,
+        'CONTENT_TYPE': 'application/json',
+        'CONTENT_LENGTH': str(len(body)),
+        'wsgi.input': io.BytesIO(body),
+    }
+    if token:
+        environ['HTTP_AUTHORIZATION'] = f'Bearer {token}'
+    setup_testing_defaults(environ)
+    status = []
+
+    def start_response(response_status, headers, exc_info=None):
+        status.append(int(response_status.split()[0]))
+
+    result = application(environ, start_response)
+    try:
+        content = b''.join(result)
+    finally:
+        if hasattr(result, 'close'):
+            result.close()
+    return status[0], content
+
+
+def percentile(values, share):
+    ordered = sorted(values)
+    index = max(0, math.ceil(share * len(ordered)) - 1)
+    return ordered[index]
+
+
+class Scenarios:
+    """Сценарии по всем маршрутам api/urls.py и users/urls.py.
+
+    Сценарий возвращает (метод, адрес, тело, id пользователя[, ожидаемый
+    статус]). Сценарии удаления удаляют записи, созданные сценариями
+    создания, поэтому идут после них.
+    """
+
+    order = (
+        'titles:list', 'titles:list_cursor', 'titles:filter',
+        'titles:search', 'titles:top', 'titles:trending', 'titles:detail',
+        'titles:stats',
+        'titles:create', 'titles:update', 'titles:delete',
+        'titles:bulk_create', 'titles:bulk_update',
+        'genres:list', 'genres:create', 'genres:delete',
+        'categories:list', 'categories:create', 'categories:delete',
+        'reviews:list', 'reviews:detail', 'reviews:create', 'reviews:update',
+        'reviews:delete',
+        'comments:list', 'comments:detail', 'comments:create',
+        'comments:update', 'comments:delete',
+        'users:list', 'users:detail', 'users:create', 'users:delete',
+        'users:me', 'users:me_update',
+        'auth:signup', 'auth:token',
+    )
+
+    def __init__(self, rng, dataset):
+        self.rng = rng
+        self.data = dataset
+        self.admin = dataset['users'][0]
+        self.created = {}
+        self.counter = 0
+        self.free_pairs = (
+            (author_id, title_id)
+            for author_id in dataset['users'][dataset['reviewers']:]
+            for title_id in dataset['titles']
+        )
+
+    def get(self, name):
+        return getattr(self, name.replace(':', '_'))
+
+    def unique(self):
+        self.counter += 1
+        return self.counter
+
+    def title_id(self):
+        return self.rng.choice(self.data['titles'])
+
+    def review(self):
+        return self.rng.choice(self.data['reviews'])
+
+    def comment(self):
+        return self.rng.choice(self.data['comments'])
+
+    def user(self):
+        return self.rng.choice(self.data['users'])
+
+    def remember(self, name, path, content):
+        obj = json.loads(content)
+        if isinstance(obj, dict):
+            kind = name.split(':')[0]
+            self.created.setdefault(kind, []).append((path, obj))
+
+    def created_url(self, kind, key):
+        path, obj = self.created[kind].pop()
+        return f'{path}{obj[key]}/'
+
+    @staticmethod
+    def comments_url(review_id, title_id):
+        return f'/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+
+    def titles_list(self):
+        pages = math.ceil(
+            len(self.data['titles']) / settings.REST_FRAMEWORK['PAGE_SIZE']
+        )
+        page = self.rng.randint(1, min(pages, 20))
+        return 'GET', f'/api/v1/titles/?page={page}', None, None
+
+    def titles_list_cursor(self):
+        return 'GET', '/api/v1/titles/?cursor=', None, None
+
+    def titles_filter(self):
+        genre = self.rng.choice(self.data['genres'])
+        return 'GET', f'/api/v1/titles/?genre={genre}', None, None
+
+    def titles_search(self):
+        number = self.rng.randrange(len(self.data['titles']))
+        return 'GET', f'/api/v1/titles/?search={number}', None, None
+
+    def titles_top(self):
+        return 'GET', '/api/v1/titles/top/', None, None
+
+    def titles_trending(self):
+        category = self.rng.choice(self.data['categories'])
+        return ('GET', f'/api/v1/titles/trending/?category={category}',
+                None, None)
+
+    def titles_detail(self):
+        return 'GET', f'/api/v1/titles/{self.title_id()}/', None, None
+
+    def titles_stats(self):
+        return (
+            'GET', f'/api/v1/titles/{self.title_id()}/stats/', None, None
+        )
+
+    def titles_create(self):
+        data = {'name': f'Новое произведение {self.unique()}', 'year': 2000,
+                'genre': [self.rng.choice(self.data['genres'])],
+                'category': 'bench-category-0'}
+        return 'POST', '/api/v1/titles/', data, self.admin
+
+    def titles_update(self):
+        data = {'description': f'Новое описание {self.unique()}'}
+        return ('PATCH', f'/api/v1/titles/{self.title_id()}/', data,
+                self.admin)
+
+    def titles_delete(self):
+        return 'DELETE', self.created_url('titles', 'id'), None, self.admin
+
+    def titles_bulk_create(self):
+        data = [
+            {'name': f'Пакетное произведение {self.unique()}', 'year': 2000,
+             'genre': self.rng.sample(self.data['genres'], 1),
+             'category': self.rng.choice(self.data['categories'])}
+            for _ in range(BULK_SIZE)
+        ]
+        return 'POST', '/api/v1/titles/bulk/', data, self.admin
+
+    def titles_bulk_update(self):
+        data = [
+            {'id': title_id, 'description': f'Описание {self.unique()}'}
+            for title_id in self.rng.sample(self.data['titles'], BULK_SIZE)
+        ]
+        return 'PATCH', '/api/v1/titles/bulk/', data, self.admin
+
+    def genres_list(self):
+        return 'GET', '/api/v1/genres/', None, None
+
+    def genres_create(self):
+        number = self.unique()
+        data = {'name': f'Новый жанр {number}', 'slug': f'new-{number}'}
+        return 'POST', '/api/v1/genres/', data, self.admin
+
+    def genres_delete(self):
+        return 'DELETE', self.created_url('genres', 'slug'), None, self.admin
+
+    def categories_list(self):
+        return 'GET', '/api/v1/categories/', None, None
+
+    def categories_create(self):
+        number = self.unique()
+        data = {'name': f'Новая категория {number}', 'slug': f'new-{number}'}
+        return 'POST', '/api/v1/categories/', data, self.admin
+
+    def categories_delete(self):
+        url = self.created_url('categories', 'slug')
+        return 'DELETE', url, None, self.admin
+
+    def reviews_list(self):
+        return 'GET', f'/api/v1/titles/{self.title_id()}/reviews/', None, None
+
+    def reviews_detail(self):
+        review_id, title_id, _ = self.review()
+        return ('GET', f'/api/v1/titles/{title_id}/reviews/{review_id}/',
+                None, None)
+
+    def reviews_create(self):
+        author_id, title_id = next(self.free_pairs)
+        data = {'text': 'Новый отзыв', 'score': self.rng.randint(1, 10)}
+        return 'POST', f'/api/v1/titles/{title_id}/reviews/', data, author_id
+
+    def reviews_update(self):
+        review_id, title_id, author_id = self.review()
+        return ('PATCH', f'/api/v1/titles/{title_id}/reviews/{review_id}/',
+                {'score': self.rng.randint(1, 10)}, author_id)
+
+    def reviews_delete(self):
+        return 'DELETE', self.created_url('reviews', 'id'), None, self.admin
+
+    def comments_list(self):
+        review_id, title_id, _ = self.review()
+        return 'GET', self.comments_url(review_id, title_id), None, None
+
+    def comments_detail(self):
+        comment_id, review_id, title_id, _ = self.comment()
+        url = self.comments_url(review_id, title_id)
+        return 'GET', f'{url}{comment_id}/', None, None
+
+    def comments_create(self):
+        review_id, title_id, _ = self.review()
+        url = self.comments_url(review_id, title_id)
+        return 'POST', url, {'text': 'Новый комментарий'}, self.user()
+
+    def comments_update(self):
+        comment_id, review_id, title_id, author_id = self.comment()
+        url = self.comments_url(review_id, title_id)
+        return ('PATCH', f'{url}{comment_id}/', {'text': 'Исправлено'},
+                author_id)
+
+    def comments_delete(self):
+        return 'DELETE', self.created_url('comments', 'id'), None, self.admin
+
+    def users_list(self):
+        return 'GET', '/api/v1/users/', None, self.admin
+
+    def users_detail(self):
+        number = self.rng.randrange(len(self.data['users']))
+        return ('GET', f'/api/v1/users/bench_user_{number}/', None,
+                self.admin)
+
+    def users_create(self):
+        number = self.unique()
+        data = {'username': f'bench_new_{number}',
+                'email': f'bench_new_{number}@yamdb.fake'}
+        return 'POST', '/api/v1/users/', data, self.admin
+
+    def users_delete(self):
+        url = self.created_url('users', 'username')
+        return 'DELETE', url, None, self.admin
+
+    def users_me(self):
+        return 'GET', '/api/v1/users/me/', None, self.user()
+
+    def users_me_update(self):
+        return 'PATCH', '/api/v1/users/me/', {'bio': 'Обо мне'}, self.user()
+
+    def auth_signup(self):
+        number = self.unique()
+        data = {'username': f'bench_signup_{number}',
+                'email': f'bench_signup_{number}@yamdb.fake'}
+        return 'POST', '/api/v1/auth/signup/', data, None, 200
+
+    def auth_token(self):
+        number = self.rng.randrange(len(self.data['users']))
+        data = {'username': f'bench_user_{number}',
+                'confirmation_code': 'bench'}
+        return 'POST', '/api/v1/auth/token/', data, None, 200
+
+
+def run_scenario(application, scenarios, name, repeat):
+    """Выполняет сценарий repeat раз и возвращает сводку замеров."""
+    scenario = scenarios.get(name)
+    tokens = {}
+    timings, queries, errors, size = [], [], 0, 0
+    started = time.perf_counter()
+    for _ in range(repeat):
+        method, path, data, user_id, *expected = scenario()
+        expected = expected[0] if expected else EXPECTED_STATUS[method]
+        token = None
+        if user_id is not None:
+            if user_id not in tokens:
+                tokens[user_id] = str(ClaimsAccessToken.for_user(
+                    User.objects.get(pk=user_id)
+                ))
+            token = tokens[user_id]
+        # Точка сохранения изолирует ошибку одного запроса от остальных.
+        with transaction.atomic():
+            with CaptureQueriesContext(connection) as captured:
+                request_started = time.perf_counter()
+                status, content = call(application, method, path, data,
+                                       token)
+                timings.append(time.perf_counter() - request_started)
+        queries.append(len(captured))
+        size += len(content)
+        if status != expected:
+            errors += 1
+        elif method == 'POST':
+            scenarios.remember(name, path, content)
+    total = time.perf_counter() - started
+    return {
+        'requests': repeat,
+        'errors': errors,
+        'p50_ms': round(percentile(timings, 0.50) * 1000, 3),
+        'p95_ms': round(percentile(timings, 0.95) * 1000, 3),
+        'p99_ms': round(percentile(timings, 0.99) * 1000, 3),
+        'throughput_rps': round(repeat / total, 1),
+        'queries_per_request': round(sum(queries) / len(queries), 2),
+        'bytes_per_request': size // repeat,
+    }
@@ -0,0 +1,70 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+VERSION_KEY = 'api:{namespace}:version'
+SETTLING_KEY = 'api:{namespace}:settling'
+RESPONSE_KEY = 'api:{namespace}:{version}:{digest}'
+
+
+def get_cache():
+    return caches[settings.API_CACHE_ALIAS]
+
+
+def get_version(namespace):
+    """Текущая версия пространства ключей.
+
+    Начальная версия берётся от времени, чтобы после вытеснения ключа
+    версии из кэша старые ответы не стали снова актуальными.
+    """
+    cache = get_cache()
+    key = VERSION_KEY.format(namespace=namespace)
+    version = cache.get(key)
+    if version is not None:
+        return version
+    cache.add(key, time.time_ns(), None)
+    return cache.get(key)
+
+
+def invalidate(*namespaces):
+    """Сбрасывает кэш пространств сменой версии, без обхода ключей.
+
+    При чтении с реплик пространство ещё DATABASE_REPLICA_STICKY_SECONDS
+    считается неустоявшимся (is_settling): реплика может не получить
+    запись, и прочитанное с неё нельзя кэшировать под новой версией.
+    """
+    cache = get_cache()
+    for namespace in namespaces:
+        key = VERSION_KEY.format(namespace=namespace)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, time.time_ns(), None)
+        if settings.DATABASE_REPLICAS:
+            cache.set(
+                SETTLING_KEY.format(namespace=namespace), True,
+                settings.DATABASE_REPLICA_STICKY_SECONDS,
+            )
+
+
+def is_settling(namespace):
+    """Была ли запись в пространство, которую реплики могли не получить."""
+    key = SETTLING_KEY.format(namespace=namespace)
+    return get_cache().get(key) is not None
+
+
+def response_key(namespace, request):
+    """Ключ ответа: адрес, отсортированные параметры запроса и версия."""
+    query = sorted(
+        (name, value)
+        for name, values in request.query_params.lists()
+        for value in values
+    )
+    source = f'{request.build_absolute_uri(request.path)}?{query}'
+    return RESPONSE_KEY.format(
+        namespace=namespace,
+        version=get_version(namespace),
+        digest=hashlib.md5(source.encode('utf-8')).hexdigest(),
+    )
@@ -0,0 +1,48 @@
+"""Проверка постоянных соединений с базой (DB_CONN_HEALTH_CHECKS).
+
+В начале запроса соединения, открытые в прошлых запросах и оставленные
+для повторного использования (CONN_MAX_AGE), помечаются для проверки.
+Проверяется соединение при первом обращении запроса к своей базе
+(ReplicaRouter), поэтому базы и реплики, которые запрос не использует,
+не пингуются. Не ответившее соединение закрывается и откроется заново
+при первом запросе к базе.
+"""
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.signals import request_started
+from django.db import DEFAULT_DB_ALIAS, connections
+
+# Псевдонимы баз, соединения с которыми ещё не проверены в этом запросе.
+_pending = ContextVar('health_check_pending', default=frozenset())
+
+
+def mark_connections(**kwargs):
+    """Помечает для проверки соединения, пережившие прошлый запрос.
+
+    Срабатывает после close_old_connections Django, который уже закрыл
+    соединения старше CONN_MAX_AGE. Запросов к базе не делает.
+    """
+    if not settings.DB_CONN_HEALTH_CHECKS:
+        _pending.set(frozenset())
+        return
+    _pending.set(frozenset(
+        connection.alias for connection in connections.all()
+        if connection.connection is not None
+    ))
+
+
+def check_connection(alias=DEFAULT_DB_ALIAS):
+    """Проверяет помеченное соединение alias один раз за запрос."""
+    pending = _pending.get()
+    if alias not in pending:
+        return
+    _pending.set(pending - {alias})
+    connection = connections[alias]
+    if (connection.connection is not None
+            and not connection.in_atomic_block
+            and not connection.is_usable()):
+        connection.close()
+
+
+request_started.connect(mark_connections)
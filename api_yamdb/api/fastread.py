@@ -0,0 +1,172 @@
+"""Быстрое чтение списков: ответ собирается из строк .values().
+
+План чтения (ReadPlan) один раз разбирает поля сериализатора: для
+каждого поля — столбец .values() и функция, превращающая значение в
+то же представление, что отдал бы сериализатор (to_representation
+самого поля). Порядок ключей и форматы значений совпадают с обычным
+выводом, а экземпляры моделей и сериализаторов на строку не создаются.
+
+Поддерживаются поля модели, SlugRelatedField, PrimaryKeyRelatedField,
+вложенный сериализатор по внешнему ключу и список вложенных
+сериализаторов по ManyToManyField (один дополнительный запрос на
+страницу). Для остальных полей план не строится, и представление
+работает через сериализатор как обычно.
+"""
+from collections import defaultdict
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db import models
+from django.db.models import F
+from rest_framework import serializers
+from rest_framework.relations import PrimaryKeyRelatedField, SlugRelatedField
+
+# Имя столбца с ключом родителя в строках связи многие-ко-многим.
+PARENT_KEY = 'fastread_parent'
+
+
+class PlanError(Exception):
+    """Поле сериализатора нельзя прочитать из .values()."""
+
+
+def empty_getter(row):
+    return None
+
+
+def column_getter(key):
+    return lambda row: row[key]
+
+
+def value_getter(key, to_representation):
+    def get(row):
+        value = row[key]
+        return None if value is None else to_representation(value)
+    return get
+
+
+def nested_getter(key, plan):
+    def get(row):
+        return None if row[key] is None else plan.build(row)
+    return get
+
+
+class ManyRelation:
+    """Список вложенного сериализатора по ManyToManyField."""
+
+    def __init__(self, model, source, serializer):
+        try:
+            field = model._meta.get_field(source)
+        except FieldDoesNotExist:
+            raise PlanError(source)
+        if not isinstance(field, models.ManyToManyField):
+            raise PlanError(source)
+        self.plan = ReadPlan(serializer)
+        if self.plan.many:
+            raise PlanError(source)
+        self.model = field.related_model
+        self.query_name = field.related_query_name()
+
+    def load(self, pks):
+        """Представления связанных объектов по ключам родителей.
+
+        Порядок — порядок модели по умолчанию, как у prefetch_related.
+        """
+        rows = self.model._default_manager.filter(
+            **{f'{self.query_name}__in': pks}
+        ).values(*self.plan.columns, **{PARENT_KEY: F(self.query_name)})
+        grouped = defaultdict(list)
+        for row in rows:
+            grouped[row[PARENT_KEY]].append(self.plan.build(row))
+        return grouped
+
+
+class ReadPlan:
+    """Столбцы .values() и функции представления полей сериализатора."""
+
+    def __init__(self, serializer, prefix=''):
+        self.model = serializer.Meta.model
+        self.prefix = prefix
+        self.pk = self.model._meta.pk.name
+        self.columns = []
+        self.getters = []
+        self.many = []
+        for name, field in serializer.fields.items():
+            if not field.write_only:
+                self.add_field(name, field)
+        if self.many:
+            self.column(self.pk)
+
+    def column(self, lookup):
+        key = self.prefix + lookup
+        if key not in self.columns:
+            self.columns.append(key)
+        return key
+
+    def add_field(self, name, field):
+        source = field.source
+        if source == '*' or '.' in source:
+            raise PlanError(name)
+        if isinstance(field, serializers.ListSerializer):
+            if self.prefix:
+                raise PlanError(name)
+            self.many.append(
+                (name, ManyRelation(self.model, source, field.child))
+            )
+            # Место ключа в ответе; список подставит serialize.
+            getter = empty_getter
+        elif isinstance(field, serializers.BaseSerializer):
+            plan = ReadPlan(field, prefix=f'{self.prefix}{source}__')
+            if plan.many:
+                raise PlanError(name)
+            getter = nested_getter(self.column(source), plan)
+            self.columns.extend(
+                key for key in plan.columns if key not in self.columns
+            )
+        elif isinstance(field, SlugRelatedField):
+            getter = column_getter(
+                self.column(f'{source}__{field.slug_field}')
+            )
+        elif (isinstance(field, PrimaryKeyRelatedField)
+              and field.pk_field is None):
+            getter = column_getter(self.column(source))
+        else:
+            getter = value_getter(
+                self.column(self.model_field(source)),
+                field.to_representation,
+            )
+        self.getters.append((name, getter))
+
+    def model_field(self, source):
+        try:
+            field = self.model._meta.get_field(source)
+        except FieldDoesNotExist:
+            raise PlanError(source)
+        if field.is_relation or not field.concrete:
+            raise PlanError(source)
+        return source
+
+    def build(self, row):
+        return {name: get(row) for name, get in self.getters}
+
+    def values(self, queryset, extra=()):
+        """Queryset строк для плана; extra — столбцы, нужные пагинатору."""
+        columns = list(self.columns)
+        columns.extend(name for name in extra if name not in columns)
+        return queryset.prefetch_related(None).values(*columns)
+
+    def serialize(self, rows):
+        data = [self.build(row) for row in rows]
+        if self.many:
+            pks = [row[self.pk] for row in rows]
+            for name, relation in self.many:
+                grouped = relation.load(pks)
+                for item, pk in zip(data, pks):
+                    item[name] = grouped.get(pk, [])
+        return data
+
+
+def compile_plan(serializer_class):
+    """План чтения для сериализатора или None, если он не поддержан."""
+    try:
+        return ReadPlan(serializer_class())
+    except PlanError:
+        return None
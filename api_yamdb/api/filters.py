@@ -1,5 +1,7 @@
+from django.db.models import F
 from django_filters import rest_framework as filters
 from reviews.models import Title
+from reviews.search import search_titles
 
 
 class TitleFilter(filters.FilterSet):
@@ -9,7 +11,27 @@ class TitleFilter(filters.FilterSet):
     category = filters.CharFilter(field_name="category__slug")
     name = filters.CharFilter(field_name="name", lookup_expr="icontains")
     year = filters.NumberFilter(field_name="year")
+    search = filters.CharFilter(method="filter_search")
+    ordering = filters.ChoiceFilter(
+        method="filter_ordering",
+        choices=[
+            (f"{direction}{field}", f"{direction}{field}")
+            for field in ("rating", "year", "name")
+            for direction in ("", "-")
+        ],
+    )
 
     class Meta:
         model = Title
-        fields = ("genre", "category", "name", "year")
+        fields = ("genre", "category", "name", "year", "search", "ordering")
+
+    def filter_search(self, queryset, name, value):
+        """Полнотекстовый поиск с сортировкой по релевантности."""
+        return search_titles(queryset, value)
+
+    def filter_ordering(self, queryset, name, value):
+        """Сортировка по полю; произведения без рейтинга всегда в конце."""
+        field = F(value.lstrip("-"))
+        if value.startswith("-"):
+            return queryset.order_by(field.desc(nulls_last=True), "-id")
+        return queryset.order_by(field.asc(nulls_last=True), "id")
@@ -0,0 +1,133 @@
+import json
+import random
+import subprocess
+from datetime import datetime, timezone
+
+from api.benchmark import Scenarios, generate_dataset, run_scenario
+from api.cache import invalidate
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.core.signals import request_finished, request_started
+from django.db import close_old_connections, connection, transaction
+
+
+class Command(BaseCommand):
+    help = (
+        'Нагрузочный прогон всех эндпоинтов API через WSGI-приложение в '
+        'процессе: p50/p95/p99, пропускная способность и число SQL-запросов '
+        'на запрос. Данные генерируются в транзакции и откатываются.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=50)
+        parser.add_argument('--titles', type=int, default=500)
+        parser.add_argument('--genres', type=int, default=20)
+        parser.add_argument('--categories', type=int, default=10)
+        parser.add_argument('--reviews-per-title', type=int, default=5)
+        parser.add_argument('--comments-per-review', type=int, default=2)
+        parser.add_argument(
+            '--requests', type=int, default=50,
+            help='Количество запросов в каждом сценарии.',
+        )
+        parser.add_argument(
+            '--scenario', action='append', dest='scenarios',
+            help='Запустить только указанные сценарии (например, '
+                 'titles:list). По умолчанию запускаются все.',
+        )
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument(
+            '--output', help='Сохранить результаты в JSON-файл.',
+        )
+        parser.add_argument(
+            '--compare', help='JSON-файл прошлого прогона для сравнения.',
+        )
+
+    def handle(self, *args, **options):
+        names = options['scenarios'] or list(Scenarios.order)
+        unknown = set(names) - set(Scenarios.order)
+        if unknown:
+            raise CommandError(
+                f'Неизвестные сценарии: {", ".join(sorted(unknown))}'
+            )
+        rng = random.Random(options['seed'])
+        application = WSGIHandler()
+        # Как тестовый клиент Django: иначе обработчик закроет соединение
+        # вместе с транзакцией, в которой лежат сгенерированные данные.
+        request_started.disconnect(close_old_connections)
+        request_finished.disconnect(close_old_connections)
+        try:
+            with transaction.atomic():
+                dataset = generate_dataset(
+                    rng,
+                    users=options['users'],
+                    titles=options['titles'],
+                    genres=options['genres'],
+                    categories=options['categories'],
+                    reviews_per_title=options['reviews_per_title'],
+                    comments_per_review=options['comments_per_review'],
+                )
+                scenarios = Scenarios(rng, dataset)
+                results = {}
+                for name in Scenarios.order:
+                    if name in names:
+                        results[name] = run_scenario(
+                            application, scenarios, name, options['requests']
+                        )
+                transaction.set_rollback(True)
+        finally:
+            request_started.connect(close_old_connections)
+            request_finished.connect(close_old_connections)
+            # Ответы по откатанным данным не должны остаться в общем кэше.
+            invalidate('titles', 'genres', 'categories', 'reviews')
+
+        report = {
+            'commit': self.get_commit(),
+            'created': datetime.now(timezone.utc).isoformat(),
+            'database': connection.vendor,
+            'parameters': {
+                key: options[key] for key in (
+                    'users', 'titles', 'genres', 'categories',
+                    'reviews_per_title', 'comments_per_review', 'requests',
+                    'seed',
+                )
+            },
+            'results': results,
+        }
+        previous = self.load(options['compare']) if options['compare'] else {}
+        self.print_report(results, previous.get('results', {}))
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                json.dump(report, file, ensure_ascii=False, indent=2)
+            self.stdout.write(f'Результаты сохранены в {options["output"]}')
+
+    @staticmethod
+    def get_commit():
+        try:
+            return subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'],
+                cwd=settings.BASE_DIR, capture_output=True, text=True,
+                check=True,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    @staticmethod
+    def load(path):
+        with open(path, encoding='utf-8') as file:
+            return json.load(file)
+
+    def print_report(self, results, previous):
+        self.stdout.write(
+            f'{"сценарий":<22}{"p50":>9}{"p95":>9}{"p99":>9}{"rps":>9}'
+            f'{"SQL":>7}{"ошибки":>8}{"p95 было":>10}'
+        )
+        for name, result in results.items():
+            before = previous.get(name, {}).get('p95_ms')
+            self.stdout.write(
+                f'{name:<22}{result["p50_ms"]:>9.2f}{result["p95_ms"]:>9.2f}'
+                f'{result["p99_ms"]:>9.2f}{result["throughput_rps"]:>9.1f}'
+                f'{result["queries_per_request"]:>7.1f}'
+                f'{result["errors"]:>8}'
+                f'{before if before is not None else "-":>10}'
+            )
@@ -0,0 +1,97 @@
+import io
+import random
+import statistics
+import time
+from collections import OrderedDict
+
+from api import renderers
+from api.benchmark import generate_dataset
+from api.fastread import compile_plan
+from api.serializers import ReviewSerializer, TitlesViewSerializer
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from reviews.models import Review, Title
+
+PAGES = (
+    ('titles', TitlesViewSerializer, Title.objects.order_by('id')),
+    ('reviews', ReviewSerializer, Review.objects.order_by('-pub_date', '-id')),
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает стандартный json и orjson (api.renderers) на страницах '
+        'произведений и отзывов из --rows записей: вывод ответа и разбор '
+        'того же тела как запроса. Данные генерируются в транзакции и '
+        'откатываются после замеров.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000)
+        parser.add_argument(
+            '--repeat', type=int, default=50,
+            help='Количество повторов каждого замера.',
+        )
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        if renderers.orjson is None:
+            raise CommandError('orjson не установлен: сравнивать не с чем')
+        rows = options['rows']
+        with transaction.atomic():
+            generate_dataset(
+                random.Random(options['seed']), users=20, titles=rows,
+                reviews_per_title=2, comments_per_review=0,
+            )
+            pages = [
+                (name, self.page(serializer_class, queryset[:rows]))
+                for name, serializer_class, queryset in PAGES
+            ]
+            transaction.set_rollback(True)
+        self.stdout.write(f'Медиана, мс на страницу из {rows} записей')
+        self.stdout.write(
+            f'{"страница":<10}{"КБ":>8}{"вывод json":>12}{"orjson":>10}'
+            f'{"разбор json":>13}{"orjson":>10}'
+        )
+        for name, data in pages:
+            content = JSONRenderer().render(data)
+            if renderers.FastJSONRenderer().render(data) != content:
+                raise CommandError(f'{name}: вывод orjson отличается')
+            timings = [
+                self.measure(run, options['repeat']) for run in (
+                    lambda: JSONRenderer().render(data),
+                    lambda: renderers.FastJSONRenderer().render(data),
+                    lambda: JSONParser().parse(io.BytesIO(content)),
+                    lambda: renderers.FastJSONParser().parse(
+                        io.BytesIO(content)
+                    ),
+                )
+            ]
+            self.stdout.write(
+                f'{name:<10}{len(content) / 1024:>8.0f}'
+                f'{timings[0]:>12.2f}{timings[1]:>10.2f}'
+                f'{timings[2]:>13.2f}{timings[3]:>10.2f}'
+            )
+
+    @staticmethod
+    def page(serializer_class, queryset):
+        """Тело ответа списка, как его отдаёт представление."""
+        plan = compile_plan(serializer_class)
+        return OrderedDict([
+            ('count', len(queryset)),
+            ('next', None),
+            ('previous', None),
+            ('results', plan.serialize(list(plan.values(queryset)))),
+        ])
+
+    @staticmethod
+    def measure(run, repeat):
+        run()
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            run()
+            timings.append((time.perf_counter() - started) * 1000)
+        return statistics.median(timings)
@@ -0,0 +1,102 @@
+import random
+import statistics
+import time
+
+from api.filters import TitleFilter
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from reviews.models import Title
+from reviews.search import title_index
+
+LETTERS = 'абвгдежзиклмнопрстуфхцчшэюя'
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает задержку поиска произведений: фильтр name (icontains) '
+        'и полнотекстовый search. Данные генерируются в транзакции и '
+        'откатываются после замеров.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes', type=int, nargs='+', default=[10000, 100000, 1000000],
+            help='Количество произведений для замеров.',
+        )
+        parser.add_argument(
+            '--repeat', type=int, default=20,
+            help='Количество повторов каждого запроса.',
+        )
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        vocabulary = [
+            ''.join(rng.choice(LETTERS) for _ in range(rng.randint(4, 9)))
+            for _ in range(5000)
+        ]
+        self.stdout.write(
+            f'База: {connection.vendor}; медиана и p95, мс '
+            f'(COUNT и первая страница из 5 записей)'
+        )
+        self.stdout.write(
+            f'{"записей":>10} {"icontains":>20} {"search":>20}'
+        )
+        try:
+            with transaction.atomic():
+                created = 0
+                for size in sorted(options['sizes']):
+                    self.generate(rng, vocabulary, size - created)
+                    created = size
+                    title_index.reset()
+                    word = rng.choice(vocabulary)
+                    icontains = self.measure(
+                        {'name': word}, options['repeat']
+                    )
+                    search = self.measure(
+                        {'search': word}, options['repeat']
+                    )
+                    self.stdout.write(
+                        f'{size:>10} {self.format(icontains):>20} '
+                        f'{self.format(search):>20}'
+                    )
+                transaction.set_rollback(True)
+        finally:
+            title_index.reset()
+
+    @staticmethod
+    def generate(rng, vocabulary, count, batch_size=10000):
+        for start in range(0, count, batch_size):
+            Title.objects.bulk_create(
+                Title(
+                    name=' '.join(rng.sample(vocabulary, 3)),
+                    description=' '.join(rng.sample(vocabulary, 12)),
+                    year=rng.randint(1900, 2020),
+                )
+                for _ in range(min(batch_size, count - start))
+            )
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE reviews_title')
+
+    @staticmethod
+    def measure(params, repeat):
+        def run():
+            queryset = TitleFilter(params, queryset=Title.objects.all()).qs
+            queryset.count()
+            list(queryset[:5])
+
+        # Прогрев: построение запасного индекса не входит в замер.
+        run()
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            run()
+            timings.append((time.perf_counter() - started) * 1000)
+        return timings
+
+    @staticmethod
+    def format(timings):
+        timings = sorted(timings)
+        p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+        return f'{statistics.median(timings):.2f} / {p95:.2f}'
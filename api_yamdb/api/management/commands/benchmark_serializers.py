@@ -0,0 +1,102 @@
+import random
+import statistics
+import time
+
+from api.benchmark import generate_dataset
+from api.fastread import compile_plan
+from api.mixins import EagerLoadingMixin
+from api.serializers import (CommentSerializer, ReviewSerializer,
+                             TitlesViewSerializer)
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from reviews.models import Comment, Review, Title
+
+# Набор строк для каждого сериализатора: queryset и порядок списка.
+DATASETS = (
+    ('titles', TitlesViewSerializer, Title.objects.all(), ('id',)),
+    ('reviews', ReviewSerializer, Review.objects.filter(is_hidden=False),
+     ('-pub_date', '-id')),
+    ('comments', CommentSerializer, Comment.objects.filter(is_hidden=False),
+     ('-pub_date', '-id')),
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает сериализатор DRF и быстрый путь чтения (api.fastread) '
+        'на списке из --rows записей: чтение с представлением и только '
+        'представление. Данные генерируются в транзакции и откатываются '
+        'после замеров.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000)
+        parser.add_argument(
+            '--repeat', type=int, default=20,
+            help='Количество повторов каждого замера.',
+        )
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        rows = options['rows']
+        self.stdout.write(
+            f'База: {connection.vendor}; медиана, мс на {rows} записей'
+        )
+        self.stdout.write(
+            f'{"список":<10}{"путь":<12}{"чтение+вывод":>14}{"вывод":>10}'
+        )
+        with transaction.atomic():
+            generate_dataset(
+                random.Random(options['seed']), users=20, titles=rows,
+                reviews_per_title=2, comments_per_review=1,
+            )
+            for name, serializer_class, queryset, ordering in DATASETS:
+                queryset = queryset.order_by(*ordering)[:rows]
+                for path, timings in self.measure(
+                    serializer_class, queryset, options['repeat']
+                ):
+                    self.stdout.write(
+                        f'{name:<10}{path:<12}'
+                        f'{statistics.median(timings[0]):>14.2f}'
+                        f'{statistics.median(timings[1]):>10.2f}'
+                    )
+            transaction.set_rollback(True)
+
+    @staticmethod
+    def measure(serializer_class, queryset, repeat):
+        """Пары замеров (чтение с выводом, только вывод) для двух путей."""
+        plan = compile_plan(serializer_class)
+        if plan is None:
+            raise CommandError(
+                f'{serializer_class.__name__}: быстрый путь не поддержан'
+            )
+        select_related, prefetch_related = (
+            EagerLoadingMixin._plan_eager_loading(serializer_class())
+        )
+        eager = queryset.select_related(*select_related).prefetch_related(
+            *prefetch_related
+        )
+
+        def regular():
+            started = time.perf_counter()
+            objs = list(eager.all())
+            output_started = time.perf_counter()
+            serializer_class(objs, many=True).data
+            return started, output_started
+
+        def fast():
+            started = time.perf_counter()
+            rows = list(plan.values(queryset.all()))
+            output_started = time.perf_counter()
+            plan.serialize(rows)
+            return started, output_started
+
+        for path, run in (('drf', regular), ('fastread', fast)):
+            run()
+            total, output = [], []
+            for _ in range(repeat):
+                started, output_started = run()
+                finished = time.perf_counter()
+                total.append((finished - started) * 1000)
+                output.append((finished - output_started) * 1000)
+            yield path, (total, output)
@@ -0,0 +1,184 @@
+import http.client
+import itertools
+import json
+import os
+import shutil
+import socket
+import subprocess
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from api.benchmark import percentile
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Переменные окружения сервера для каждого профиля. baseline — прежний
+# запуск: один sync-воркер и новое соединение с базой на каждый запрос.
+PROFILES = {
+    'baseline': {
+        'GUNICORN_WORKER_CLASS': 'sync',
+        'GUNICORN_WORKERS': '1',
+        'GUNICORN_THREADS': '1',
+        'GUNICORN_MAX_REQUESTS': '0',
+        'DB_CONN_MAX_AGE': '0',
+        'DB_CONN_HEALTH_CHECKS': 'False',
+    },
+    'tuned': {},
+}
+DEFAULT_PATHS = ('/api/v1/titles/', '/api/v1/genres/', '/api/v1/categories/')
+
+
+def run_load(host, port, paths, requests, concurrency):
+    """Делает requests GET-запросов в concurrency потоков.
+
+    Каждый поток держит своё keep-alive соединение, как клиент за
+    балансировщиком. Возвращает задержки (мс), число ошибок и время.
+    """
+    counter = itertools.count()
+    lock = threading.Lock()
+    latencies = []
+    errors = [0]
+
+    def worker():
+        connection = http.client.HTTPConnection(host, port, timeout=30)
+        while True:
+            with lock:
+                number = next(counter)
+            if number >= requests:
+                break
+            path = paths[number % len(paths)]
+            started = time.perf_counter()
+            try:
+                connection.request('GET', path)
+                response = connection.getresponse()
+                response.read()
+                ok = response.status == 200
+            except (OSError, http.client.HTTPException):
+                connection.close()
+                ok = False
+            elapsed = (time.perf_counter() - started) * 1000
+            with lock:
+                latencies.append(elapsed)
+                errors[0] += not ok
+        connection.close()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        for _ in range(concurrency):
+            pool.submit(worker)
+    return latencies, errors[0], time.perf_counter() - started
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает пропускную способность профилей запуска gunicorn '
+        '(baseline — один sync-воркер без постоянных соединений, tuned — '
+        'настройки gunicorn.conf.py). Сервер запускается на текущей базе, '
+        'данные должны быть загружены заранее.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--profile', action='append', dest='profiles',
+            choices=sorted(PROFILES),
+            help='Профили для сравнения, по умолчанию все.',
+        )
+        parser.add_argument('--requests', type=int, default=2000)
+        parser.add_argument('--concurrency', type=int, default=16)
+        parser.add_argument('--port', type=int, default=8765)
+        parser.add_argument(
+            '--path', action='append', dest='paths',
+            help='Адреса для запросов, по умолчанию списки каталога.',
+        )
+        parser.add_argument(
+            '--output', help='Сохранить результаты в JSON-файл.',
+        )
+
+    def handle(self, *args, **options):
+        paths = options['paths'] or list(DEFAULT_PATHS)
+        results = {}
+        for name in options['profiles'] or sorted(PROFILES):
+            with self.server(PROFILES[name], options['port']):
+                # Прогрев: соединения, импорт модулей, кэш.
+                run_load('127.0.0.1', options['port'], paths,
+                         len(paths) * 2, 1)
+                latencies, errors, elapsed = run_load(
+                    '127.0.0.1', options['port'], paths,
+                    options['requests'], options['concurrency'],
+                )
+            results[name] = {
+                'requests': len(latencies),
+                'errors': errors,
+                'throughput_rps': round(len(latencies) / elapsed, 1),
+                'p50_ms': round(percentile(latencies, 0.50), 2),
+                'p95_ms': round(percentile(latencies, 0.95), 2),
+                'p99_ms': round(percentile(latencies, 0.99), 2),
+            }
+        self.stdout.write(
+            f'{"профиль":<12}{"rps":>9}{"p50":>9}{"p95":>9}{"p99":>9}'
+            f'{"ошибки":>8}'
+        )
+        for name, result in results.items():
+            self.stdout.write(
+                f'{name:<12}{result["throughput_rps"]:>9.1f}'
+                f'{result["p50_ms"]:>9.2f}{result["p95_ms"]:>9.2f}'
+                f'{result["p99_ms"]:>9.2f}{result["errors"]:>8}'
+            )
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                json.dump(results, file, ensure_ascii=False, indent=2)
+
+    def server(self, profile, port):
+        executable = shutil.which('gunicorn')
+        if executable is None:
+            raise CommandError('gunicorn не установлен')
+        # Лог сервера пишется в файл: непрочитанный PIPE заполнился бы и
+        # остановил gunicorn посреди прогона.
+        log = tempfile.TemporaryFile()
+        process = subprocess.Popen(
+            [executable, 'api_yamdb.wsgi:application',
+             '-c', 'gunicorn.conf.py', '--bind', f'127.0.0.1:{port}'],
+            cwd=settings.BASE_DIR,
+            env={**os.environ, **profile},
+            stdout=subprocess.DEVNULL,
+            stderr=log,
+        )
+        return RunningServer(process, port, log)
+
+
+class RunningServer:
+    """Ждёт, пока gunicorn начнёт принимать соединения, и останавливает
+    его на выходе из блока with."""
+
+    def __init__(self, process, port, log, timeout=30):
+        self.process = process
+        self.port = port
+        self.log = log
+        self.timeout = timeout
+
+    def __enter__(self):
+        deadline = time.monotonic() + self.timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                self.log.seek(0)
+                message = self.log.read().decode(errors='replace')
+                self.log.close()
+                raise CommandError(f'gunicorn не запустился: {message}')
+            try:
+                socket.create_connection(('127.0.0.1', self.port), 1).close()
+                return self
+            except OSError:
+                time.sleep(0.2)
+        self.__exit__()
+        raise CommandError('gunicorn не начал принимать соединения')
+
+    def __exit__(self, *exc_info):
+        self.process.terminate()
+        try:
+            self.process.wait(self.timeout)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+        self.log.close()
@@ -0,0 +1,58 @@
+from api.export import DATASETS, FORMATS, export
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+
+class Command(BaseCommand):
+    help = (
+        'Выгружает произведения, отзывы или комментарии в NDJSON или CSV. '
+        'Строки читаются курсором пачками и сразу пишутся в файл, поэтому '
+        'память не зависит от размера таблиц.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('dataset', choices=sorted(DATASETS))
+        parser.add_argument(
+            '--format', dest='fmt', choices=sorted(FORMATS),
+            default='ndjson',
+        )
+        parser.add_argument(
+            '--since',
+            help='Только записи, опубликованные начиная с этой даты '
+                 '(ISO 8601), для инкрементальной выгрузки.',
+        )
+        parser.add_argument(
+            '--output', help='Файл для выгрузки, по умолчанию stdout.',
+        )
+        parser.add_argument(
+            '--chunk-size', type=int,
+            help='Строк, читаемых из базы за один раз '
+                 '(по умолчанию EXPORT_CHUNK_SIZE).',
+        )
+
+    def handle(self, *args, **options):
+        since = self.parse_since(options['since'])
+        if options['chunk_size'] is not None and options['chunk_size'] < 1:
+            raise CommandError('Размер пачки должен быть положительным')
+        lines = export(
+            options['dataset'], options['fmt'], since, options['chunk_size']
+        )
+        if not options['output']:
+            for line in lines:
+                self.stdout.write(line, ending='')
+            return
+        with open(options['output'], 'w', encoding='utf-8',
+                  newline='') as file:
+            file.writelines(lines)
+
+    @staticmethod
+    def parse_since(value):
+        if value is None:
+            return None
+        since = parse_datetime(value)
+        if since is None:
+            raise CommandError(f'Неверная дата --since: {value}')
+        if timezone.is_naive(since):
+            return timezone.make_aware(since)
+        return since
@@ -0,0 +1,76 @@
+import json
+import logging
+import time
+
+from api.profiling import Profile, ms, route_stats
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+logger = logging.getLogger('api.profiling')
+
+
+class ProfilingMiddleware:
+    """Замеряет запрос: время, число и время SQL, сериализацию, размер.
+
+    Добавляет заголовок Server-Timing, пишет структурированный лог
+    (INFO — каждый запрос, WARNING — медленные запросы и повторы SQL)
+    и копит гистограммы по маршрутам для эндпоинта /api/v1/profiling/.
+    """
+
+    def __init__(self, get_response):
+        if not settings.PROFILING_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        profile = Profile()
+        with profile.start():
+            response = self.get_response(request)
+        total = time.perf_counter() - profile.started
+
+        match = request.resolver_match
+        route = match.view_name if match else 'unresolved'
+        size = None if response.streaming else len(response.content)
+        duplicates = profile.duplicates()
+        route_stats.add(route, total, profile, size, bool(duplicates))
+        if settings.PROFILING_SERVER_TIMING:
+            response['Server-Timing'] = (
+                f'total;dur={ms(total)}, '
+                f'sql;dur={ms(profile.sql_time)};'
+                f'desc="{profile.queries} queries", '
+                f'serializer;dur={ms(profile.serializer_time)}'
+            )
+        self.log(request, response, route, total, profile, size, duplicates)
+        return response
+
+    @staticmethod
+    def log(request, response, route, total, profile, size, duplicates):
+        slow = total * 1000 >= settings.PROFILING_SLOW_REQUEST_MS
+        level = (
+            logging.WARNING if slow or duplicates or profile.slow_queries
+            else logging.INFO
+        )
+        if not logger.isEnabledFor(level):
+            return
+        record = {
+            'method': request.method,
+            'path': request.path,
+            'view': route,
+            'status': response.status_code,
+            'total_ms': ms(total),
+            'queries': profile.queries,
+            'sql_ms': ms(profile.sql_time),
+            'serializer_ms': ms(profile.serializer_time),
+            'bytes': size,
+        }
+        if duplicates:
+            record['duplicate_queries'] = [
+                {'sql': sql, 'count': count}
+                for sql, count in duplicates.items()
+            ]
+        if profile.slow_queries:
+            record['slow_queries'] = [
+                {'sql': sql, 'ms': duration}
+                for sql, duration in profile.slow_queries
+            ]
+        logger.log(level, json.dumps(record, ensure_ascii=False))
@@ -0,0 +1,308 @@
+import hashlib
+
+from api.cache import get_cache, get_version, response_key
+from api.fastread import compile_plan
+from api.profiling import serialization_timer
+from api.routing import may_read_stale
+from api.signals import CACHE_DEPENDENCIES, invalidate_on_commit
+from django.conf import settings
+from django.core import exceptions
+from django.db import transaction
+from django.db.models import Count, Max
+from django.shortcuts import get_object_or_404
+from django.utils.cache import get_conditional_response
+from django.utils.functional import cached_property
+from django.utils.http import quote_etag
+from rest_framework import serializers, status
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.relations import ManyRelatedField, PrimaryKeyRelatedField
+from rest_framework.response import Response
+
+
+class EagerLoadingMixin:
+    """Подгружает связанные объекты, которые выводит сериализатор.
+
+    Набор select_related/prefetch_related вычисляется по полям
+    сериализатора текущего действия, поэтому список и детальный просмотр
+    стоят фиксированное число запросов при любом размере страницы.
+    """
+
+    _eager_loading_cache = {}
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        select_related, prefetch_related = self.get_eager_loading()
+        if select_related:
+            queryset = queryset.select_related(*select_related)
+        return queryset.prefetch_related(*prefetch_related)
+
+    def get_eager_loading(self):
+        serializer_class = self.get_serializer_class()
+        if serializer_class not in self._eager_loading_cache:
+            self._eager_loading_cache[serializer_class] = (
+                self._plan_eager_loading(serializer_class())
+            )
+        return self._eager_loading_cache[serializer_class]
+
+    @staticmethod
+    def _plan_eager_loading(serializer):
+        select_related, prefetch_related = [], []
+        for field in serializer.fields.values():
+            if field.write_only or field.source == '*':
+                continue
+            lookup = field.source.replace('.', '__')
+            if isinstance(field, (serializers.ListSerializer,
+                                  ManyRelatedField)):
+                prefetch_related.append(lookup)
+            elif isinstance(field, serializers.BaseSerializer):
+                select_related.append(lookup)
+            elif (isinstance(field, serializers.RelatedField)
+                  and not isinstance(field, PrimaryKeyRelatedField)):
+                select_related.append(lookup)
+        return tuple(select_related), tuple(prefetch_related)
+
+
+class FastReadMixin:
+    """Списки без экземпляров моделей и сериализаторов (api.fastread).
+
+    Страница читается через .values() по плану, собранному один раз по
+    полям сериализатора действия; ответ совпадает с обычным. Если план
+    не строится или API_FAST_READ выключен, работает сериализатор.
+    """
+
+    _read_plan_cache = {}
+
+    def list(self, request, *args, **kwargs):
+        return self.page_response(self.filter_queryset(self.get_queryset()))
+
+    def page_response(self, queryset):
+        plan = self.get_read_plan()
+        if plan is None:
+            page = self.paginate_queryset(queryset)
+            if page is None:
+                return Response(self.get_serializer(queryset, many=True).data)
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+        ordering = getattr(self.paginator, 'ordering', ())
+        rows = plan.values(
+            queryset, [name.lstrip('-') for name in ordering]
+        )
+        page = self.paginate_queryset(rows)
+        with serialization_timer():
+            data = plan.serialize(list(rows) if page is None else page)
+        if page is None:
+            return Response(data)
+        return self.get_paginated_response(data)
+
+    def get_read_plan(self):
+        if not settings.API_FAST_READ:
+            return None
+        serializer_class = self.get_serializer_class()
+        if serializer_class not in self._read_plan_cache:
+            self._read_plan_cache[serializer_class] = compile_plan(
+                serializer_class
+            )
+        return self._read_plan_cache[serializer_class]
+
+
+class NestedResourceMixin:
+    """Разрешает родителя вложенного ресурса не больше одного раза.
+
+    get_queryset фильтрует дочерние записи по ключам из URL одним
+    запросом. Сам родитель загружается только при создании записи или
+    когда страница пуста, чтобы отличить пустой список от отсутствующего
+    родителя (404).
+    """
+
+    def get_parent_queryset(self):
+        raise NotImplementedError(
+            'Определите get_parent_queryset() во вложенном представлении.'
+        )
+
+    @cached_property
+    def parent(self):
+        return get_object_or_404(self.get_parent_queryset())
+
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        if not page:
+            self.parent
+        return page
+
+
+class CachedResponseMixin:
+    """Кэширует данные ответов list (и retrieve через cached_response).
+
+    Ключ строится из адреса и параметров запроса внутри версионного
+    пространства cache_namespace; версия меняется сигналами при записи
+    связанных моделей (api.signals).
+    """
+
+    cache_namespace = None
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        cache = get_cache()
+        key = response_key(self.cache_namespace, request)
+        data = cache.get(key)
+        if data is not None:
+            return Response(data)
+        response = handler(request, *args, **kwargs)
+        if (response.status_code == 200
+                and not may_read_stale(self.cache_namespace)):
+            cache.set(key, response.data, settings.API_CACHE_TIMEOUT)
+        return response
+
+
+class ConditionalResponseError(Exception):
+    """Прерывает обработку запроса готовым ответом 304 или 412."""
+
+    def __init__(self, response):
+        super().__init__()
+        self.response = response
+
+
+class ConditionalResponseMixin:
+    """ETag для list/retrieve.
+
+    ETag строится из версии cache_namespace, которую меняет любая запись,
+    и адреса запроса. Если задан etag_state_field, к ним добавляется один
+    агрегатный запрос (число строк и максимум поля) по отфильтрованному
+    queryset; без него валидатор не обращается к базе. Совпадение
+    If-None-Match возвращает 304 до сериализации. Пока реплики могут
+    отставать от записи в cache_namespace, ETag не отдаётся.
+
+    Last-Modified не отдаётся: максимум даты публикации не меняется при
+    изменении и удалении записей, и If-Modified-Since давал бы
+    устаревшие 304.
+    """
+
+    cache_namespace = None
+    etag_state_field = 'pub_date'
+    conditional_actions = ('list', 'retrieve')
+    conditional_etag = None
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if (request.method not in ('GET', 'HEAD')
+                or self.action not in self.conditional_actions
+                or may_read_stale(self.cache_namespace)):
+            return
+        self.conditional_etag = self.get_etag(request)
+        response = get_conditional_response(
+            request, etag=self.conditional_etag
+        )
+        if response is not None:
+            raise ConditionalResponseError(response)
+
+    def handle_exception(self, exc):
+        if isinstance(exc, ConditionalResponseError):
+            return exc.response
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(
+            request, response, *args, **kwargs
+        )
+        if (self.conditional_etag is not None
+                and response.status_code in (200, 304)):
+            response['ETag'] = self.conditional_etag
+        return response
+
+    def get_etag(self, request):
+        version = get_version(self.cache_namespace)
+        source = f'{version}:{request.get_full_path()}'
+        if self.etag_state_field:
+            state = self.get_conditional_state()
+            source = f'{source}:{state["count"]}:{state["last"]}'
+        return quote_etag(hashlib.md5(source.encode('utf-8')).hexdigest())
+
+    def get_conditional_state(self):
+        queryset = self.filter_queryset(self.get_queryset())
+        if self.action == 'retrieve':
+            lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+            queryset = queryset.filter(
+                **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+            )
+        return queryset.order_by().aggregate(
+            count=Count('pk'), last=Max(self.etag_state_field)
+        )
+
+
+class BulkWriteMixin:
+    """Пакетная запись: POST и PATCH списка объектов на <ресурс>/bulk/.
+
+    POST создаёт записи, PATCH частично изменяет записи, найденные по
+    bulk_lookup_field каждого элемента. Пачка пишется целиком или не
+    пишется вовсе; ошибки возвращаются списком по элементам.
+    """
+
+    bulk_lookup_field = 'id'
+
+    @action(detail=False, methods=['post', 'patch'], url_path='bulk')
+    def bulk(self, request):
+        data = request.data
+        if not isinstance(data, list):
+            raise ValidationError('Ожидается список объектов.')
+        if len(data) > settings.API_BULK_MAX_SIZE:
+            raise ValidationError(
+                f'В пачке не больше {settings.API_BULK_MAX_SIZE} объектов.'
+            )
+        if request.method == 'POST':
+            serializer = self.get_serializer(data=data, many=True)
+        else:
+            serializer = self.get_serializer(
+                self.get_bulk_instances(data), data=data, many=True,
+                partial=True,
+            )
+        serializer.is_valid(raise_exception=True)
+        with transaction.atomic():
+            objs = serializer.save()
+            self.perform_bulk_write(objs)
+        return Response(
+            serializer.data,
+            status=(status.HTTP_201_CREATED if request.method == 'POST'
+                    else status.HTTP_200_OK),
+        )
+
+    def get_bulk_instances(self, data):
+        """Загружает изменяемые записи одним запросом в порядке пачки."""
+        lookup = self.bulk_lookup_field
+        queryset = self.get_queryset()
+        keys = [
+            self.to_bulk_key(queryset.model, item.get(lookup))
+            if isinstance(item, dict) else None
+            for item in data
+        ]
+        found = {
+            str(getattr(obj, lookup)): obj
+            for obj in queryset.filter(
+                **{f'{lookup}__in': [key for key in keys if key is not None]}
+            )
+        }
+        errors = [
+            {} if key is not None and str(key) in found
+            else {lookup: ['Объект не найден.']}
+            for key in keys
+        ]
+        if any(errors):
+            raise ValidationError(errors)
+        return [found[str(key)] for key in keys]
+
+    def to_bulk_key(self, model, value):
+        """Ключ элемента пачки в типе поля; некорректный — None."""
+        if value is None:
+            return None
+        try:
+            return model._meta.get_field(self.bulk_lookup_field).to_python(
+                value
+            )
+        except (TypeError, ValueError, exceptions.ValidationError):
+            return None
+
+    def perform_bulk_write(self, objs):
+        """Пакетная запись не шлёт post_save: сбрасываем кэш сами."""
+        invalidate_on_commit(*CACHE_DEPENDENCIES[self.get_queryset().model])
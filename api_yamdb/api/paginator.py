@@ -1,7 +1,270 @@
-from rest_framework.pagination import PageNumberPagination
+import base64
+import json
+from collections import OrderedDict
 
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.paginator import EmptyPage, Page, PageNotAnInteger, Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination, _positive_int
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
 
-class CommentPagination(PageNumberPagination):
+
+def estimated_count(queryset):
+    """Оценка числа строк таблицы из pg_class.reltuples.
+
+    Только для запроса без условий на PostgreSQL и только для таблиц не
+    меньше API_COUNT_ESTIMATE_THRESHOLD строк; иначе None — считать
+    точно.
+    """
+    connection = connections[queryset.db]
+    query = queryset.query
+    if connection.vendor != 'postgresql' or query.where or query.distinct:
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT reltuples FROM pg_class WHERE oid = %s::regclass',
+            [queryset.model._meta.db_table],
+        )
+        row = cursor.fetchone()
+    if row is None or row[0] < settings.API_COUNT_ESTIMATE_THRESHOLD:
+        return None
+    return int(row[0])
+
+
+class EstimatedPage(Page):
+    """Страница, которая знает о следующей по лишней прочитанной строке."""
+
+    def __init__(self, object_list, number, paginator, has_more):
+        super().__init__(object_list, number, paginator)
+        self.has_more = has_more
+
+    def has_next(self):
+        return self.has_more
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator с приблизительным count для больших таблиц.
+
+    Если estimated_count дал оценку, номер страницы не ограничивается
+    числом страниц по оценке, а наличие следующей страницы определяется
+    по лишней строке, поэтому по ссылкам next проходятся все записи.
+    """
+
+    @cached_property
+    def estimate(self):
+        return estimated_count(self.object_list)
+
+    @cached_property
+    def count(self):
+        if self.estimate is None:
+            return super().count
+        return self.estimate
+
+    def validate_number(self, number):
+        if self.estimate is None:
+            return super().validate_number(number)
+        try:
+            if isinstance(number, float) and not number.is_integer():
+                raise ValueError
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger(_('That page number is not an integer'))
+        if number < 1:
+            raise EmptyPage(_('That page number is less than 1'))
+        return number
+
+    def page(self, number):
+        if self.estimate is None:
+            return super().page(number)
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        rows = list(self.object_list[bottom:bottom + self.per_page + 1])
+        return EstimatedPage(
+            rows[:self.per_page], number, self, len(rows) > self.per_page
+        )
+
+
+class PageSizePagination(PageNumberPagination):
+    """PageNumberPagination с размером страницы от клиента.
+
+    Размер задаётся параметром page_size или limit и ограничивается
+    max_page_size; неверное значение заменяется размером по умолчанию.
+    """
+
+    page_size_query_param = 'page_size'
+    limit_query_param = 'limit'
+    max_page_size = settings.API_MAX_PAGE_SIZE
+
+    def get_page_size(self, request):
+        for param in (self.page_size_query_param, self.limit_query_param):
+            if param in request.query_params:
+                try:
+                    return _positive_int(
+                        request.query_params[param],
+                        strict=True, cutoff=self.max_page_size,
+                    )
+                except ValueError:
+                    break
+        return self.page_size
+
+
+class KeysetPagination(PageSizePagination):
+    """Пагинатор с ключевым (курсорным) режимом по запросу.
+
+    Без параметра cursor работает как обычный PageNumberPagination.
+    С параметром cursor (пустым для первой страницы) страница выбирается
+    условием по полям ordering без OFFSET и без COUNT(*).
+    """
+
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Неверный курсор.'
+    ordering = ('-pub_date', '-id')
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_mode = self.cursor_query_param in request.query_params
+        if not self.cursor_mode:
+            if not queryset.query.order_by:
+                # Тот же порядок, что у курсора: страницы не пересекаются.
+                queryset = queryset.order_by(*self.ordering)
+            return super().paginate_queryset(queryset, request, view)
+        return self.paginate_by_cursor(queryset, request)
+
+    def paginate_by_cursor(self, queryset, request):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        page_size = self.get_page_size(request)
+        position, reverse = self.decode_cursor(request)
+        fields = [
+            (name.lstrip('-'), name.startswith('-')) for name in self.ordering
+        ]
+        if reverse:
+            fields = [(name, not descending) for name, descending in fields]
+        queryset = queryset.order_by(*[
+            f'-{name}' if descending else name for name, descending in fields
+        ])
+        if position is not None:
+            try:
+                queryset = queryset.filter(
+                    self.keyset_filter(queryset.model, fields, position)
+                )
+            except (ValidationError, TypeError, ValueError):
+                raise NotFound(self.invalid_cursor_message)
+
+        results = list(queryset[:page_size + 1])
+        has_more = len(results) > page_size
+        results = results[:page_size]
+        if reverse:
+            results.reverse()
+        self.set_positions(results, position, reverse, has_more)
+        return results
+
+    def set_positions(self, results, position, reverse, has_more):
+        self.next_position = self.previous_position = None
+        if not results:
+            return
+        if has_more or reverse:
+            self.next_position = self.get_position(results[-1])
+        if (has_more and reverse) or (position is not None and not reverse):
+            self.previous_position = self.get_position(results[0])
+
+    def get_paginated_response(self, data):
+        if not self.cursor_mode:
+            return super().get_paginated_response(data)
+        return Response(OrderedDict([
+            ('next', self.encode_cursor(self.next_position, reverse=False)),
+            ('previous', self.encode_cursor(
+                self.previous_position, reverse=True
+            )),
+            ('results', data),
+        ]))
+
+    def get_position(self, obj):
+        # Страница быстрого чтения (api.fastread) — строки .values().
+        if isinstance(obj, dict):
+            return [obj[name.lstrip('-')] for name in self.ordering]
+        return [
+            getattr(obj, name.lstrip('-')) for name in self.ordering
+        ]
+
+    @staticmethod
+    def keyset_filter(model, fields, position):
+        """Строит условие (a, b) > (x, y) с учётом направления полей."""
+        condition = Q()
+        for index, (name, descending) in enumerate(fields):
+            value = model._meta.get_field(name).to_python(position[index])
+            equal = {
+                fields[number][0]: model._meta.get_field(
+                    fields[number][0]
+                ).to_python(position[number])
+                for number in range(index)
+            }
+            lookup = 'lt' if descending else 'gt'
+            condition |= Q(**equal, **{f'{name}__{lookup}': value})
+        return condition
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            payload = json.loads(
+                base64.urlsafe_b64decode(encoded.encode('ascii'))
+            )
+            position, reverse = payload['p'], bool(payload['r'])
+            if (not isinstance(position, list)
+                    or len(position) != len(self.ordering)
+                    or not all(map(self.is_scalar, position))):
+                raise ValueError
+        except (TypeError, ValueError, KeyError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+        return position, reverse
+
+    @staticmethod
+    def is_scalar(value):
+        return value is None or isinstance(value, (str, int, float))
+
+    def encode_cursor(self, position, reverse):
+        if position is None:
+            return None
+        payload = json.dumps(
+            {'p': [self.dump_value(value) for value in position],
+             'r': int(reverse)}
+        )
+        encoded = base64.urlsafe_b64encode(payload.encode('ascii'))
+        url = remove_query_param(self.base_url, self.page_query_param)
+        return replace_query_param(
+            url, self.cursor_query_param, encoded.decode('ascii')
+        )
+
+    @staticmethod
+    def dump_value(value):
+        if hasattr(value, 'isoformat'):
+            return value.isoformat()
+        return value
+
+
+class ReviewPagination(KeysetPagination):
+    """Пагинатор для представления Review."""
+
+    page_size = 10
+    max_page_size = 200
+
+
+class CommentPagination(KeysetPagination):
     """Пагинатор для представления Comment."""
 
     page_size = 10
+    max_page_size = 200
+
+
+class TitlesPagination(KeysetPagination):
+    """Пагинатор для представления Titles."""
+
+    ordering = ('id',)
+    django_paginator_class = EstimatedCountPaginator
@@ -0,0 +1,185 @@
+"""Замеры запросов к API: время, SQL, сериализация, размер ответа.
+
+Профиль текущего запроса хранится в contextvar и заполняется обёрткой
+выполнения SQL (connection.execute_wrapper) и serialization_timer.
+Сводка по маршрутам копится в памяти процесса: запись — это несколько
+сложений под блокировкой, поэтому замеры можно держать включёнными.
+"""
+import bisect
+import threading
+import time
+from collections import Counter, deque
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+
+# Верхние границы корзин гистограммы, мс; последняя корзина — всё, что дольше.
+BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+_current = ContextVar('api_profile', default=None)
+
+
+def ms(seconds):
+    return round(seconds * 1000, 3)
+
+
+class Profile:
+    """Замеры одного запроса."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.sql_time = 0.0
+        self.serializer_time = 0.0
+        self.serializer_depth = 0
+        self.statements = Counter()
+        self.slow_queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.queries += 1
+            self.sql_time += elapsed
+            self.statements[sql] += 1
+            if elapsed * 1000 >= settings.PROFILING_SLOW_QUERY_MS:
+                self.slow_queries.append((sql, ms(elapsed)))
+
+    def duplicates(self):
+        """Повторы одного и того же SQL — признак N+1."""
+        threshold = settings.PROFILING_DUPLICATE_THRESHOLD
+        return {
+            sql: count for sql, count in self.statements.items()
+            if count >= threshold
+        }
+
+    def start(self):
+        """Включает замер SQL на всех подключениях, возвращает стек."""
+        stack = ExitStack()
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(self))
+        stack.callback(_current.reset, _current.set(self))
+        return stack
+
+
+@contextmanager
+def serialization_timer():
+    """Учитывает время блока как время сериализации в профиле запроса.
+
+    Засекается только внешний блок: вложенные входят в время внешнего.
+    """
+    profile = _current.get()
+    if profile is None or profile.serializer_depth:
+        yield
+        return
+    profile.serializer_depth += 1
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.serializer_time += time.perf_counter() - started
+        profile.serializer_depth -= 1
+
+
+class SerializerTimingMixin:
+    """Учитывает время to_representation в профиле запроса.
+
+    Засекается только внешний вызов: вложенные сериализаторы входят в
+    время родителя, а список — в сумму по своим элементам.
+    """
+
+    def to_representation(self, instance):
+        with serialization_timer():
+            return super().to_representation(instance)
+
+
+class RouteStats:
+    """Гистограммы времени ответа и средние значения по маршрутам."""
+
+    def __init__(self, slow_queries=50):
+        self.lock = threading.Lock()
+        self.routes = {}
+        self.slow_queries = deque(maxlen=slow_queries)
+
+    def add(self, route, total, profile, size, duplicated):
+        with self.lock:
+            stats = self.routes.get(route)
+            if stats is None:
+                stats = self.routes[route] = {
+                    'count': 0, 'total_ms': 0.0, 'max_ms': 0.0,
+                    'sql_ms': 0.0, 'queries': 0, 'serializer_ms': 0.0,
+                    'bytes': 0, 'duplicate_queries': 0,
+                    'buckets': [0] * (len(BUCKETS_MS) + 1),
+                }
+            total_ms = total * 1000
+            stats['count'] += 1
+            stats['total_ms'] += total_ms
+            stats['max_ms'] = max(stats['max_ms'], total_ms)
+            stats['sql_ms'] += profile.sql_time * 1000
+            stats['queries'] += profile.queries
+            stats['serializer_ms'] += profile.serializer_time * 1000
+            stats['bytes'] += size or 0
+            stats['duplicate_queries'] += duplicated
+            stats['buckets'][bisect.bisect_left(BUCKETS_MS, total_ms)] += 1
+            for sql, duration in profile.slow_queries:
+                self.slow_queries.append(
+                    {'route': route, 'sql': sql, 'ms': duration}
+                )
+
+    def reset(self):
+        with self.lock:
+            self.routes.clear()
+            self.slow_queries.clear()
+
+    def snapshot(self):
+        with self.lock:
+            routes = {
+                route: self.summarize(stats)
+                for route, stats in sorted(self.routes.items())
+            }
+            slow_queries = sorted(
+                self.slow_queries, key=lambda item: item['ms'], reverse=True
+            )
+        return {'routes': routes, 'slow_queries': slow_queries}
+
+    @staticmethod
+    def summarize(stats):
+        count = stats['count']
+        return {
+            'count': count,
+            'avg_ms': round(stats['total_ms'] / count, 3),
+            'max_ms': round(stats['max_ms'], 3),
+            'p50_ms': RouteStats.percentile(stats, 0.50),
+            'p95_ms': RouteStats.percentile(stats, 0.95),
+            'p99_ms': RouteStats.percentile(stats, 0.99),
+            'avg_sql_ms': round(stats['sql_ms'] / count, 3),
+            'avg_queries': round(stats['queries'] / count, 2),
+            'avg_serializer_ms': round(stats['serializer_ms'] / count, 3),
+            'avg_bytes': stats['bytes'] // count,
+            'duplicate_query_requests': stats['duplicate_queries'],
+            'histogram': dict(zip(
+                [f'<={bound}' for bound in BUCKETS_MS]
+                + [f'>{BUCKETS_MS[-1]}'],
+                stats['buckets'],
+            )),
+        }
+
+    @staticmethod
+    def percentile(stats, share):
+        """Верхняя граница корзины, в которую попал перцентиль.
+
+        Для последней, открытой корзины отдаётся максимум маршрута.
+        """
+        seen = 0
+        for bound, amount in zip(BUCKETS_MS, stats['buckets']):
+            seen += amount
+            if seen >= share * stats['count']:
+                return bound
+        return round(stats['max_ms'], 3)
+
+
+route_stats = RouteStats()
@@ -0,0 +1,71 @@
+"""JSON через orjson, если он установлен, иначе через стандартный json.
+
+Вывод совпадает с JSONRenderer DRF: компактный, в UTF-8, время в UTC с
+суффиксом Z, \\u2028 и \\u2029 экранированы. Отличается только запись
+float с показателем степени: orjson пишет 1e16 вместо 1e+16, значение
+при разборе то же. Даты orjson пишет сам, остальные типы (Decimal,
+ленивые строки, QuerySet) отдаёт кодировщику DRF.
+"""
+import codecs
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer на orjson.
+
+    С отступами (indent, в том числе в Browsable API), при выключенных
+    COMPACT_JSON или UNICODE_JSON и для данных, которые orjson не пишет
+    (ключи не строки, целые больше 64 бит), работает стандартный json.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if self.use_stdlib(data, accepted_media_type, renderer_context):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            content = orjson.dumps(
+                data, default=self.encoder_class().default,
+                option=orjson.OPT_UTC_Z,
+            )
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        # Как JSONRenderer: разделители строк экранируются для JavaScript.
+        return content.replace(
+            b'\xe2\x80\xa8', b'\\u2028'
+        ).replace(b'\xe2\x80\xa9', b'\\u2029')
+
+    def use_stdlib(self, data, accepted_media_type, renderer_context):
+        return (
+            orjson is None or data is None
+            or not self.compact or self.ensure_ascii
+            or self.get_indent(
+                accepted_media_type, renderer_context or {}
+            ) is not None
+        )
+
+
+class FastJSONParser(JSONParser):
+    """JSONParser на orjson для тел запросов в UTF-8.
+
+    orjson, как и JSONParser со STRICT_JSON, не принимает NaN и Infinity.
+    """
+
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        if orjson is None or codecs.lookup(encoding).name != 'utf-8':
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f'JSON parse error - {exc}')
@@ -0,0 +1,114 @@
+"""Чтение с реплик базы для безопасных запросов.
+
+ReplicaMiddleware разрешает чтение с реплик на время GET/HEAD/OPTIONS,
+ReplicaRouter выбирает для чтения случайную реплику из
+DATABASE_REPLICAS, запись всегда идёт в default. После изменяющего
+запроса клиент DATABASE_REPLICA_STICKY_SECONDS секунд читает с
+основной базы, чтобы увидеть свою запись, пока реплика догоняет:
+браузер — по cookie, клиент API — по своему токену (ключ в кэше).
+"""
+import hashlib
+import random
+from contextvars import ContextVar
+
+from api.cache import get_cache, is_settling
+from api.db import check_connection
+from django.conf import settings
+from rest_framework.permissions import SAFE_METHODS
+
+STICKY_COOKIE = 'yamdb_primary'
+
+_replica_allowed = ContextVar('replica_allowed', default=False)
+
+
+class ReplicaRouter:
+
+    """Выбирает базу и проверяет её соединение при первом обращении
+    запроса (api.db)."""
+
+    def db_for_read(self, model, **hints):
+        if settings.DATABASE_REPLICAS and _replica_allowed.get():
+            alias = random.choice(settings.DATABASE_REPLICAS)
+            check_connection(alias)
+            return alias
+        check_connection()
+        return None
+
+    def db_for_write(self, model, **hints):
+        check_connection()
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Реплики — копии default: связи между ними допустимы.
+        return True
+
+
+def may_read_stale(namespace):
+    """Читает ли запрос с реплики, отстающей от недавней записи в
+    namespace. Такой ответ не кэшируется и не получает ETag."""
+    return (
+        bool(settings.DATABASE_REPLICAS) and _replica_allowed.get()
+        and is_settling(namespace)
+    )
+
+
+def allow_replica(content):
+    """Отдаёт потоковый ответ, читая данные с реплики."""
+    token = _replica_allowed.set(True)
+    try:
+        yield from content
+    finally:
+        _replica_allowed.reset(token)
+
+
+class ReplicaMiddleware:
+    """Включает чтение с реплик для безопасных запросов и закрепляет
+    клиента за основной базой после его записи."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.DATABASE_REPLICAS:
+            return self.get_response(request)
+        if request.method not in SAFE_METHODS:
+            response = self.get_response(request)
+            if response.status_code < 400:
+                self.stick(request, response)
+            return response
+        if self.is_sticky(request):
+            return self.get_response(request)
+        token = _replica_allowed.set(True)
+        try:
+            response = self.get_response(request)
+        finally:
+            _replica_allowed.reset(token)
+        if response.streaming:
+            response.streaming_content = allow_replica(
+                response.streaming_content
+            )
+        return response
+
+    @staticmethod
+    def token_key(request):
+        authorization = request.META.get('HTTP_AUTHORIZATION')
+        if not authorization:
+            return None
+        digest = hashlib.sha256(authorization.encode()).hexdigest()
+        return f'api:replica:sticky:{digest}'
+
+    def is_sticky(self, request):
+        if STICKY_COOKIE in request.COOKIES:
+            return True
+        key = self.token_key(request)
+        return key is not None and get_cache().get(key) is not None
+
+    def stick(self, request, response):
+        seconds = settings.DATABASE_REPLICA_STICKY_SECONDS
+        response.set_cookie(
+            STICKY_COOKIE, '1', max_age=seconds, httponly=True,
+            samesite='Lax',
+        )
+        key = self.token_key(request)
+        if key is not None:
+            get_cache().set(key, True, seconds)
@@ -1,34 +1,207 @@
 
 import datetime as dt
 
+from api.profiling import SerializerTimingMixin
+from django.conf import settings
+from django.db import connection
+from django.db.models import prefetch_related_objects
 from rest_framework import serializers
-from rest_framework.relations import SlugRelatedField
-from reviews.models import Category, Comment, Genre, Review, Title
+from rest_framework.relations import ManyRelatedField, SlugRelatedField
+from rest_framework.validators import UniqueValidator
+from reviews.models import Category, Comment, Genre, Review, Title, TitleStats
 
 
-class GenresSerializer(serializers.ModelSerializer):
+class BatchSlugRelatedField(SlugRelatedField):
+    """SlugRelatedField, который при пакетной записи берёт объекты из
+    словаря, заранее загруженного BulkListSerializer."""
+
+    def to_internal_value(self, data):
+        objects = self.context.get('slug_objects', {}).get(
+            (self.queryset.model, self.slug_field)
+        )
+        if objects is None:
+            return super().to_internal_value(data)
+        try:
+            return objects[data]
+        except KeyError:
+            self.fail('does_not_exist', slug_name=self.slug_field, value=data)
+        except TypeError:
+            self.fail('invalid')
+
+
+class BulkListSerializer(serializers.ListSerializer):
+    """Пакетное создание и изменение записей фиксированным числом запросов.
+
+    Объекты по slug загружаются одним запросом на поле, уникальность
+    проверяется одним запросом на поле для всей пачки, записи пишутся
+    через bulk_create/bulk_update. Ошибки возвращаются списком по
+    элементам пачки.
+    """
+
+    def get_model(self):
+        return self.child.Meta.model
+
+    def get_unique_fields(self):
+        """Поля с UniqueValidator: их проверка переносится на пачку."""
+        unique_fields = []
+        for name, field in self.child.fields.items():
+            validators = [
+                validator for validator in field.validators
+                if not isinstance(validator, UniqueValidator)
+            ]
+            if len(validators) != len(field.validators):
+                field.validators = validators
+                unique_fields.append(name)
+        return unique_fields
+
+    def to_internal_value(self, data):
+        unique_fields = self.get_unique_fields()
+        if isinstance(data, list):
+            self.load_slug_objects(data)
+        validated_data = super().to_internal_value(data)
+        self.check_unique(validated_data, unique_fields)
+        return validated_data
+
+    def load_slug_objects(self, data):
+        objects = self._context.setdefault('slug_objects', {})
+        for name, field in self.child.fields.items():
+            many = isinstance(field, ManyRelatedField)
+            relation = field.child_relation if many else field
+            if not isinstance(relation, BatchSlugRelatedField):
+                continue
+            values = set()
+            for item in data:
+                value = item.get(name) if isinstance(item, dict) else None
+                for slug in (value if many else [value]) or ():
+                    if isinstance(slug, str):
+                        values.add(slug)
+            key = (relation.queryset.model, relation.slug_field)
+            objects[key] = {
+                getattr(obj, relation.slug_field): obj
+                for obj in relation.get_queryset().filter(
+                    **{f'{relation.slug_field}__in': values}
+                )
+            }
+
+    def check_unique(self, validated_data, unique_fields):
+        model = self.get_model()
+        instances = self.instance or []
+        errors = [{} for _ in validated_data]
+        for name in unique_fields:
+            values = [attrs.get(name) for attrs in validated_data]
+            taken = set(model.objects.filter(
+                **{f'{name}__in': [value for value in values if value]}
+            ).exclude(
+                pk__in=[instance.pk for instance in instances]
+            ).values_list(name, flat=True))
+            seen = set()
+            for index, value in enumerate(values):
+                if value is None:
+                    continue
+                if value in taken or value in seen:
+                    errors[index][name] = [
+                        f'Значение {value} поля {name} уже занято.'
+                    ]
+                seen.add(value)
+        if any(errors):
+            raise serializers.ValidationError(errors)
+
+    def split_relations(self, validated_data):
+        many_to_many = [
+            field.name for field in self.get_model()._meta.many_to_many
+        ]
+        relations = [
+            {name: attrs.pop(name) for name in many_to_many if name in attrs}
+            for attrs in validated_data
+        ]
+        return many_to_many, relations
+
+    def create(self, validated_data):
+        model = self.get_model()
+        many_to_many, relations = self.split_relations(validated_data)
+        objs = [model(**attrs) for attrs in validated_data]
+        if connection.features.can_return_ids_from_bulk_insert:
+            model.objects.bulk_create(objs)
+        else:
+            # Без id новых строк связи не записать: сохраняем по одной.
+            for obj in objs:
+                obj.save()
+        self.write_relations(objs, relations, replace=False)
+        prefetch_related_objects(objs, *many_to_many)
+        return objs
+
+    def update(self, instances, validated_data):
+        model = self.get_model()
+        many_to_many, relations = self.split_relations(validated_data)
+        fields = set()
+        for instance, attrs in zip(instances, validated_data):
+            for name, value in attrs.items():
+                setattr(instance, name, value)
+            fields.update(attrs)
+        if fields:
+            model.objects.bulk_update(instances, fields)
+        self.write_relations(instances, relations, replace=True)
+        for instance, related in zip(instances, relations):
+            # Экземпляры пришли из queryset с prefetch_related: без сброса
+            # prefetch_related_objects оставит в ответе старые связи.
+            cache = getattr(instance, '_prefetched_objects_cache', {})
+            for name in related:
+                cache.pop(name, None)
+        prefetch_related_objects(instances, *many_to_many)
+        return instances
+
+    def write_relations(self, objs, relations, replace):
+        """Пишет строки промежуточных таблиц одним bulk_create на поле."""
+        model = self.get_model()
+        for name in {name for related in relations for name in related}:
+            field = model._meta.get_field(name)
+            through = field.remote_field.through
+            source = field.m2m_field_name()
+            target = field.m2m_reverse_field_name()
+            changed = [
+                obj.pk for obj, related in zip(objs, relations)
+                if name in related
+            ]
+            if replace:
+                through.objects.filter(
+                    **{f'{source}__in': changed}
+                ).delete()
+            # Повторы в списке одного объекта пишутся одной строкой,
+            # как в RelatedManager.set().
+            through.objects.bulk_create(
+                through(**{f'{source}_id': obj.pk, f'{target}_id': pk})
+                for obj, related in zip(objs, relations)
+                for pk in dict.fromkeys(
+                    value.pk for value in related.get(name, ())
+                )
+            )
+
+
+class GenresSerializer(SerializerTimingMixin, serializers.ModelSerializer):
     """Жанры, описание."""
 
     class Meta:
         model = Genre
         fields = ('name', 'slug')
+        list_serializer_class = BulkListSerializer
 
 
-class CategoriesSerializer(serializers.ModelSerializer):
+class CategoriesSerializer(SerializerTimingMixin, serializers.ModelSerializer):
     """Категории, описание."""
 
     class Meta:
         model = Category
         fields = ('name', 'slug')
+        list_serializer_class = BulkListSerializer
 
 
-class TitlesSerializer(serializers.ModelSerializer):
+class TitlesSerializer(SerializerTimingMixin, serializers.ModelSerializer):
     """Основной метод записи информации."""
 
-    category = serializers.SlugRelatedField(
+    category = BatchSlugRelatedField(
         slug_field='slug', many=False, queryset=Category.objects.all()
     )
-    genre = serializers.SlugRelatedField(
+    genre = BatchSlugRelatedField(
         slug_field='slug',
         many=True,
         required=False,
@@ -36,8 +209,11 @@ class TitlesSerializer(serializers.ModelSerializer):
     )
 
     class Meta:
-        fields = '__all__'
+        exclude = (
+            'rating_sum', 'rating_count', 'rating', 'trend', 'search_vector'
+        )
         model = Title
+        list_serializer_class = BulkListSerializer
 
     def validate_year(self, value):
         current_year = dt.date.today().year
@@ -46,12 +222,14 @@ class TitlesSerializer(serializers.ModelSerializer):
         return value
 
 
-class TitlesViewSerializer(serializers.ModelSerializer):
+class TitlesViewSerializer(SerializerTimingMixin, serializers.ModelSerializer):
     """Основной метод получения информации."""
 
     category = CategoriesSerializer(many=False, required=True)
     genre = GenresSerializer(many=True, required=False)
     rating = serializers.IntegerField()
+    # Число видимых отзывов уже хранится в rating_count.
+    review_count = serializers.IntegerField(source='rating_count')
 
     class Meta:
         fields = (
@@ -59,6 +237,7 @@ class TitlesViewSerializer(serializers.ModelSerializer):
             'name',
             'year',
             'rating',
+            'review_count',
             'description',
             'genre',
             'category'
@@ -69,13 +248,25 @@ class TitlesViewSerializer(serializers.ModelSerializer):
             'name',
             'year',
             'rating',
+            'review_count',
             'description',
             'genre',
             'category'
         )
 
 
-class ReviewSerializer(serializers.ModelSerializer):
+class TitleStatsSerializer(SerializerTimingMixin,
+                           serializers.ModelSerializer):
+    """Статистика отзывов произведения."""
+
+    scores = serializers.DictField(child=serializers.IntegerField())
+
+    class Meta:
+        model = TitleStats
+        fields = ('title', 'review_count', 'scores', 'last_review_at')
+
+
+class ReviewSerializer(SerializerTimingMixin, serializers.ModelSerializer):
     """Ревью для произведений"""
 
     author = serializers.SlugRelatedField(
@@ -85,7 +276,7 @@ class ReviewSerializer(serializers.ModelSerializer):
     )
 
     class Meta:
-        fields = '__all__'
+        exclude = ('is_hidden',)
         model = Review
         read_only_fields = ('title',)
 
@@ -95,7 +286,9 @@ class ReviewSerializer(serializers.ModelSerializer):
                 self.context['request'].parser_context['kwargs']['title_id']
             )
             user = self.context['request'].user
-            if user.reviews.filter(title_id=title_id).exists():
+            if Review.objects.filter(
+                author_id=user.id, title_id=title_id
+            ).exists():
                 raise serializers.ValidationError(
                     'Нельзя оставить отзыв на одно произведение дважды'
                 )
@@ -107,7 +300,7 @@ class ReviewSerializer(serializers.ModelSerializer):
         return value
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(SerializerTimingMixin, serializers.ModelSerializer):
     """Комментарии на отзывы"""
 
     author = SlugRelatedField(slug_field='username', read_only=True)
@@ -115,3 +308,66 @@ class CommentSerializer(serializers.ModelSerializer):
     class Meta:
         model = Comment
         fields = ('id', 'text', 'author', 'pub_date')
+
+
+class ModerationSerializer(serializers.Serializer):
+    """Массовая модерация: действие и условия отбора записей."""
+
+    ACTIONS = ('delete', 'hide', 'unhide')
+    TARGETS = ('reviews', 'comments')
+    SELECTORS = ('ids', 'author', 'title', 'since', 'until')
+
+    action = serializers.ChoiceField(choices=ACTIONS)
+    target = serializers.ChoiceField(choices=TARGETS)
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        required=False,
+        allow_empty=False,
+        max_length=settings.API_BULK_MAX_SIZE,
+    )
+    author = serializers.CharField(required=False)
+    title = serializers.IntegerField(required=False, min_value=1)
+    since = serializers.DateTimeField(required=False)
+    until = serializers.DateTimeField(required=False)
+
+    def validate(self, data):
+        if not any(name in data for name in self.SELECTORS):
+            raise serializers.ValidationError(
+                'Укажите хотя бы одно условие: '
+                + ', '.join(self.SELECTORS)
+            )
+        if (
+            'since' in data and 'until' in data
+            and data['since'] > data['until']
+        ):
+            raise serializers.ValidationError(
+                'Начало периода позже его конца'
+            )
+        return data
+
+    def get_queryset(self):
+        """Отбирает записи одним запросом по условиям из данных."""
+        data = self.validated_data
+        if data['target'] == 'reviews':
+            queryset = Review.objects.all()
+            title_field = 'title_id'
+        else:
+            queryset = Comment.objects.all()
+            title_field = 'review__title_id'
+        lookups = {
+            'ids': 'pk__in',
+            'author': 'author__username',
+            'title': title_field,
+            'since': 'pub_date__gte',
+            'until': 'pub_date__lt',
+        }
+        return queryset.filter(**{
+            lookup: data[name]
+            for name, lookup in lookups.items() if name in data
+        })
+
+
+class ExportSerializer(serializers.Serializer):
+    """Параметры выгрузки: с since — только записи не старше этой даты."""
+
+    since = serializers.DateTimeField(required=False)
@@ -0,0 +1,40 @@
+from functools import partial
+
+from api.cache import invalidate
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from reviews.models import Category, Comment, Genre, GenreTitle, Review, Title
+from users.models import User
+
+# Какие закэшированные ответы и ETag зависят от модели.
+CACHE_DEPENDENCIES = {
+    Title: ('titles',),
+    GenreTitle: ('titles',),
+    Review: ('titles', 'reviews'),
+    Comment: ('reviews',),
+    Genre: ('titles', 'genres'),
+    Category: ('titles', 'categories'),
+    # Отзывы и комментарии выводят username автора.
+    User: ('reviews',),
+}
+
+
+def invalidate_on_commit(*namespaces):
+    # До коммита параллельный запрос закэшировал бы старые данные
+    # уже под новой версией.
+    transaction.on_commit(partial(invalidate, *namespaces))
+
+
+def invalidate_cache(sender, **kwargs):
+    invalidate_on_commit(*CACHE_DEPENDENCIES[sender])
+
+
+def invalidate_genre_links(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        invalidate_on_commit('titles')
+
+
+for model in CACHE_DEPENDENCIES:
+    post_save.connect(invalidate_cache, sender=model)
+    post_delete.connect(invalidate_cache, sender=model)
+m2m_changed.connect(invalidate_genre_links, sender=Title.genre.through)
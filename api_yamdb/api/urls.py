@@ -1,6 +1,7 @@
-from api.views import (CategoriesViewSet, CommentViewSet, GenresViewSet,
+from api.views import (CategoriesViewSet, CommentViewSet, ExportView,
+                       GenresViewSet, ModerationView, ProfilingView,
                        ReviewViewSet, TitlesViewSet)
-from django.urls import include, path
+from django.urls import include, path, re_path
 from rest_framework.routers import DefaultRouter
 
 app_name = 'api'
@@ -21,6 +22,14 @@ router.register(
     basename='comments',
 )
 urlpatterns = [
+    re_path(
+        r'^v1/export/(?P<dataset>titles|reviews|comments)'
+        r'\.(?P<fmt>ndjson|csv)$',
+        ExportView.as_view(),
+        name='export',
+    ),
+    path('v1/moderation/', ModerationView.as_view(), name='moderation'),
+    path('v1/profiling/', ProfilingView.as_view(), name='profiling'),
     path('v1/', include(router.urls)),
     path('v1/', include('users.urls')),
 ]
@@ -1,37 +1,107 @@
+from api.export import CONTENT_TYPES, ExportContentNegotiation, export
 from api.filters import TitleFilter
-from api.paginator import CommentPagination
+from api.mixins import (BulkWriteMixin, CachedResponseMixin,
+                        ConditionalResponseMixin, EagerLoadingMixin,
+                        FastReadMixin, NestedResourceMixin)
+from api.paginator import CommentPagination, ReviewPagination, TitlesPagination
+from api.profiling import route_stats
 from api.serializers import (CategoriesSerializer, CommentSerializer,
-                             GenresSerializer, ReviewSerializer,
-                             TitlesSerializer, TitlesViewSerializer)
-from django.db.models import Avg
+                             ExportSerializer, GenresSerializer,
+                             ModerationSerializer, ReviewSerializer,
+                             TitlesSerializer, TitleStatsSerializer,
+                             TitlesViewSerializer)
+from api.signals import CACHE_DEPENDENCIES, invalidate_on_commit
+from django.db import transaction
+from django.db.models import Q
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import filters, mixins, viewsets
-from rest_framework.pagination import PageNumberPagination
-from rest_framework.permissions import IsAuthenticatedOrReadOnly
-from reviews.models import Category, Genre, Title
-from users.permissions import (IsAdminModeratorAuthorOrReadOnly,
+from rest_framework import filters, mixins, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import PermissionDenied
+from rest_framework.permissions import (IsAuthenticated,
+                                        IsAuthenticatedOrReadOnly)
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from reviews.models import Category, Comment, Genre, Review, Title, TitleStats
+from reviews.search import title_index
+from users.authentication import get_author
+from users.permissions import (IsAdmin, IsAdminModeratorAuthorOrReadOnly,
                                IsAdminOrReadOnly)
 
 
-class TitlesViewSet(viewsets.ModelViewSet):
+class TitlesViewSet(ConditionalResponseMixin, CachedResponseMixin,
+                    EagerLoadingMixin, BulkWriteMixin, FastReadMixin,
+                    viewsets.ModelViewSet):
     """Описание логики работы АПИ для эндпоинта Titles."""
 
-    queryset = Title.objects.annotate(rating=Avg('reviews__score'))
+    queryset = Title.objects.all()
     serializer_class = TitlesSerializer
     permission_classes = [IsAdminOrReadOnly]
-    pagination_class = PageNumberPagination
-    filterset_class = TitleFilter
+    pagination_class = TitlesPagination
     filter_backends = (DjangoFilterBackend,)
     filterset_class = TitleFilter
+    cache_namespace = 'titles'
+    etag_state_field = None
+    conditional_actions = ('list', 'retrieve', 'top', 'trending')
+    # Условие и порядок готовых рейтингов, порядок совпадает с индексами
+    # title_top_idx и title_trend_idx.
+    leaderboards = {
+        'top': (Q(rating__isnull=False), ('-rating', '-rating_count', '-id')),
+        'trending': (Q(trend__gt=0), ('-trend', '-id')),
+    }
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+    @action(detail=False)
+    def top(self, request):
+        """Произведения с лучшим рейтингом."""
+        return self.cached_response(self.leaderboard, request)
+
+    @action(detail=False)
+    def trending(self, request):
+        """Произведения с самыми активными и высокими оценками за
+        последнее время."""
+        return self.cached_response(self.leaderboard, request)
+
+    @action(detail=True)
+    def stats(self, request, pk=None):
+        """Число отзывов, распределение оценок и время последнего отзыва."""
+        return self.cached_response(self.title_stats, request, pk=pk)
+
+    def title_stats(self, request, pk):
+        stats = TitleStats.objects.filter(title_id=pk).first()
+        if stats is None:
+            # Нет строки статистики — нет и отзывов.
+            stats = TitleStats(title=get_object_or_404(Title, pk=pk))
+        return Response(TitleStatsSerializer(stats).data)
+
+    def leaderboard(self, request):
+        condition, ordering = self.leaderboards[self.action]
+        queryset = self.filter_queryset(
+            self.get_queryset()
+        ).filter(condition).order_by(*ordering)
+        # Курсор тоже идёт по порядку рейтинга.
+        self.paginator.ordering = ordering
+        return self.page_response(queryset)
 
     def get_serializer_class(self):
-        if self.action in ['list', 'retrieve']:
+        if self.action in ['list', 'retrieve', 'top', 'trending']:
             return TitlesViewSerializer
         return TitlesSerializer
 
+    def perform_bulk_write(self, objs):
+        super().perform_bulk_write(objs)
+        for title in objs:
+            title_index.update(title)
+
 
 class ReviewGenreModelMixin(
+    CachedResponseMixin,
+    BulkWriteMixin,
     mixins.CreateModelMixin,
     mixins.ListModelMixin,
     mixins.DestroyModelMixin,
@@ -44,6 +114,7 @@ class ReviewGenreModelMixin(
     filter_backends = (filters.SearchFilter,)
     search_fields = ('name', 'slug')
     lookup_field = 'slug'
+    bulk_lookup_field = 'slug'
 
 
 class CategoriesViewSet(ReviewGenreModelMixin):
@@ -51,6 +122,7 @@ class CategoriesViewSet(ReviewGenreModelMixin):
 
     queryset = Category.objects.all()
     serializer_class = CategoriesSerializer
+    cache_namespace = 'categories'
 
 
 class GenresViewSet(ReviewGenreModelMixin):
@@ -58,45 +130,147 @@ class GenresViewSet(ReviewGenreModelMixin):
 
     queryset = Genre.objects.all()
     serializer_class = GenresSerializer
+    cache_namespace = 'genres'
 
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class ReviewViewSet(ConditionalResponseMixin, NestedResourceMixin,
+                    EagerLoadingMixin, FastReadMixin, viewsets.ModelViewSet):
     """Описание логики работы АПИ для эндпоинта Review."""
 
+    queryset = Review.objects.filter(is_hidden=False)
     serializer_class = ReviewSerializer
-    pagination_class = CommentPagination
+    pagination_class = ReviewPagination
     permission_classes = (IsAdminModeratorAuthorOrReadOnly,)
+    cache_namespace = 'reviews'
+
+    def get_parent_queryset(self):
+        return Title.objects.filter(id=self.kwargs.get('title_id'))
 
     def get_queryset(self):
-        title = get_object_or_404(Title, id=self.kwargs.get('title_id'))
-        # new_queryset = title.reviews.all()
-        return title.reviews.all()
+        return super().get_queryset().filter(
+            title_id=self.kwargs.get('title_id')
+        )
 
     def perform_create(self, serializer):
-        title = get_object_or_404(Title, id=self.kwargs.get('title_id'))
-        serializer.save(author=self.request.user, title=title)
+        serializer.save(
+            author=get_author(self.request.user), title=self.parent
+        )
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(ConditionalResponseMixin, NestedResourceMixin,
+                     EagerLoadingMixin, FastReadMixin,
+                     viewsets.ModelViewSet):
     """Описание логики работы АПИ для эндпоинта Comment."""
 
+    queryset = Comment.objects.filter(
+        is_hidden=False, review__is_hidden=False
+    )
     serializer_class = CommentSerializer
     pagination_class = CommentPagination
     permission_classes = (IsAdminModeratorAuthorOrReadOnly,)
+    cache_namespace = 'reviews'
+
+    def get_parent_queryset(self):
+        return Review.objects.filter(
+            id=self.kwargs.get('review_id'),
+            title_id=self.kwargs.get('title_id'),
+            is_hidden=False,
+        )
 
     def get_queryset(self):
-        title = get_object_or_404(Title, id=self.kwargs.get('title_id'))
-        try:
-            review = title.reviews.get(id=self.kwargs.get('review_id'))
-        except TypeError:
-            TypeError('У произведения нет такого отзыва')
-        # queryset = review.comments.all()
-        return review.comments.all()
+        return super().get_queryset().filter(
+            review_id=self.kwargs.get('review_id'),
+            review__title_id=self.kwargs.get('title_id'),
+        )
 
     def perform_create(self, serializer):
-        title = get_object_or_404(Title, id=self.kwargs.get('title_id'))
-        try:
-            review = title.reviews.get(id=self.kwargs.get('review_id'))
-        except TypeError:
-            TypeError('У произведения нет такого отзыва')
-        serializer.save(author=self.request.user, review=review)
+        serializer.save(
+            author=get_author(self.request.user), review=self.parent
+        )
+
+
+class ModerationView(APIView):
+    """Массовое удаление или скрытие отзывов и комментариев.
+
+    Записи отбираются одним запросом по списку id, автору, произведению
+    и периоду. Права проверяются там же: пользователь без роли
+    модератора или админа затрагивает только свои записи и может их
+    лишь удалить.
+    """
+
+    permission_classes = (IsAuthenticated,)
+
+    def post(self, request):
+        serializer = ModerationSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        queryset = serializer.get_queryset()
+        user = request.user
+        if not (user.is_admin or user.is_moderator):
+            if data['action'] != 'delete':
+                raise PermissionDenied(
+                    'Скрывать записи может только модератор.'
+                )
+            queryset = queryset.filter(author_id=user.id)
+        with transaction.atomic():
+            counts = self.moderate(queryset, data['action'])
+            invalidate_on_commit(*CACHE_DEPENDENCIES[queryset.model])
+        return Response({
+            'action': data['action'],
+            'target': data['target'],
+            **counts,
+        })
+
+    @staticmethod
+    def moderate(queryset, action):
+        """Выполняет действие, возвращает число затронутых записей."""
+        if action == 'delete' and queryset.model is Review:
+            reviews, comments = queryset.delete_moderated()
+            return {'reviews': reviews, 'comments': comments}
+        if action == 'delete':
+            affected = queryset.delete_moderated()
+        else:
+            affected = queryset.set_hidden(action == 'hide')
+        if queryset.model is Review:
+            return {'reviews': affected, 'comments': 0}
+        return {'reviews': 0, 'comments': affected}
+
+
+class ExportView(APIView):
+    """Потоковая выгрузка произведений, отзывов или комментариев.
+
+    Формат задаётся расширением в адресе (ndjson или csv), параметр
+    since оставляет только записи, опубликованные начиная с этой даты.
+    """
+
+    permission_classes = (IsAdmin,)
+    content_negotiation_class = ExportContentNegotiation
+
+    def get(self, request, dataset, fmt):
+        serializer = ExportSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        response = StreamingHttpResponse(
+            export(dataset, fmt, serializer.validated_data.get('since')),
+            content_type=CONTENT_TYPES[fmt],
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="{dataset}.{fmt}"'
+        )
+        return response
+
+
+class ProfilingView(APIView):
+    """Сводка замеров ProfilingMiddleware по маршрутам (только админ).
+
+    Данные собираются в памяти процесса, который обслужил запрос;
+    DELETE обнуляет сводку.
+    """
+
+    permission_classes = (IsAdmin,)
+
+    def get(self, request):
+        return Response(route_stats.snapshot())
+
+    def delete(self, request):
+        route_stats.reset()
+        return Response(status=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,14 @@
+"""ASGI-точка входа.
+
+Django 2.2 не поддерживает ASGI сам, поэтому WSGI-приложение
+оборачивается asgiref: каждый запрос выполняется в пуле потоков
+ASGI-сервера (например, воркера uvicorn в gunicorn).
+"""
+import os
+
+from asgiref.wsgi import WsgiToAsgi
+from django.core.wsgi import get_wsgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+
+application = WsgiToAsgi(get_wsgi_application())
@@ -38,6 +38,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.middleware.ProfilingMiddleware',
+    'api.routing.ReplicaMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -84,10 +86,88 @@ DATABASES = {
         'USER': os.getenv('POSTGRES_USER', default='postgres'),
         'PASSWORD': os.getenv('POSTGRES_PASSWORD', default='postgres'),
         'HOST': os.getenv('DB_HOST', default='db'),
-        'PORT': os.getenv('DB_PORT', default=5432)
+        'PORT': os.getenv('DB_PORT', default=5432),
+        # Соединение живёт между запросами потока (секунды, 0 — закрывать
+        # после каждого запроса).
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', default=60)),
+        # pgbouncer в режиме transaction не держит серверные курсоры
+        # между транзакциями.
+        'DISABLE_SERVER_SIDE_CURSORS': os.getenv('DB_PGBOUNCER', default='False') == 'True',
+    }
+}
+# Реплики только для чтения: хосты через запятую в DB_REPLICA_HOSTS, остальные
+# параметры как у default. Безопасные запросы читают со случайной реплики
+# (api.routing), клиент после записи DATABASE_REPLICA_STICKY_SECONDS секунд
+# читает с основной базы.
+DATABASE_REPLICAS = []
+for number, host in enumerate(filter(None, os.getenv('DB_REPLICA_HOSTS', default='').split(','))):
+    alias = f'replica_{number}'
+    DATABASES[alias] = dict(DATABASES['default'], HOST=host.strip(), TEST={'MIRROR': 'default'})
+    DATABASE_REPLICAS.append(alias)
+DATABASE_ROUTERS = ['api.routing.ReplicaRouter']
+DATABASE_REPLICA_STICKY_SECONDS = int(os.getenv('DB_REPLICA_STICKY_SECONDS', default=5))
+
+# Проверять постоянное соединение в начале запроса и переоткрывать
+# разорванное (перезапуск базы или pgbouncer), а не отдавать 500.
+DB_CONN_HEALTH_CHECKS = os.getenv('DB_CONN_HEALTH_CHECKS', default='True') == 'True'
+
+# Cache
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', default='yamdb'),
     }
 }
 
+# Кэш ответов каталога (произведения, жанры, категории)
+API_CACHE_ALIAS = 'default'
+API_CACHE_TIMEOUT = int(os.getenv('API_CACHE_TIMEOUT', default=300))
+
+# Списки произведений, отзывов и комментариев строятся из .values()
+# без сериализатора (api.fastread); ответ тот же
+API_FAST_READ = os.getenv('API_FAST_READ', default='True') == 'True'
+
+# Наибольший размер страницы, который клиент может запросить параметром
+# page_size или limit (пагинаторы api.paginator могут задать свой)
+API_MAX_PAGE_SIZE = int(os.getenv('API_MAX_PAGE_SIZE', default=100))
+
+# С какого числа строк (по статистике PostgreSQL) список произведений
+# без фильтров отдаёт приблизительный count вместо COUNT(*)
+API_COUNT_ESTIMATE_THRESHOLD = int(os.getenv('API_COUNT_ESTIMATE_THRESHOLD', default=100000))
+
+# Наибольшее число объектов в пакетной записи (<ресурс>/bulk/)
+API_BULK_MAX_SIZE = 1000
+
+# Строк, которые выгрузка (api.export) читает из базы за один раз
+EXPORT_CHUNK_SIZE = int(os.getenv('EXPORT_CHUNK_SIZE', default=2000))
+
+# Замеры запросов (api.middleware.ProfilingMiddleware)
+PROFILING_ENABLED = os.getenv('PROFILING_ENABLED', default='True') == 'True'
+PROFILING_SERVER_TIMING = True
+PROFILING_SLOW_REQUEST_MS = int(os.getenv('PROFILING_SLOW_REQUEST_MS', default=500))
+PROFILING_SLOW_QUERY_MS = int(os.getenv('PROFILING_SLOW_QUERY_MS', default=100))
+# Сколько одинаковых SQL за запрос считать признаком N+1
+PROFILING_DUPLICATE_THRESHOLD = 3
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'api.profiling': {
+            'handlers': ['console'],
+            'level': os.getenv('PROFILING_LOG_LEVEL', default='WARNING'),
+        },
+    },
+}
+
+# Тренды произведений: вес отзыва удваивается каждые TRENDING_HALF_LIFE_DAYS
+# от начала отсчёта (reviews.models.TrendEpoch), его переносит rebuild_ratings.
+TRENDING_HALF_LIFE_DAYS = float(os.getenv('TRENDING_HALF_LIFE_DAYS', default=7))
+
 # Password validation
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -131,10 +211,20 @@ MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 AUTH_USER_MODEL = 'users.User'
 
 REST_FRAMEWORK = {
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_PAGINATION_CLASS': 'api.paginator.PageSizePagination',
     'PAGE_SIZE': 5,
+    # orjson, если установлен; без него — стандартный json (api.renderers)
+    'DEFAULT_RENDERER_CLASSES': (
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'api.renderers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ),
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.authentication.ClaimsJWTAuthentication',
     )
 }
 
@@ -142,10 +232,22 @@ SIMPLE_JWT = {
     # Устанавливаем срок жизни токена
     'ACCESS_TOKEN_LIFETIME': timedelta(days=7),
     'AUTH_HEADER_TYPES': ('Bearer',),
+    'TOKEN_USER_CLASS': 'users.authentication.ClaimsUser',
 }
 
+# Сколько секунд версия токенов пользователя живёт в кэше: столько может
+# пройти до отзыва токенов в другом процессе при локальном кэше.
+TOKEN_VERSION_CACHE_TIMEOUT = int(os.getenv('TOKEN_VERSION_CACHE_TIMEOUT', default=60))
+
 # EMAIL emulation
 
 MAILING_EMAIL = 'Some@mail.ru'
-EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+EMAIL_BACKEND = os.getenv('EMAIL_BACKEND', default='django.core.mail.backends.filebased.EmailBackend')
+EMAIL_HOST = os.getenv('EMAIL_HOST', default='localhost')
+EMAIL_PORT = int(os.getenv('EMAIL_PORT', default=25))
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
+
+# Очередь писем (users.mail, команда send_mail_queue)
+MAIL_QUEUE_MAX_ATTEMPTS = int(os.getenv('MAIL_QUEUE_MAX_ATTEMPTS', default=5))
+# Задержка перед повтором в секундах, удваивается с каждой попыткой
+MAIL_QUEUE_RETRY_DELAY = int(os.getenv('MAIL_QUEUE_RETRY_DELAY', default=60))
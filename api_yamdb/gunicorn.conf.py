@@ -0,0 +1,40 @@
+"""Настройки gunicorn, задаются переменными окружения.
+
+По умолчанию — воркеры gthread: потоки воркера делят память процесса и
+постоянные соединения с базой (DB_CONN_MAX_AGE), медленный клиент или
+запрос не занимает весь процесс. Соединений с базой открывается до
+GUNICORN_WORKERS * GUNICORN_THREADS; при большем числе стоит поставить
+перед PostgreSQL pgbouncer (DB_PGBOUNCER=True).
+
+Несколько воркеров запускаются по умолчанию (2 × CPU + 1), только если
+задан общий кэш (CACHE_BACKEND не LocMemCache): версии кэша ответов,
+ETag, отзыв токенов и привязка к основной базе хранятся в кэше и в
+памяти отдельных процессов разошлись бы. С кэшем в памяти процесса
+по умолчанию запускается один воркер.
+
+Для ASGI-сервера: GUNICORN_APP=api_yamdb.asgi:application и
+GUNICORN_WORKER_CLASS=uvicorn.workers.UvicornWorker (нужен пакет uvicorn).
+"""
+import multiprocessing
+import os
+
+bind = os.getenv('GUNICORN_BIND', default='0.0.0.0:8000')
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', default='gthread')
+shared_cache = 'locmem' not in os.getenv('CACHE_BACKEND', default='locmem')
+workers = int(os.getenv(
+    'GUNICORN_WORKERS',
+    default=multiprocessing.cpu_count() * 2 + 1 if shared_cache else 1,
+))
+threads = int(os.getenv('GUNICORN_THREADS', default=4))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', default=30))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', default=30))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', default=5))
+# Перезапуск воркера после N запросов (со случайным разбросом, чтобы
+# воркеры не перезапускались одновременно) ограничивает рост памяти.
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', default=1000))
+max_requests_jitter = int(
+    os.getenv('GUNICORN_MAX_REQUESTS_JITTER', default=100)
+)
+preload_app = os.getenv('GUNICORN_PRELOAD', default='False') == 'True'
+accesslog = os.getenv('GUNICORN_ACCESS_LOG') or None
+errorlog = '-'
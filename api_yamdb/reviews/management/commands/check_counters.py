@@ -0,0 +1,67 @@
+from api.signals import CACHE_DEPENDENCIES, invalidate_on_commit
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+from reviews.models import Comment, Review, Title
+
+
+class Command(BaseCommand):
+    help = (
+        'Сверяет счётчики отзывов и оценок произведений и счётчики '
+        'комментариев отзывов с таблицами и выводит расхождения. С --fix '
+        'пересчитывает разошедшиеся строки.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--fix', action='store_true',
+            help='Пересчитать счётчики строк с расхождениями.',
+        )
+
+    def handle(self, *args, **options):
+        titles = self.drifted_titles()
+        reviews = self.drifted_reviews()
+        self.stdout.write(
+            f'Произведения с расхождениями: {len(titles)}, '
+            f'отзывы с расхождениями: {len(reviews)}'
+        )
+        if not titles and not reviews:
+            return
+        if not options['fix']:
+            raise CommandError('Счётчики разошлись с таблицами')
+        with transaction.atomic():
+            fixed = Title.objects.filter(pk__in=titles)
+            fixed.rebuild_rating()
+            fixed.rebuild_trend()
+            fixed.rebuild_stats()
+            Review.objects.filter(pk__in=reviews).rebuild_comment_count()
+            invalidate_on_commit(*CACHE_DEPENDENCIES[Review])
+        self.stdout.write(self.style.SUCCESS('Счётчики пересчитаны'))
+
+    @staticmethod
+    def drifted_titles():
+        reviews = Review.objects.filter(
+            title=OuterRef('pk'), is_hidden=False
+        ).order_by().values('title')
+        return list(Title.objects.annotate(
+            actual_count=Coalesce(Subquery(
+                reviews.annotate(total=Count('pk')).values('total')
+            ), 0),
+            actual_sum=Coalesce(Subquery(
+                reviews.annotate(total=Sum('score')).values('total')
+            ), 0),
+        ).exclude(
+            rating_count=F('actual_count'), rating_sum=F('actual_sum')
+        ).values_list('pk', flat=True))
+
+    @staticmethod
+    def drifted_reviews():
+        comments = Comment.objects.filter(
+            review=OuterRef('pk'), is_hidden=False
+        ).order_by().values('review')
+        return list(Review.objects.annotate(
+            actual=Coalesce(Subquery(
+                comments.annotate(total=Count('pk')).values('total')
+            ), 0),
+        ).exclude(comment_count=F('actual')).values_list('pk', flat=True))
@@ -0,0 +1,81 @@
+from itertools import islice
+
+from api.signals import CACHE_DEPENDENCIES, invalidate_on_commit
+from django.core.management.base import BaseCommand, CommandError
+from reviews.models import STATS_FIELDS, Title, TitleStats
+
+EMPTY = dict.fromkeys(STATS_FIELDS, 0)
+EMPTY['last_review_at'] = None
+
+
+class Command(BaseCommand):
+    help = (
+        'Сверяет TitleStats с таблицей отзывов и выводит расхождения. '
+        'С --fix пересчитывает статистику произведений с расхождениями.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--fix', action='store_true',
+            help='Пересчитать статистику произведений с расхождениями.',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Количество произведений, сверяемых за один раз.',
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('Размер пачки должен быть положительным')
+        title_ids = Title.objects.order_by('pk').values_list(
+            'pk', flat=True
+        ).iterator(chunk_size=options['batch_size'])
+        drifted = []
+        while True:
+            chunk = list(islice(title_ids, options['batch_size']))
+            if not chunk:
+                break
+            drifted.extend(self.check_chunk(chunk))
+        if not drifted:
+            self.stdout.write(self.style.SUCCESS('Расхождений нет'))
+            return
+        if not options['fix']:
+            raise CommandError(
+                f'Расхождения в статистике {len(drifted)} произведений'
+            )
+        for start in range(0, len(drifted), options['batch_size']):
+            Title.objects.filter(
+                pk__in=drifted[start:start + options['batch_size']]
+            ).rebuild_stats()
+        invalidate_on_commit(*CACHE_DEPENDENCIES[Title])
+        self.stdout.write(self.style.SUCCESS(
+            f'Статистика пересчитана для {len(drifted)} произведений'
+        ))
+
+    def check_chunk(self, chunk):
+        """Возвращает id произведений пачки, чья статистика разошлась."""
+        expected = {
+            row.pop('title_id'): row
+            for row in Title.objects.filter(pk__in=chunk).review_stats()
+        }
+        stored = {
+            row.pop('title_id'): row
+            for row in TitleStats.objects.filter(title_id__in=chunk).values(
+                'title_id', *STATS_FIELDS
+            )
+        }
+        drifted = []
+        for title_id in chunk:
+            want = expected.get(title_id, EMPTY)
+            have = stored.get(title_id, EMPTY)
+            fields = [
+                field for field in STATS_FIELDS
+                if want[field] != have[field]
+            ]
+            if fields:
+                drifted.append(title_id)
+                self.stdout.write(f'{title_id}: ' + ', '.join(
+                    f'{field} {have[field]} -> {want[field]}'
+                    for field in fields
+                ))
+        return drifted
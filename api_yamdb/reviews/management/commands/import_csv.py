@@ -0,0 +1,221 @@
+import csv
+import io
+import json
+import os
+import time
+from contextlib import contextmanager
+from itertools import islice
+
+from api.signals import CACHE_DEPENDENCIES, invalidate_on_commit
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import DatabaseError, connection, models, transaction
+from reviews.models import Category, Comment, Genre, GenreTitle, Review, Title
+from users.models import User
+
+CSV_FILES = (
+    ('users.csv', User),
+    ('category.csv', Category),
+    ('genre.csv', Genre),
+    ('titles.csv', Title),
+    ('genre_title.csv', GenreTitle),
+    ('review.csv', Review),
+    ('comments.csv', Comment),
+)
+PROGRESS_FILE = '.import_progress.json'
+
+
+@contextmanager
+def keep_file_dates(fields):
+    """Не даёт auto_now_add затереть даты, пришедшие из файла."""
+    toggled = [field for field in fields if getattr(field, 'auto_now_add',
+                                                    False)]
+    for field in toggled:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in toggled:
+            field.auto_now_add = True
+
+
+class Command(BaseCommand):
+    help = (
+        'Загружает данные из CSV-файлов пачками. Внешние ключи '
+        'записываются напрямую в *_id, каждая пачка пишется в отдельной '
+        'транзакции; после сбоя загрузку можно продолжить с --resume.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path',
+            default=os.path.join(settings.BASE_DIR, 'static', 'data'),
+            help='Каталог с CSV-файлами.',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=5000,
+            help='Количество строк в одной пачке.',
+        )
+        parser.add_argument(
+            '--resume', action='store_true',
+            help='Продолжить прерванную загрузку с последней пачки.',
+        )
+        parser.add_argument(
+            '--copy', action='store_true',
+            help='Загружать через COPY (только PostgreSQL).',
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        if not os.path.isdir(path):
+            raise CommandError(f'Каталог {path} не найден')
+        if options['batch_size'] < 1:
+            raise CommandError('Размер пачки должен быть положительным')
+        self.batch_size = options['batch_size']
+        self.use_copy = options['copy'] and connection.vendor == 'postgresql'
+        if options['copy'] and not self.use_copy:
+            self.stderr.write(
+                'COPY доступен только для PostgreSQL, используется '
+                'bulk_create'
+            )
+        self.progress_path = os.path.join(path, PROGRESS_FILE)
+        self.progress = self.load_progress() if options['resume'] else {}
+
+        imported_models = []
+        for filename, model in CSV_FILES:
+            file_path = os.path.join(path, filename)
+            if not os.path.exists(file_path):
+                self.stdout.write(f'{filename}: файл не найден, пропущен')
+                continue
+            self.import_file(file_path, filename, model)
+            imported_models.append(model)
+
+        self.reset_sequences(imported_models)
+        if Review in imported_models:
+            Title.objects.rebuild_rating()
+            Title.objects.rebuild_trend()
+            Title.objects.rebuild_stats()
+        if Comment in imported_models:
+            Review.objects.rebuild_comment_count()
+        invalidate_on_commit(*{
+            namespace for model in imported_models
+            for namespace in CACHE_DEPENDENCIES.get(model, ())
+        })
+        if os.path.exists(self.progress_path):
+            os.remove(self.progress_path)
+        self.stdout.write(self.style.SUCCESS('Загрузка завершена'))
+
+    def import_file(self, file_path, filename, model):
+        done = self.progress.get(filename, 0)
+        imported = 0
+        started = time.monotonic()
+        with open(file_path, encoding='utf-8', newline='') as csvfile:
+            reader = csv.DictReader(csvfile)
+            columns = self.get_columns(model, reader.fieldnames, filename)
+            rows = islice(reader, done, None)
+            while True:
+                chunk = list(islice(rows, self.batch_size))
+                if not chunk:
+                    break
+                objs = [self.build(model, columns, row) for row in chunk]
+                try:
+                    with transaction.atomic():
+                        self.write(model, objs, columns)
+                except (DatabaseError, ValueError) as error:
+                    raise CommandError(
+                        f'{filename}: ошибка в строках {done + 1}-'
+                        f'{done + len(chunk)}: {error}. Исправьте данные '
+                        f'и повторите загрузку с --resume'
+                    )
+                done += len(chunk)
+                imported += len(chunk)
+                self.progress[filename] = done
+                self.save_progress()
+        elapsed = time.monotonic() - started
+        rate = imported / elapsed if elapsed else imported
+        self.stdout.write(
+            f'{filename}: {imported} строк за {elapsed:.2f} с '
+            f'({rate:.0f} строк/с)'
+        )
+
+    @staticmethod
+    def get_columns(model, fieldnames, filename):
+        """Сопоставляет колонки файла полям модели (author -> author_id)."""
+        fields = {}
+        for field in model._meta.concrete_fields:
+            fields[field.name] = field
+            fields[field.attname] = field
+        unknown = set(fieldnames or ()) - set(fields)
+        if unknown:
+            raise CommandError(
+                f'{filename}: неизвестные колонки {", ".join(sorted(unknown))}'
+            )
+        return {column: fields[column] for column in fieldnames}
+
+    @staticmethod
+    def build(model, columns, row):
+        values = {}
+        for column, field in columns.items():
+            value = row[column]
+            if value == '' and not isinstance(field, (models.CharField,
+                                                      models.TextField)):
+                value = None
+            values[field.attname] = value
+        return model(**values)
+
+    def write(self, model, objs, columns):
+        with keep_file_dates(columns.values()):
+            if self.use_copy:
+                self.copy(model, objs)
+            else:
+                model.objects.bulk_create(objs)
+
+    @staticmethod
+    def copy(model, objs):
+        fields = [
+            field for field in model._meta.concrete_fields
+            if not (field.primary_key and objs[0].pk is None)
+        ]
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for obj in objs:
+            writer.writerow([
+                r'\N' if value is None else value
+                for value in (
+                    field.get_db_prep_save(
+                        field.pre_save(obj, add=True), connection
+                    )
+                    for field in fields
+                )
+            ])
+        buffer.seek(0)
+        quote = connection.ops.quote_name
+        column_list = ', '.join(quote(field.column) for field in fields)
+        with connection.cursor() as cursor:
+            cursor.copy_expert(
+                f'COPY {quote(model._meta.db_table)} ({column_list}) '
+                f"FROM STDIN WITH (FORMAT csv, NULL '\\N')",
+                buffer,
+            )
+
+    @staticmethod
+    def reset_sequences(imported_models):
+        """Сдвигает счётчики id после вставки строк с явными ключами."""
+        statements = connection.ops.sequence_reset_sql(
+            no_style(), imported_models
+        )
+        if statements:
+            with connection.cursor() as cursor:
+                for sql in statements:
+                    cursor.execute(sql)
+
+    def load_progress(self):
+        if not os.path.exists(self.progress_path):
+            return {}
+        with open(self.progress_path, encoding='utf-8') as file:
+            return json.load(file)
+
+    def save_progress(self):
+        with open(self.progress_path, 'w', encoding='utf-8') as file:
+            json.dump(self.progress, file)
@@ -0,0 +1,24 @@
+from api.signals import CACHE_DEPENDENCIES, invalidate_on_commit
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from reviews.models import Title, TrendEpoch
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает рейтинг, тренд и статистику отзывов всех '
+        'произведений по отзывам и переносит начало отсчёта трендов на '
+        'текущий момент. Запускается периодически (чтобы веса трендов не '
+        'переполнялись) и после смены TRENDING_HALF_LIFE_DAYS.'
+    )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            updated = Title.objects.rebuild_rating()
+            TrendEpoch.objects.restart()
+            Title.objects.rebuild_stats()
+            invalidate_on_commit(*CACHE_DEPENDENCIES[Title])
+        self.stdout.write(self.style.SUCCESS(
+            f'Рейтинг, тренд и статистика пересчитаны для {updated} '
+            f'произведений'
+        ))
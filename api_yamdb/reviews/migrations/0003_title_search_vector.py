@@ -0,0 +1,57 @@
+# Generated by Django 2.2.16 on 2026-10-18 18:11
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+FORWARD_SQL = """
+CREATE FUNCTION reviews_title_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('pg_catalog.russian',
+                              coalesce(NEW.name, '')), 'A')
+        || setweight(to_tsvector('pg_catalog.russian',
+                                 coalesce(NEW.description, '')), 'B');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER reviews_title_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF name, description ON reviews_title
+    FOR EACH ROW EXECUTE PROCEDURE reviews_title_search_vector_update();
+
+UPDATE reviews_title SET name = name;
+
+CREATE INDEX reviews_title_search_vector_gin
+    ON reviews_title USING gin (search_vector);
+"""
+
+BACKWARD_SQL = """
+DROP INDEX IF EXISTS reviews_title_search_vector_gin;
+DROP TRIGGER IF EXISTS reviews_title_search_vector_trigger ON reviews_title;
+DROP FUNCTION IF EXISTS reviews_title_search_vector_update();
+"""
+
+
+def run_on_postgresql(sql):
+    def operation(apps, schema_editor):
+        if schema_editor.connection.vendor == 'postgresql':
+            schema_editor.execute(sql)
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0002_title_rating'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True, verbose_name='Поисковый вектор'),
+        ),
+        migrations.RunPython(
+            run_on_postgresql(FORWARD_SQL), run_on_postgresql(BACKWARD_SQL)
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 2.2.16 on 2026-10-18 18:12
+
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def remove_duplicate_genres(apps, schema_editor):
+    GenreTitle = apps.get_model('reviews', 'GenreTitle')
+    duplicates = GenreTitle.objects.values('genre', 'title').annotate(
+        keep=Min('id'), total=Count('id')
+    ).filter(total__gt=1)
+    for duplicate in duplicates:
+        GenreTitle.objects.filter(
+            genre=duplicate['genre'], title=duplicate['title']
+        ).exclude(id=duplicate['keep']).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0003_title_search_vector'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            remove_duplicate_genres, migrations.RunPython.noop
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['review', '-pub_date', '-id'], name='comment_review_pub_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='genretitle',
+            index=models.Index(fields=['title', 'genre'], name='genretitle_title_genre_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['title', '-pub_date', '-id'], name='review_title_pub_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['year'], name='title_year_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='genretitle',
+            constraint=models.UniqueConstraint(fields=('genre', 'title'), name='unique_genre_title'),
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 2.2.16 on 2026-10-18 18:23
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Max
+
+
+def trend_weight(pub_date, epoch):
+    """Копия reviews.models.trend_weight на момент миграции."""
+    age = (pub_date - epoch).total_seconds()
+    return 2.0 ** (age / (settings.TRENDING_HALF_LIFE_DAYS * 86400))
+
+
+def fill_trend(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    Review = apps.get_model('reviews', 'Review')
+    # Отсчёт от последнего отзыва: веса не больше 1 и не переполняются.
+    # Миграция 0009 переносит отсчёт и пересчитывает тренды.
+    epoch = Review.objects.aggregate(last=Max('pub_date'))['last']
+    trends = {}
+    reviews = Review.objects.values_list('title_id', 'score', 'pub_date')
+    for title_id, score, pub_date in reviews.iterator():
+        trends[title_id] = (
+            trends.get(title_id, 0.0) + score * trend_weight(pub_date, epoch)
+        )
+    for title_id, trend in trends.items():
+        Title.objects.filter(pk=title_id).update(trend=trend)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0004_lookup_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='trend',
+            field=models.FloatField(default=0.0, editable=False, verbose_name='Тренд'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['-rating', '-rating_count', '-id'], name='title_top_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['-trend', '-id'], name='title_trend_idx'),
+        ),
+        migrations.RunPython(fill_trend, migrations.RunPython.noop),
+    ]
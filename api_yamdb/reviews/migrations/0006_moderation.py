@@ -0,0 +1,23 @@
+# Generated by Django 2.2.16 on 2026-10-18 18:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0005_title_trend'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='is_hidden',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.AddField(
+            model_name='review',
+            name='is_hidden',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+    ]
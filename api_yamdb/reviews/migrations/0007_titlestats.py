@@ -0,0 +1,56 @@
+# Generated by Django 2.2.16 on 2026-10-18 18:31
+
+from django.db import migrations, models
+from django.db.models import Count, Max, Q
+import django.db.models.deletion
+
+
+def fill_stats(apps, schema_editor):
+    Review = apps.get_model('reviews', 'Review')
+    TitleStats = apps.get_model('reviews', 'TitleStats')
+    rows = Review.objects.filter(is_hidden=False).order_by().values(
+        'title_id'
+    ).annotate(
+        review_count=Count('pk'),
+        last_review_at=Max('pub_date'),
+        **{
+            f'score_{score}': Count('pk', filter=Q(score=score))
+            for score in range(1, 11)
+        },
+    )
+    TitleStats.objects.bulk_create(
+        (TitleStats(**row) for row in rows.iterator()), batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0006_moderation'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TitleStats',
+            fields=[
+                ('title', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='reviews.Title')),
+                ('review_count', models.PositiveIntegerField(default=0)),
+                ('score_1', models.PositiveIntegerField(default=0)),
+                ('score_2', models.PositiveIntegerField(default=0)),
+                ('score_3', models.PositiveIntegerField(default=0)),
+                ('score_4', models.PositiveIntegerField(default=0)),
+                ('score_5', models.PositiveIntegerField(default=0)),
+                ('score_6', models.PositiveIntegerField(default=0)),
+                ('score_7', models.PositiveIntegerField(default=0)),
+                ('score_8', models.PositiveIntegerField(default=0)),
+                ('score_9', models.PositiveIntegerField(default=0)),
+                ('score_10', models.PositiveIntegerField(default=0)),
+                ('last_review_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Статистика отзывов',
+                'verbose_name_plural': 'Статистика отзывов',
+            },
+        ),
+        migrations.RunPython(fill_stats, migrations.RunPython.noop),
+    ]
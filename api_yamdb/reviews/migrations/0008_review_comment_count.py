@@ -0,0 +1,32 @@
+# Generated by Django 2.2.16 on 2026-10-18 18:37
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_comment_count(apps, schema_editor):
+    Review = apps.get_model('reviews', 'Review')
+    Comment = apps.get_model('reviews', 'Comment')
+    comments = Comment.objects.filter(
+        review=OuterRef('pk'), is_hidden=False
+    ).order_by().values('review')
+    Review.objects.update(comment_count=Coalesce(
+        Subquery(comments.annotate(total=Count('pk')).values('total')), 0
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0007_titlestats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='review',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество комментариев'),
+        ),
+        migrations.RunPython(fill_comment_count, migrations.RunPython.noop),
+    ]
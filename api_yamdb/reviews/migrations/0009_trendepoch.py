@@ -0,0 +1,56 @@
+# Generated by Django 2.2.16 on 2026-10-18 19:05
+
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def trend_weight(pub_date, epoch):
+    """Копия reviews.models.trend_weight на момент миграции."""
+    age = (pub_date - epoch).total_seconds()
+    return 2.0 ** (age / (settings.TRENDING_HALF_LIFE_DAYS * 86400))
+
+
+def restart_trend(apps, schema_editor):
+    TrendEpoch = apps.get_model('reviews', 'TrendEpoch')
+    Title = apps.get_model('reviews', 'Title')
+    Review = apps.get_model('reviews', 'Review')
+    db_alias = schema_editor.connection.alias
+    epoch = TrendEpoch.objects.using(db_alias).create(
+        pk=1, started_at=timezone.now()
+    )
+    trends = {}
+    reviews = Review.objects.using(db_alias).filter(
+        is_hidden=False
+    ).values_list('title_id', 'score', 'pub_date')
+    for title_id, score, pub_date in reviews.iterator():
+        trends[title_id] = (
+            trends.get(title_id, 0.0)
+            + score * trend_weight(pub_date, epoch.started_at)
+        )
+    titles = Title.objects.using(db_alias)
+    titles.update(trend=0.0)
+    for title_id, trend in trends.items():
+        titles.filter(pk=title_id).update(trend=trend)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0008_review_comment_count'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrendEpoch',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('started_at', models.DateTimeField(verbose_name='Начало отсчёта')),
+            ],
+            options={
+                'verbose_name': 'Начало отсчёта трендов',
+                'verbose_name_plural': 'Начало отсчёта трендов',
+            },
+        ),
+        migrations.RunPython(restart_trend, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 2.2.16 on 2026-10-18 19:10
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0009_trendepoch'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='comment',
+            name='review',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='comments', to='reviews.Review'),
+        ),
+        migrations.AlterField(
+            model_name='genretitle',
+            name='genre',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='reviews.Genre'),
+        ),
+        migrations.AlterField(
+            model_name='genretitle',
+            name='title',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='reviews.Title'),
+        ),
+        migrations.AlterField(
+            model_name='review',
+            name='title',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='reviews', to='reviews.Title'),
+        ),
+    ]
@@ -1,12 +1,38 @@
+from contextlib import contextmanager
+from itertools import islice
+
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.contrib.postgres.search import SearchVectorField
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
-from django.db.models import UniqueConstraint
+from django.db import models, transaction
+from django.db.models import (Case, Count, F, Max, OuterRef, Q, Subquery, Sum,
+                              UniqueConstraint, Value, When)
+from django.db.models.functions import Coalesce
+from django.utils import timezone
 
 from .validators import validate_year
 
 User = get_user_model()
 
+SCORES = range(1, 11)
+SCORE_FIELDS = tuple(f'score_{score}' for score in SCORES)
+STATS_FIELDS = ('review_count',) + SCORE_FIELDS + ('last_review_at',)
+
+
+def trend_weight(pub_date, epoch):
+    """Вес отзыва в трендах с прямым затуханием (forward decay).
+
+    Вес растёт вдвое каждые TRENDING_HALF_LIFE_DAYS от начала отсчёта
+    epoch (TrendEpoch). Деление суммы весов на вес текущего момента дало
+    бы затухающую оценку, но этот множитель общий для всех произведений,
+    поэтому порядок по сумме не меняется со временем и её можно обновлять
+    по одному отзыву. Чтобы веса не вышли за пределы float, rebuild_ratings
+    переносит начало отсчёта вперёд (TrendEpochQuerySet.restart).
+    """
+    age = (pub_date - epoch).total_seconds()
+    return 2.0 ** (age / (settings.TRENDING_HALF_LIFE_DAYS * 86400))
+
 
 class Category(models.Model):
     """Модель категории произведения."""
@@ -52,6 +78,109 @@ class Genre(models.Model):
         return self.name
 
 
+class TitleQuerySet(models.QuerySet):
+    """Операции с денормализованным рейтингом произведений."""
+
+    def change_rating(self, score_delta, count_delta, trend_delta=0.0):
+        """Атомарно сдвигает сумму и число оценок одним UPDATE.
+
+        Правая часть UPDATE вычисляется по старым значениям строки,
+        поэтому рейтинг и тренд пересчитываются в том же запросе.
+        """
+        return self.update(
+            rating_sum=F('rating_sum') + score_delta,
+            rating_count=F('rating_count') + count_delta,
+            rating=Case(
+                When(
+                    rating_count__gt=-count_delta,
+                    then=(
+                        (F('rating_sum') + score_delta)
+                        / (F('rating_count') + count_delta)
+                    ),
+                ),
+                default=Value(None),
+                output_field=models.PositiveSmallIntegerField(),
+            ),
+            # Без отзывов тренд обнуляется, не копя ошибку округления.
+            trend=Case(
+                When(
+                    rating_count__gt=-count_delta,
+                    then=F('trend') + trend_delta,
+                ),
+                default=Value(0.0),
+                output_field=models.FloatField(),
+            ),
+        )
+
+    def rebuild_rating(self):
+        """Пересчитывает рейтинг с нуля по таблице отзывов."""
+        reviews = Review.objects.filter(
+            title=OuterRef('pk'), is_hidden=False
+        ).order_by().values('title')
+        return self.update(
+            rating_sum=Coalesce(
+                Subquery(reviews.annotate(total=Sum('score')).values('total')),
+                0,
+            ),
+            rating_count=Coalesce(
+                Subquery(reviews.annotate(total=Count('pk')).values('total')),
+                0,
+            ),
+            rating=Subquery(
+                reviews.annotate(
+                    total=Sum('score') / Count('pk')
+                ).values('total')
+            ),
+        )
+
+    def rebuild_trend(self, batch_size=1000):
+        """Пересчитывает тренд с нуля по таблице отзывов."""
+        epoch = TrendEpoch.objects.current()
+        trends = {}
+        reviews = Review.objects.filter(
+            title__in=self.values('pk'), is_hidden=False
+        ).values_list('title_id', 'score', 'pub_date')
+        for title_id, score, pub_date in reviews.iterator():
+            trends[title_id] = (
+                trends.get(title_id, 0.0)
+                + score * trend_weight(pub_date, epoch)
+            )
+        titles = list(self.only('pk', 'trend'))
+        for title in titles:
+            title.trend = trends.get(title.pk, 0.0)
+        Title.objects.bulk_update(titles, ['trend'], batch_size=batch_size)
+        return len(titles)
+
+    def review_stats(self):
+        """Статистика отзывов, посчитанная по таблице отзывов.
+
+        Произведения без отзывов в выборку не попадают.
+        """
+        return Review.objects.filter(
+            title__in=self.values('pk'), is_hidden=False
+        ).order_by().values('title_id').annotate(
+            review_count=Count('pk'),
+            last_review_at=Max('pub_date'),
+            **{
+                field: Count('pk', filter=Q(score=score))
+                for score, field in zip(SCORES, SCORE_FIELDS)
+            },
+        )
+
+    def rebuild_stats(self, batch_size=1000):
+        """Пересчитывает TitleStats с нуля по таблице отзывов."""
+        with transaction.atomic():
+            TitleStats.objects.filter(title__in=self.values('pk')).delete()
+            rows = self.review_stats().iterator()
+            created = 0
+            while True:
+                batch = [TitleStats(**row) for row in islice(rows, batch_size)]
+                if not batch:
+                    return created
+                TitleStats.objects.bulk_create(batch)
+                created += len(batch)
+
+
 class Title(models.Model):
     """Модель произведения."""
 
@@ -90,29 +219,311 @@ class Title(models.Model):
         null=True,
         db_index=True,
     )
+    rating_sum = models.PositiveIntegerField(
+        verbose_name="Сумма оценок",
+        default=0,
+        editable=False,
+    )
+    rating_count = models.PositiveIntegerField(
+        verbose_name="Количество оценок",
+        default=0,
+        editable=False,
+    )
+    rating = models.PositiveSmallIntegerField(
+        verbose_name="Рейтинг произведения",
+        null=True,
+        blank=True,
+        editable=False,
+    )
+    trend = models.FloatField(
+        verbose_name="Тренд",
+        default=0.0,
+        editable=False,
+    )
+    search_vector = SearchVectorField(
+        verbose_name="Поисковый вектор",
+        null=True,
+        editable=False,
+    )
+
+    objects = TitleQuerySet.as_manager()
 
     class Meta:
         verbose_name = "Произведение"
         verbose_name_plural = "Произведения"
         ordering = ("id",)
+        indexes = [
+            models.Index(fields=['year'], name='title_year_idx'),
+            # Готовые рейтинги: лучшие и обсуждаемые произведения.
+            models.Index(fields=['-rating', '-rating_count', '-id'],
+                         name='title_top_idx'),
+            models.Index(fields=['-trend', '-id'], name='title_trend_idx'),
+        ]
 
     def __str__(self):
         return self.name
 
 
+class TrendEpochQuerySet(models.QuerySet):
+
+    def current(self):
+        """Начало отсчёта весов трендов."""
+        epoch, _ = self.get_or_create(
+            pk=1, defaults={'started_at': timezone.now()}
+        )
+        return epoch.started_at
+
+    def restart(self):
+        """Переносит начало отсчёта на текущий момент и пересчитывает
+        тренды всех произведений, возвращает их число.
+
+        Веса новых отзывов растут с удалением от начала отсчёта и через
+        сотни периодов полураспада не помещаются во float, поэтому отсчёт
+        нужно периодически переносить. Порядок трендов при этом не
+        меняется: все суммы делятся на один и тот же множитель.
+        """
+        with transaction.atomic():
+            self.current()
+            # UPDATE блокирует строку до конца пересчёта.
+            self.filter(pk=1).update(started_at=timezone.now())
+            return Title.objects.rebuild_trend()
+
+
+class TrendEpoch(models.Model):
+    """Начало отсчёта весов трендов (trend_weight), единственная строка."""
+
+    started_at = models.DateTimeField(verbose_name="Начало отсчёта")
+
+    objects = TrendEpochQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = "Начало отсчёта трендов"
+        verbose_name_plural = "Начало отсчёта трендов"
+
+    def __str__(self):
+        return str(self.started_at)
+
+
+class TitleStatsQuerySet(models.QuerySet):
+    """Обновление статистики отзывов одним UPDATE на событие."""
+
+    def change(self, title_id, create=False, **changes):
+        """Применяет изменения к строке произведения.
+
+        Уменьшать счётчики можно только в существующей строке, поэтому
+        create передаётся лишь при добавлении отзыва.
+        """
+        updated = self.filter(title_id=title_id).update(**changes)
+        if not updated and create:
+            self.get_or_create(title_id=title_id)
+            self.filter(title_id=title_id).update(**changes)
+
+    def review_added(self, review):
+        self.change(
+            review.title_id,
+            create=True,
+            review_count=F('review_count') + 1,
+            last_review_at=Case(
+                When(last_review_at__gte=review.pub_date,
+                     then=F('last_review_at')),
+                default=Value(
+                    review.pub_date, output_field=models.DateTimeField()
+                ),
+                output_field=models.DateTimeField(),
+            ),
+            **{f'score_{review.score}': F(f'score_{review.score}') + 1},
+        )
+
+    def score_changed(self, review, old_score):
+        self.change(
+            review.title_id,
+            **{
+                f'score_{old_score}': F(f'score_{old_score}') - 1,
+                f'score_{review.score}': F(f'score_{review.score}') + 1,
+            },
+        )
+
+    def review_deleted(self, review):
+        """Убирает отзыв из статистики.
+
+        Строку не создаёт: её отсутствие и так означает «нет отзывов», а
+        при каскадном удалении произведения она уже удалена.
+        """
+        latest = Review.objects.filter(
+            title=OuterRef('title'), is_hidden=False
+        ).order_by('-pub_date').values('pub_date')[:1]
+        self.change(
+            review.title_id,
+            review_count=F('review_count') - 1,
+            # Дату пересчитываем, только если удалён последний отзыв.
+            last_review_at=Case(
+                When(last_review_at=review.pub_date, then=Subquery(latest)),
+                default=F('last_review_at'),
+                output_field=models.DateTimeField(),
+            ),
+            **{f'score_{review.score}': F(f'score_{review.score}') - 1},
+        )
+
+
+class TitleStats(models.Model):
+    """Статистика отзывов произведения: число, распределение оценок и
+    время последнего отзыва. Обновляется сигналами отзывов, отсутствие
+    строки означает, что отзывов нет."""
+
+    title = models.OneToOneField(
+        Title,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats',
+    )
+    review_count = models.PositiveIntegerField(default=0)
+    score_1 = models.PositiveIntegerField(default=0)
+    score_2 = models.PositiveIntegerField(default=0)
+    score_3 = models.PositiveIntegerField(default=0)
+    score_4 = models.PositiveIntegerField(default=0)
+    score_5 = models.PositiveIntegerField(default=0)
+    score_6 = models.PositiveIntegerField(default=0)
+    score_7 = models.PositiveIntegerField(default=0)
+    score_8 = models.PositiveIntegerField(default=0)
+    score_9 = models.PositiveIntegerField(default=0)
+    score_10 = models.PositiveIntegerField(default=0)
+    last_review_at = models.DateTimeField(null=True, blank=True)
+
+    objects = TitleStatsQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = "Статистика отзывов"
+        verbose_name_plural = "Статистика отзывов"
+
+    def __str__(self):
+        return f'{self.title_id}: {self.review_count}'
+
+    @property
+    def scores(self):
+        return {
+            score: getattr(self, field)
+            for score, field in zip(SCORES, SCORE_FIELDS)
+        }
+
+
 class GenreTitle(models.Model):
-    genre = models.ForeignKey(Genre, on_delete=models.CASCADE)
-    title = models.ForeignKey(Title, on_delete=models.CASCADE)
+    # Отдельные индексы не нужны: поиск по genre_id идёт по
+    # unique_genre_title, по title_id — по genretitle_title_genre_idx.
+    genre = models.ForeignKey(Genre, on_delete=models.CASCADE,
+                              db_index=False)
+    title = models.ForeignKey(Title, on_delete=models.CASCADE,
+                              db_index=False)
+
+    class Meta:
+        constraints = [
+            UniqueConstraint(
+                fields=['genre', 'title'],
+                name='unique_genre_title')
+        ]
+        indexes = [
+            # Жанры произведения: поиск по title_id без обращения к таблице.
+            models.Index(fields=['title', 'genre'],
+                         name='genretitle_title_genre_idx'),
+        ]
 
     def __str__(self) -> str:
         return f'{self.genre} {self.title}'
 
 
+def delete_rows(queryset):
+    """Удаляет строки queryset одним DELETE, возвращает их число.
+
+    QuerySet.delete() из-за сигналов post_delete загружает и удаляет
+    записи по одной. Здесь — единственный вызов приватного
+    QuerySet._raw_delete: Collector не запускается, поэтому каскадов,
+    SET_NULL и сигналов pre_delete/post_delete нет. Зависимые строки,
+    счётчики и сброс кэша — забота вызывающего кода. Поведение Django
+    закреплено тестом test_delete_rows_skips_collector.
+    """
+    return queryset._raw_delete(queryset.db)
+
+
+class ModeratedQuerySet(models.QuerySet):
+    """Модерация набора записей одним запросом, без загрузки объектов."""
+
+    def set_hidden(self, hidden):
+        return self.filter(is_hidden=not hidden).update(is_hidden=hidden)
+
+    def delete_moderated(self):
+        """Удаляет записи одним DELETE (delete_rows).
+
+        Зависимые записи и счётчики обрабатывают наследники
+        (CommentQuerySet, ReviewQuerySet), кэш сбрасывает вызывающий код.
+        """
+        return delete_rows(self)
+
+
+class CommentQuerySet(ModeratedQuerySet):
+
+    @contextmanager
+    def rebuilding_reviews(self):
+        """Пересчитывает число комментариев у затронутых отзывов."""
+        reviews = Review.objects.filter(pk__in=list(
+            self.order_by().values_list('review_id', flat=True).distinct()
+        ))
+        yield
+        reviews.rebuild_comment_count()
+
+    def set_hidden(self, hidden):
+        with self.rebuilding_reviews():
+            return super().set_hidden(hidden)
+
+    def delete_moderated(self):
+        with self.rebuilding_reviews():
+            return super().delete_moderated()
+
+
+class ReviewQuerySet(ModeratedQuerySet):
+
+    def change_comment_count(self, delta):
+        return self.update(comment_count=F('comment_count') + delta)
+
+    def rebuild_comment_count(self):
+        """Пересчитывает число комментариев с нуля."""
+        comments = Comment.objects.filter(
+            review=OuterRef('pk'), is_hidden=False
+        ).order_by().values('review')
+        return self.update(comment_count=Coalesce(
+            Subquery(comments.annotate(total=Count('pk')).values('total')),
+            0,
+        ))
+
+    @contextmanager
+    def rebuilding_titles(self):
+        """Пересчитывает рейтинг произведений, чьи отзывы изменились."""
+        titles = Title.objects.filter(pk__in=list(
+            self.order_by().values_list('title_id', flat=True).distinct()
+        ))
+        yield
+        titles.rebuild_rating()
+        titles.rebuild_trend()
+        titles.rebuild_stats()
+
+    def set_hidden(self, hidden):
+        with self.rebuilding_titles():
+            return super().set_hidden(hidden)
+
+    def delete_moderated(self):
+        """Удаляет отзывы с комментариями, возвращает оба количества."""
+        with self.rebuilding_titles():
+            # Счётчики комментариев удаляемых отзывов пересчитывать незачем.
+            comments = delete_rows(
+                Comment.objects.filter(review__in=self.values('pk'))
+            )
+            return super().delete_moderated(), comments
+
+
 class Review(models.Model):
     """Модель Ревью."""
 
+    # Поиск по title_id идёт по review_title_pub_date_idx.
     title = models.ForeignKey(Title, on_delete=models.CASCADE,
-                              related_name='reviews')
+                              related_name='reviews', db_index=False)
     text = models.TextField()
     author = models.ForeignKey(
         User, on_delete=models.CASCADE, related_name='reviews')
@@ -123,6 +534,24 @@ class Review(models.Model):
 
     pub_date = models.DateTimeField(
         'Дата добавления', auto_now_add=True, db_index=True)
+    # Скрытые модератором отзывы не выводятся и не входят в рейтинг.
+    is_hidden = models.BooleanField(default=False, editable=False)
+    comment_count = models.PositiveIntegerField(
+        'Количество комментариев', default=0, editable=False)
+
+    objects = ReviewQuerySet.as_manager()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Запоминаем оценку из БД, чтобы при сохранении знать её изменение.
+        instance._loaded_score = instance.__dict__.get('score')
+        return instance
+
+    def save(self, *args, **kwargs):
+        # Рейтинг обновляется в post_save, поэтому сохраняем в транзакции.
+        with transaction.atomic():
+            super().save(*args, **kwargs)
 
     class Meta:
         ordering = ("-pub_date",)
@@ -131,6 +560,11 @@ class Review(models.Model):
                 fields=['author', 'title'],
                 name='unique_review')
         ]
+        indexes = [
+            # Отзывы произведения в порядке выдачи и для курсора.
+            models.Index(fields=['title', '-pub_date', '-id'],
+                         name='review_title_pub_date_idx'),
+        ]
 
     def __str__(self):
         return self.text
@@ -139,16 +573,25 @@ class Review(models.Model):
 class Comment(models.Model):
     """Модель Комментариев."""
 
+    # Поиск по review_id идёт по comment_review_pub_date_idx.
     review = models.ForeignKey(Review, on_delete=models.CASCADE,
-                               related_name='comments')
+                               related_name='comments', db_index=False)
     text = models.TextField()
     author = models.ForeignKey(
         User, on_delete=models.CASCADE, related_name='comments')
     pub_date = models.DateTimeField(
         'Дата добавления', auto_now_add=True, db_index=True)
+    is_hidden = models.BooleanField(default=False, editable=False)
+
+    objects = CommentQuerySet.as_manager()
 
     class Meta:
         ordering = ("-pub_date",)
+        indexes = [
+            # Комментарии отзыва в порядке выдачи и для курсора.
+            models.Index(fields=['review', '-pub_date', '-id'],
+                         name='comment_review_pub_date_idx'),
+        ]
 
     def __str__(self):
         return self.text
@@ -0,0 +1,126 @@
+import math
+import re
+import threading
+from collections import Counter, defaultdict
+
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connections
+from django.db.models import Case, F, IntegerField, When
+
+SEARCH_CONFIG = 'russian'
+TOKEN_RE = re.compile(r'\w+')
+
+
+def tokenize(text):
+    return TOKEN_RE.findall((text or '').lower())
+
+
+class InvertedIndex:
+    """Обратный индекс в памяти процесса для баз без полнотекстового поиска.
+
+    Документ находится, если содержит все слова запроса (как plainto_tsquery);
+    ранг — сумма tf-idf слов, слова названия весят вдвое больше описания.
+    """
+
+    name_weight = 2
+
+    def __init__(self):
+        self.postings = defaultdict(dict)
+        self.documents = {}
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.documents)
+
+    def add(self, doc_id, name, description=''):
+        terms = Counter(tokenize(name) * self.name_weight)
+        terms.update(tokenize(description))
+        with self.lock:
+            self._remove(doc_id)
+            self.documents[doc_id] = terms
+            for term, count in terms.items():
+                self.postings[term][doc_id] = count
+
+    def remove(self, doc_id):
+        with self.lock:
+            self._remove(doc_id)
+
+    def _remove(self, doc_id):
+        for term in self.documents.pop(doc_id, ()):
+            postings = self.postings[term]
+            postings.pop(doc_id, None)
+            if not postings:
+                del self.postings[term]
+
+    def search(self, query):
+        """Возвращает id документов по убыванию ранга."""
+        terms = set(tokenize(query))
+        if not terms:
+            return []
+        with self.lock:
+            postings = [self.postings.get(term, {}) for term in terms]
+            postings.sort(key=len)
+            found = set(postings[0]).intersection(*postings[1:])
+            total = len(self.documents)
+            scores = {
+                doc_id: sum(
+                    posting[doc_id] * math.log(1 + total / len(posting))
+                    for posting in postings
+                )
+                for doc_id in found
+            }
+        return sorted(scores, key=lambda doc_id: (-scores[doc_id], doc_id))
+
+
+class TitleIndex(InvertedIndex):
+    """Индекс произведений, который строится при первом поиске."""
+
+    def __init__(self):
+        super().__init__()
+        self.built = False
+
+    def ensure_built(self, queryset):
+        if self.built:
+            return
+        for title_id, name, description in queryset.values_list(
+            'id', 'name', 'description'
+        ).iterator():
+            self.add(title_id, name, description)
+        self.built = True
+
+    def reset(self):
+        with self.lock:
+            self.postings.clear()
+            self.documents.clear()
+        self.built = False
+
+    def update(self, title):
+        if self.built:
+            self.add(title.pk, title.name, title.description)
+
+    def discard(self, title_id):
+        if self.built:
+            self.remove(title_id)
+
+
+title_index = TitleIndex()
+
+
+def search_titles(queryset, text):
+    """Полнотекстовый поиск по названию и описанию с сортировкой по рангу.
+
+    На PostgreSQL используется поле search_vector (GIN-индекс, триггер из
+    миграции), на остальных базах — обратный индекс в памяти.
+    """
+    if connections[queryset.db].vendor == 'postgresql':
+        query = SearchQuery(text, config=SEARCH_CONFIG)
+        return queryset.filter(search_vector=query).annotate(
+            rank=SearchRank(F('search_vector'), query)
+        ).order_by('-rank', 'id')
+    title_index.ensure_built(queryset.model.objects.all())
+    ranked = title_index.search(text)
+    return queryset.filter(pk__in=ranked).order_by(Case(
+        *[When(pk=title_id, then=position)
+          for position, title_id in enumerate(ranked)],
+        output_field=IntegerField(),
+    ), 'id')
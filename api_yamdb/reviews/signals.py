@@ -0,0 +1,65 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import (Comment, Review, Title, TitleStats, TrendEpoch,
+                     trend_weight)
+from .search import title_index
+
+
+@receiver(post_save, sender=Review)
+def review_saved(sender, instance, created, raw, **kwargs):
+    """Учитывает новую или изменённую оценку в рейтинге произведения."""
+    if raw or instance.is_hidden:
+        return
+    weight = trend_weight(instance.pub_date, TrendEpoch.objects.current())
+    if created:
+        Title.objects.filter(pk=instance.title_id).change_rating(
+            instance.score, 1, instance.score * weight
+        )
+        TitleStats.objects.review_added(instance)
+        return
+    loaded_score = getattr(instance, '_loaded_score', None)
+    if loaded_score is not None and loaded_score != instance.score:
+        delta = instance.score - loaded_score
+        Title.objects.filter(pk=instance.title_id).change_rating(
+            delta, 0, delta * weight
+        )
+        TitleStats.objects.score_changed(instance, loaded_score)
+    instance._loaded_score = instance.score
+
+
+@receiver(post_delete, sender=Review)
+def review_deleted(sender, instance, **kwargs):
+    """Убирает оценку удалённого отзыва из рейтинга произведения."""
+    if instance.is_hidden:
+        return
+    weight = trend_weight(instance.pub_date, TrendEpoch.objects.current())
+    Title.objects.filter(pk=instance.title_id).change_rating(
+        -instance.score, -1, -instance.score * weight
+    )
+    TitleStats.objects.review_deleted(instance)
+
+
+@receiver(post_save, sender=Comment)
+def comment_saved(sender, instance, created, raw, **kwargs):
+    if created and not raw and not instance.is_hidden:
+        Review.objects.filter(pk=instance.review_id).change_comment_count(1)
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, **kwargs):
+    """Уменьшает счётчик отзыва, в том числе при каскадном удалении
+    отзыва, произведения или автора."""
+    if not instance.is_hidden:
+        Review.objects.filter(pk=instance.review_id).change_comment_count(-1)
+
+
+@receiver(post_save, sender=Title)
+def title_saved(sender, instance, **kwargs):
+    """Обновляет запасной поисковый индекс (используется вне PostgreSQL)."""
+    title_index.update(instance)
+
+
+@receiver(post_delete, sender=Title)
+def title_deleted(sender, instance, **kwargs):
+    title_index.discard(instance.pk)
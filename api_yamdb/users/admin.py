@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import User
+from .models import OutgoingEmail, User
 
 
 class UserAdmin(admin.ModelAdmin):
@@ -25,3 +25,23 @@ class UserAdmin(admin.ModelAdmin):
 
 
 admin.site.register(User, UserAdmin)
+
+
+class OutgoingEmailAdmin(admin.ModelAdmin):
+    """Отображение очереди писем в Админке."""
+
+    list_display = (
+        'pk',
+        'recipient',
+        'subject',
+        'created',
+        'attempts',
+        'sent_at',
+        'last_error',
+    )
+    list_filter = ('sent_at',)
+    search_fields = ('recipient',)
+    empty_value_display = '-пусто-'
+
+
+admin.site.register(OutgoingEmail, OutgoingEmailAdmin)
@@ -0,0 +1,101 @@
+"""Аутентификация по данным из access-токена, без запроса к users.
+
+Токен из auth/token/ содержит username, role, is_superuser и версию
+токенов пользователя. request.user строится из этих данных; в БД (через
+кэш с коротким сроком жизни) проверяется только версия, которая растёт
+при смене роли, прав или блокировке пользователя.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.functional import cached_property
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .models import User
+
+VERSION_KEY = 'users:{user_id}:token_version'
+# Хранится в кэше для удалённых и заблокированных пользователей.
+REVOKED = -1
+
+
+class ClaimsAccessToken(AccessToken):
+    """Access-токен с ролью пользователя."""
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token['username'] = user.username
+        token['role'] = user.role
+        token['is_superuser'] = user.is_superuser
+        token['ver'] = user.token_version
+        return token
+
+
+class ClaimsUser(TokenUser):
+    """Пользователь из токена с теми же проверками роли, что у User."""
+
+    @cached_property
+    def role(self):
+        return self.token['role']
+
+    @property
+    def is_user(self):
+        return self.role == User.USER
+
+    @property
+    def is_admin(self):
+        return self.role == User.ADMIN or self.is_superuser
+
+    @property
+    def is_moderator(self):
+        return self.role == User.MODERATOR
+
+
+def get_author(user):
+    """User для поля author без запроса к БД.
+
+    Из данных токена заполняются только id и username: объект годится
+    как значение внешнего ключа и для вывода автора, но не для save().
+    """
+    if isinstance(user, User):
+        return user
+    author = User(id=user.id, username=user.username)
+    author._state.adding = False
+    return author
+
+
+def get_token_version(user_id):
+    key = VERSION_KEY.format(user_id=user_id)
+    version = cache.get(key)
+    if version is None:
+        version = User.objects.filter(
+            pk=user_id, is_active=True
+        ).values_list('token_version', flat=True).first()
+        if version is None:
+            version = REVOKED
+        cache.set(key, version, settings.TOKEN_VERSION_CACHE_TIMEOUT)
+    return version
+
+
+def forget_token_version(user_id):
+    cache.delete(VERSION_KEY.format(user_id=user_id))
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication, который не загружает пользователя из БД.
+
+    Токены без роли (выданные до появления данных в токене) проверяются
+    по-старому, через таблицу пользователей.
+    """
+
+    def get_user(self, validated_token):
+        if 'role' not in validated_token:
+            return super().get_user(validated_token)
+        user = ClaimsUser(validated_token)
+        if get_token_version(user.id) != validated_token.get('ver'):
+            raise AuthenticationFailed(
+                'Токен отозван: получите новый токен', code='token_revoked'
+            )
+        return user
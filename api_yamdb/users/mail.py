@@ -0,0 +1,87 @@
+"""Очередь исходящих писем.
+
+Запрос только сохраняет письмо в таблицу OutgoingEmail; отправляет
+команда send_mail_queue пачками через одно SMTP-соединение. Неудачная
+отправка повторяется с растущей задержкой, пока не кончатся попытки.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from .models import OutgoingEmail
+
+
+def queue_mail(subject, message, recipient, from_email=None):
+    return OutgoingEmail.objects.create(
+        subject=subject,
+        message=message,
+        recipient=recipient,
+        from_email=from_email or settings.MAILING_EMAIL,
+    )
+
+
+def retry_delay(attempts):
+    """Задержка перед следующей попыткой: база * 2^(попытка - 1)."""
+    return timedelta(
+        seconds=settings.MAIL_QUEUE_RETRY_DELAY * 2 ** (attempts - 1)
+    )
+
+
+def send_queued(batch_size, connection=None):
+    """Отправляет одну пачку писем, которым пришло время.
+
+    Строки блокируются до конца пачки (на PostgreSQL с SKIP LOCKED),
+    поэтому несколько обработчиков не отправят одно письмо дважды.
+    Возвращает количество отправленных и неотправленных писем.
+    """
+    sent = failed = 0
+    with transaction.atomic():
+        emails = list(
+            OutgoingEmail.objects.select_for_update(skip_locked=True).filter(
+                sent_at__isnull=True,
+                send_after__lte=timezone.now(),
+                attempts__lt=settings.MAIL_QUEUE_MAX_ATTEMPTS,
+            )[:batch_size]
+        )
+        if not emails:
+            return sent, failed
+        connection = connection or get_connection()
+        try:
+            for email in emails:
+                if send(connection, email):
+                    sent += 1
+                else:
+                    failed += 1
+                email.save(update_fields=(
+                    'attempts', 'last_error', 'send_after', 'sent_at'
+                ))
+        finally:
+            connection.close()
+    return sent, failed
+
+
+def send(connection, email):
+    message = EmailMessage(
+        subject=email.subject,
+        body=email.message,
+        from_email=email.from_email,
+        to=[email.recipient],
+        connection=connection,
+    )
+    email.attempts += 1
+    try:
+        # Открывает соединение один раз на пачку: у открытого это no-op.
+        connection.open()
+        message.send()
+    except Exception as error:
+        email.last_error = f'{type(error).__name__}: {error}'
+        email.send_after = timezone.now() + retry_delay(email.attempts)
+        # После ошибки соединение в неизвестном состоянии: переоткрываем.
+        connection.close()
+        return False
+    email.sent_at = timezone.now()
+    email.last_error = ''
+    return True
@@ -0,0 +1,53 @@
+import time
+
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError
+from users.mail import send_queued
+
+
+class Command(BaseCommand):
+    help = (
+        'Отправляет письма из очереди пачками через одно соединение с '
+        'почтовым сервером. Без --once работает, пока его не остановят.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=50,
+            help='Количество писем в одной пачке.',
+        )
+        parser.add_argument(
+            '--interval', type=float, default=5,
+            help='Пауза в секундах, когда очередь пуста.',
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Отправить всё, что готово к отправке, и завершиться.',
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('Размер пачки должен быть положительным')
+        connection = get_connection()
+        try:
+            while True:
+                try:
+                    sent, failed = send_queued(
+                        options['batch_size'], connection
+                    )
+                except DatabaseError as error:
+                    if options['once']:
+                        raise CommandError(error)
+                    self.stderr.write(f'Ошибка очереди писем: {error}')
+                    sent = failed = 0
+                if sent or failed:
+                    self.stdout.write(
+                        f'Отправлено: {sent}, отложено: {failed}'
+                    )
+                    continue
+                if options['once']:
+                    break
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            pass
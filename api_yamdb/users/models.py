@@ -1,5 +1,7 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.db.models import Q
+from django.utils import timezone
 
 
 class User(AbstractUser):
@@ -17,6 +19,11 @@ class User(AbstractUser):
     role = models.CharField(max_length=10, choices=USER_ROLES, default='user')
     confirmation_code = models.CharField(blank=True, null=True, max_length=150)
     bio = models.TextField(blank=True, null=True)
+    # Растёт при смене роли, прав или активности: токены с прежней версией
+    # перестают приниматься (см. users.authentication).
+    token_version = models.PositiveIntegerField(default=0, editable=False)
+
+    CLAIM_FIELDS = ('username', 'role', 'is_superuser', 'is_active')
 
     class Meta:
         ordering = ('username',)
@@ -33,5 +40,52 @@ class User(AbstractUser):
     def is_moderator(self):
         return self.role == self.MODERATOR
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Запоминаем поля из токена, чтобы при сохранении знать их изменение.
+        instance._loaded_claims = instance.get_claims()
+        return instance
+
+    def get_claims(self):
+        return tuple(self.__dict__.get(name) for name in self.CLAIM_FIELDS)
+
+    def save(self, *args, **kwargs):
+        loaded_claims = getattr(self, '_loaded_claims', None)
+        if loaded_claims is not None and loaded_claims != self.get_claims():
+            self.token_version += 1
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'token_version'}
+        super().save(*args, **kwargs)
+        self._loaded_claims = self.get_claims()
+
     def __str__(self):
         return self.username
+
+
+class OutgoingEmail(models.Model):
+    """Письмо в очереди на отправку (см. users.mail)."""
+
+    subject = models.CharField(max_length=255)
+    message = models.TextField()
+    from_email = models.CharField(max_length=254)
+    recipient = models.EmailField(max_length=254)
+    created = models.DateTimeField(auto_now_add=True)
+    send_after = models.DateTimeField(default=timezone.now)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    sent_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        ordering = ('send_after', 'id')
+        indexes = [
+            models.Index(
+                fields=['send_after', 'id'],
+                name='outgoing_email_pending_idx',
+                condition=Q(sent_at__isnull=True),
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.recipient}: {self.subject}'
@@ -37,5 +37,5 @@ class IsAdminModeratorAuthorOrReadOnly(permissions.BasePermission):
         return request.user.is_authenticated and (
             request.user.is_admin
             or request.user.is_moderator
-            or obj.author == request.user
+            or obj.author_id == request.user.id
         )
@@ -1,12 +1,14 @@
+from api.profiling import SerializerTimingMixin
 from django.contrib.auth import get_user_model
 from django.shortcuts import get_object_or_404
 from rest_framework import serializers
-from rest_framework_simplejwt.tokens import RefreshToken
+
+from .authentication import ClaimsAccessToken
 
 User = get_user_model()
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(SerializerTimingMixin, serializers.ModelSerializer):
     """Сериализатор для эндпоита users."""
 
     class Meta:
@@ -38,9 +40,7 @@ class TokenObtainPairSerializer(serializers.Serializer):
             raise serializers.ValidationError(
                 'Некорректный код подтверждения'
             )
-        refresh = RefreshToken.for_user(user)
-        # data = {'access_token': str(refresh.access_token)}
-        return {'access_token': str(refresh.access_token)}
+        return {'access_token': str(ClaimsAccessToken.for_user(user))}
 
 
 class UserSignUpSerializer(serializers.Serializer):
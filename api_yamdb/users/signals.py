@@ -0,0 +1,19 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .authentication import forget_token_version
+from .models import User
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(sender, instance, **kwargs):
+    """Сбрасывает закэшированную версию токенов пользователя.
+
+    Повторный сброс после коммита убирает версию, которую параллельный
+    запрос мог успеть прочитать из ещё не закоммиченной транзакции.
+    """
+    forget_token_version(instance.pk)
+    pk = instance.pk
+    transaction.on_commit(lambda: forget_token_version(pk))
@@ -1,10 +1,8 @@
 import secrets
-from smtplib import SMTPResponseException
 
-from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.core.mail import send_mail
-from django.db import IntegrityError
+from django.db import IntegrityError, transaction
+from django.shortcuts import get_object_or_404
 from rest_framework import filters, status, viewsets
 from rest_framework.decorators import action
 from rest_framework.generics import CreateAPIView
@@ -13,6 +11,7 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework_simplejwt.views import TokenViewBase
 
+from .mail import queue_mail
 from .permissions import IsAdmin
 from .serializers import (TokenObtainPairSerializer, UserSerializer,
                           UserSignUpSerializer)
@@ -38,7 +37,8 @@ class UserViewSet(viewsets.ModelViewSet):
     def me(self, request, *args, **kwargs):
         """Описание логики работы АПИ для эндпоинта users/me."""
 
-        user = self.request.user
+        # request.user собран из токена, профиль читается из БД.
+        user = get_object_or_404(User, pk=request.user.pk)
         serializer = self.get_serializer(user)
         if self.request.method == 'PATCH':
             serializer = self.get_serializer(
@@ -82,25 +82,15 @@ class UserSignUpView(CreateAPIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
         user.confirmation_code = token
-        user.save()
         message = (
             f'Код подтверждения для продолжения регистрации - {token}'
         )
-
-        try:
-            send_mail(
+        # Письмо отправит send_mail_queue; код и письмо пишутся вместе.
+        with transaction.atomic():
+            user.save()
+            queue_mail(
                 subject='Регистрация на сайте',
                 message=message,
-                from_email=settings.MAILING_EMAIL,
-                recipient_list=[user.email],
-                fail_silently=False,
-            )
-            return Response(serializer.data, status=status.HTTP_200_OK)
-        except SMTPResponseException:
-            user.delete()
-            return Response(
-                data={
-                    'error': 'Ошибка отправки кода подтверждения!',
-                },
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                recipient=user.email,
             )
+        return Response(serializer.data, status=status.HTTP_200_OK)
@@ -0,0 +1,59 @@
+import pytest
+
+
+@pytest.fixture
+def user(django_user_model):
+    return django_user_model.objects.create_user(
+        username='TestUser', email='testuser@yamdb.fake', password='1234567'
+    )
+
+
+@pytest.fixture
+def another_user(django_user_model):
+    return django_user_model.objects.create_user(
+        username='TestUserAnother', email='another@yamdb.fake',
+        password='1234567'
+    )
+
+
+@pytest.fixture
+def category():
+    from reviews.models import Category
+    return Category.objects.create(name='Фильмы', slug='movie')
+
+
+@pytest.fixture
+def genres():
+    from reviews.models import Genre
+    return [
+        Genre.objects.create(name='Драма', slug='drama'),
+        Genre.objects.create(name='Комедия', slug='comedy'),
+    ]
+
+
+@pytest.fixture
+def title(category, genres):
+    from reviews.models import Title
+    title = Title.objects.create(
+        name='Произведение', year=1980, description='описание',
+        category=category
+    )
+    title.genre.set(genres)
+    return title
+
+
+@pytest.fixture
+def review(title, user):
+    from reviews.models import Review
+    return Review.objects.create(
+        title=title, author=user, text='Отзыв', score=7
+    )
+
+
+@pytest.fixture
+def user_client(user):
+    from rest_framework.test import APIClient
+
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
@@ -0,0 +1,30 @@
+import io
+import json
+
+import pytest
+from django.core.management import call_command
+
+
+@pytest.mark.django_db
+class TestBenchmarkApi:
+
+    def test_all_scenarios_succeed(self, tmp_path):
+        from reviews.models import Title
+
+        output = tmp_path / 'result.json'
+        call_command(
+            'benchmark_api', users=5, titles=10, genres=2, categories=2,
+            reviews_per_title=2, comments_per_review=1, requests=2,
+            output=str(output), stdout=io.StringIO(),
+        )
+        report = json.loads(output.read_text(encoding='utf-8'))
+        failed = {
+            name: result['errors']
+            for name, result in report['results'].items() if result['errors']
+        }
+        assert not failed, (
+            f'Сценарии нагрузочного прогона завершились с ошибками: {failed}'
+        )
+        assert not Title.objects.exists(), (
+            'Данные нагрузочного прогона должны откатываться'
+        )
@@ -0,0 +1,148 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+@pytest.mark.django_db
+class TestBulkWrite:
+
+    @pytest.fixture
+    def admin_client(self, django_user_model):
+        from rest_framework.test import APIClient
+
+        admin = django_user_model.objects.create_user(
+            username='TestAdmin', email='admin@yamdb.fake', role='admin'
+        )
+        client = APIClient()
+        client.force_authenticate(user=admin)
+        return client
+
+    def test_bulk_create_titles(self, admin_client, category, genres):
+        from reviews.models import GenreTitle, Title
+
+        data = [
+            {'name': f'Произведение {number}', 'year': 2000,
+             'category': 'movie', 'genre': ['drama', 'comedy']}
+            for number in range(50)
+        ]
+        with CaptureQueriesContext(connection) as captured:
+            response = admin_client.post(
+                '/api/v1/titles/bulk/', data=data, format='json'
+            )
+        assert response.status_code == 201, response.json()
+        assert len(response.json()) == 50
+        assert response.json()[0]['genre'] == ['drama', 'comedy']
+        assert Title.objects.count() == 50
+        assert GenreTitle.objects.count() == 100
+        # Без RETURNING (SQLite) произведения вставляются по одному.
+        other = [
+            query for query in captured.captured_queries
+            if not query['sql'].startswith('INSERT INTO "reviews_title"')
+        ]
+        assert len(other) <= 10, (
+            'Проверьте, что число запросов пакетной записи не зависит от '
+            'размера пачки'
+        )
+
+    def test_errors_per_item(self, admin_client, category, genres):
+        from reviews.models import Title
+
+        response = admin_client.post('/api/v1/titles/bulk/', data=[
+            {'name': 'Хорошее', 'year': 2000, 'category': 'movie'},
+            {'name': 'Без жанра', 'year': 2000, 'category': 'movie',
+             'genre': ['rock']},
+            {'name': 'Без категории', 'year': 2000, 'category': 'book'},
+        ], format='json')
+        assert response.status_code == 400
+        errors = response.json()
+        assert errors[0] == {}
+        assert list(errors[1]) == ['genre']
+        assert list(errors[2]) == ['category']
+        assert not Title.objects.exists(), (
+            'Проверьте, что пачка с ошибками не записывается'
+        )
+
+    def test_bulk_update_titles(self, admin_client, title, genres):
+        from reviews.models import Title
+
+        other = Title.objects.create(name='Другое', year=1990)
+        response = admin_client.patch('/api/v1/titles/bulk/', data=[
+            {'id': title.id, 'name': 'Новое название', 'genre': ['comedy']},
+            {'id': other.id, 'year': 1991},
+        ], format='json')
+        assert response.status_code == 200, response.json()
+        assert response.json()[0]['genre'] == ['comedy'], (
+            'Проверьте, что ответ содержит новые жанры, а не '
+            'закэшированные prefetch_related'
+        )
+        title.refresh_from_db()
+        other.refresh_from_db()
+        assert title.name == 'Новое название'
+        assert list(title.genre.values_list('slug', flat=True)) == ['comedy']
+        assert other.year == 1991
+
+        response = admin_client.patch('/api/v1/titles/bulk/', data=[
+            {'id': title.id, 'year': 1992}, {'id': 0, 'year': 1992},
+        ], format='json')
+        assert response.status_code == 400
+        assert response.json() == [{}, {'id': ['Объект не найден.']}]
+
+        response = admin_client.patch('/api/v1/titles/bulk/', data=[
+            {'id': 'abc', 'year': 1992}, {'id': [1], 'year': 1992},
+            {'year': 1992},
+        ], format='json')
+        assert response.status_code == 400, (
+            'Проверьте, что некорректный id даёт ошибку элемента, а не 500'
+        )
+        assert response.json() == [{'id': ['Объект не найден.']}] * 3
+
+    def test_repeated_genre_slug(self, admin_client, category, title,
+                                 genres):
+        from reviews.models import GenreTitle
+
+        response = admin_client.post('/api/v1/titles/bulk/', data=[
+            {'name': 'Повтор', 'year': 2000, 'category': 'movie',
+             'genre': ['drama', 'drama', 'comedy']},
+        ], format='json')
+        assert response.status_code == 201, response.json()
+        assert response.json()[0]['genre'] == ['drama', 'comedy']
+
+        response = admin_client.patch('/api/v1/titles/bulk/', data=[
+            {'id': title.id, 'genre': ['comedy', 'comedy']},
+        ], format='json')
+        assert response.status_code == 200, response.json()
+        assert response.json()[0]['genre'] == ['comedy']
+        assert GenreTitle.objects.filter(title=title).count() == 1, (
+            'Проверьте, что повтор жанра в списке пишется одной связью'
+        )
+
+    def test_bulk_genres_unique_slugs(self, admin_client, genres):
+        from reviews.models import Genre
+
+        response = admin_client.post('/api/v1/genres/bulk/', data=[
+            {'name': 'Рок', 'slug': 'rock'},
+            {'name': 'Рок-н-ролл', 'slug': 'rock'},
+            {'name': 'Драма', 'slug': 'drama'},
+        ], format='json')
+        assert response.status_code == 400
+        errors = response.json()
+        assert errors[0] == {}
+        assert list(errors[1]) == ['slug']
+        assert list(errors[2]) == ['slug']
+
+        response = admin_client.post('/api/v1/categories/bulk/', data=[
+            {'name': 'Книги', 'slug': 'book'},
+            {'name': 'Музыка', 'slug': 'music'},
+        ], format='json')
+        assert response.status_code == 201
+        response = admin_client.patch('/api/v1/genres/bulk/', data=[
+            {'slug': 'drama', 'name': 'Драмы'},
+        ], format='json')
+        assert response.status_code == 200
+        assert Genre.objects.get(slug='drama').name == 'Драмы'
+
+    def test_bulk_admin_only(self, user_client):
+        response = user_client.post('/api/v1/genres/bulk/', data=[
+            {'name': 'Рок', 'slug': 'rock'},
+        ], format='json')
+        assert response.status_code == 403
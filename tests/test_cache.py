@@ -0,0 +1,67 @@
+import io
+
+import pytest
+
+
+@pytest.mark.django_db(transaction=True)
+class TestCatalogueCache:
+
+    def test_titles_cached_until_write(self, client, title, user,
+                                       django_assert_num_queries):
+        from reviews.models import Review
+
+        url = f'/api/v1/titles/{title.id}/'
+        assert client.get(url).json()['rating'] is None
+        with django_assert_num_queries(0):
+            response = client.get(url)
+        assert response.json()['name'] == title.name, (
+            'Проверьте, что повторный запрос отдаётся из кэша'
+        )
+
+        Review.objects.create(title=title, author=user, text='т', score=8)
+        assert client.get(url).json()['rating'] == 8, (
+            'Проверьте, что новый отзыв сбрасывает кэш произведений'
+        )
+
+    def test_query_params_are_part_of_key(self, client, genres):
+        from reviews.models import Genre
+
+        assert client.get('/api/v1/genres/').json()['count'] == 2
+        found = client.get('/api/v1/genres/', {'search': 'drama'}).json()
+        assert found['count'] == 1
+
+        Genre.objects.create(name='Рок', slug='rock')
+        assert client.get('/api/v1/genres/').json()['count'] == 3, (
+            'Проверьте, что создание жанра сбрасывает кэш жанров'
+        )
+
+    def test_commands_invalidate(self, client, title, review):
+        from django.core.management import call_command
+        from reviews.models import Review, TitleStats
+
+        url = f'/api/v1/titles/{title.id}/'
+        reviews_url = f'{url}reviews/'
+        assert client.get(url).json()['rating'] == review.score
+        assert client.get(f'{url}stats/').json()['review_count'] == 1
+
+        # Запись в обход сигналов, как у массовых операций.
+        Review.objects.update(score=1)
+        call_command('rebuild_ratings', stdout=io.StringIO())
+        assert client.get(url).json()['rating'] == 1, (
+            'Проверьте, что rebuild_ratings сбрасывает кэш произведений'
+        )
+
+        Review.objects.update(comment_count=5)
+        etag = client.get(reviews_url)['ETag']
+        call_command('check_counters', fix=True, stdout=io.StringIO())
+        response = client.get(reviews_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            'Проверьте, что check_counters --fix меняет ETag отзывов'
+        )
+        assert response.json()['results'][0]['comment_count'] == 0
+
+        TitleStats.objects.update(review_count=7)
+        call_command('check_title_stats', fix=True, stdout=io.StringIO())
+        assert client.get(f'{url}stats/').json()['review_count'] == 1, (
+            'Проверьте, что check_title_stats --fix сбрасывает кэш'
+        )
@@ -0,0 +1,73 @@
+import pytest
+
+
+@pytest.mark.django_db
+class TestClaimsAuthentication:
+
+    def get_client(self, user):
+        from rest_framework.test import APIClient
+        from users.authentication import ClaimsAccessToken
+
+        client = APIClient()
+        client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {ClaimsAccessToken.for_user(user)}'
+        )
+        return client
+
+    @pytest.fixture
+    def admin(self, django_user_model):
+        return django_user_model.objects.create_user(
+            username='TestAdmin', email='admin@yamdb.fake', role='admin'
+        )
+
+    def test_token_carries_role(self, client, user):
+        from rest_framework_simplejwt.tokens import AccessToken
+
+        user.confirmation_code = 'code'
+        user.save()
+        response = client.post('/api/v1/auth/token/', data={
+            'username': user.username, 'confirmation_code': 'code',
+        })
+        token = AccessToken(response.json()['access_token'])
+        assert token['username'] == user.username
+        assert token['role'] == 'user'
+        assert token['is_superuser'] is False
+
+    def test_no_user_lookup_per_request(self, admin,
+                                        django_assert_num_queries):
+        client = self.get_client(admin)
+        assert client.get('/api/v1/users/').status_code == 200
+        # Подсчёт и страница пользователей, без загрузки request.user.
+        with django_assert_num_queries(2):
+            assert client.get('/api/v1/users/').status_code == 200
+
+    def test_role_change_revokes_token(self, admin, user):
+        client = self.get_client(user)
+        assert client.get('/api/v1/users/').status_code == 403
+
+        response = self.get_client(admin).patch(
+            f'/api/v1/users/{user.username}/', data={'role': 'admin'}
+        )
+        assert response.status_code == 200
+        assert client.get('/api/v1/users/').status_code == 401, (
+            'Проверьте, что смена роли отзывает выданные токены'
+        )
+        user.refresh_from_db()
+        assert self.get_client(user).get('/api/v1/users/').status_code == 200
+
+    def test_profile_change_keeps_token(self, user):
+        client = self.get_client(user)
+        response = client.patch('/api/v1/users/me/', data={'bio': 'Обо мне'})
+        assert response.status_code == 200
+        assert response.json()['email'] == user.email
+        assert client.get('/api/v1/users/me/').status_code == 200
+
+    def test_token_without_claims_still_accepted(self, user):
+        from rest_framework.test import APIClient
+        from rest_framework_simplejwt.tokens import AccessToken
+
+        client = APIClient()
+        client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}'
+        )
+        assert client.get('/api/v1/users/me/').status_code == 200
@@ -0,0 +1,66 @@
+import pytest
+
+
+@pytest.mark.django_db(transaction=True)
+class TestConditionalRequests:
+
+    def test_reviews_etag(self, client, user_client, review,
+                          django_assert_num_queries):
+        url = f'/api/v1/titles/{review.title_id}/reviews/'
+        response = client.get(url)
+        etag = response['ETag']
+        assert not response.has_header('Last-Modified'), (
+            'Проверьте, что Last-Modified не отдаётся: он не меняется при '
+            'изменении отзыва'
+        )
+
+        # Только агрегат count/max(pub_date), без выборки страницы.
+        with django_assert_num_queries(1):
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+        assert not response.content
+
+        user_client.patch(f'{url}{review.id}/', {'text': 'Новый текст'})
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            'Проверьте, что изменение отзыва меняет ETag'
+        )
+        assert response.json()['results'][0]['text'] == 'Новый текст'
+
+    def test_author_rename(self, client, review):
+        url = f'/api/v1/titles/{review.title_id}/reviews/'
+        etag = client.get(url)['ETag']
+        review.author.username = 'RenamedUser'
+        review.author.save()
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            'Проверьте, что смена username автора меняет ETag отзывов'
+        )
+        assert response.json()['results'][0]['author'] == 'RenamedUser'
+
+    def test_if_modified_since_ignored(self, client, user_client, review):
+        url = f'/api/v1/titles/{review.title_id}/reviews/'
+        since = 'Fri, 01 Jan 2100 00:00:00 GMT'
+        assert client.get(url, HTTP_IF_MODIFIED_SINCE=since).status_code == 200
+
+        user_client.patch(f'{url}{review.id}/', {'text': 'Новый текст'})
+        response = client.get(url, HTTP_IF_MODIFIED_SINCE=since)
+        assert response.status_code == 200, (
+            'Проверьте, что If-Modified-Since не даёт устаревший 304'
+        )
+        assert response.json()['results'][0]['text'] == 'Новый текст'
+
+    def test_comments_etag(self, client, review):
+        url = f'/api/v1/titles/{review.title_id}/reviews/{review.id}/comments/'
+        response = client.get(url)
+        assert not response.has_header('Last-Modified')
+        assert response.has_header('ETag')
+
+    def test_titles_etag(self, client, title):
+        url = f'/api/v1/titles/{title.id}/'
+        etag = client.get(url)['ETag']
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+        title.name = 'Новое название'
+        title.save()
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
@@ -0,0 +1,65 @@
+import io
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+
+@pytest.mark.django_db
+class TestCounters:
+
+    @pytest.fixture
+    def comments(self, review, user, another_user):
+        from reviews.models import Comment
+
+        return [
+            Comment.objects.create(review=review, author=author, text='Да')
+            for author in (user, another_user, another_user)
+        ]
+
+    @staticmethod
+    def comment_count(review):
+        from reviews.models import Review
+
+        return Review.objects.get(pk=review.pk).comment_count
+
+    def test_comment_count(self, review, comments, another_user):
+        assert self.comment_count(review) == 3
+        comments[0].delete()
+        assert self.comment_count(review) == 2
+        another_user.delete()
+        assert self.comment_count(review) == 0, (
+            'Проверьте, что счётчик учитывает каскадное удаление автора'
+        )
+
+    def test_moderation_updates_count(self, review, comments):
+        from reviews.models import Comment
+
+        Comment.objects.filter(pk=comments[0].pk).set_hidden(True)
+        assert self.comment_count(review) == 2
+        Comment.objects.filter(pk=comments[1].pk).delete_moderated()
+        assert self.comment_count(review) == 1
+
+    def test_payloads(self, client, title, review, comments):
+        response = client.get(f'/api/v1/titles/{title.id}/reviews/')
+        assert response.json()['results'][0]['comment_count'] == 3
+        response = client.get('/api/v1/titles/')
+        assert response.json()['results'][0]['review_count'] == 1
+        response = client.get(f'/api/v1/titles/{title.id}/')
+        assert response.json()['review_count'] == 1
+
+    def test_check_command(self, title, review, comments):
+        from reviews.models import Review, Title
+
+        out = io.StringIO()
+        call_command('check_counters', stdout=out)
+        assert 'Произведения с расхождениями: 0' in out.getvalue()
+
+        Review.objects.update(comment_count=10)
+        Title.objects.update(rating_count=5)
+        with pytest.raises(CommandError):
+            call_command('check_counters', stdout=io.StringIO())
+
+        call_command('check_counters', fix=True, stdout=io.StringIO())
+        assert self.comment_count(review) == 3
+        assert Title.objects.get(pk=title.pk).rating_count == 1
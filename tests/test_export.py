@@ -0,0 +1,119 @@
+import csv
+import io
+import json
+from datetime import datetime, timezone
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+@pytest.mark.django_db
+class TestExport:
+
+    @pytest.fixture
+    def admin_client(self, django_user_model):
+        from rest_framework.test import APIClient
+
+        admin = django_user_model.objects.create_user(
+            username='TestAdmin', email='admin@yamdb.fake', role='admin'
+        )
+        client = APIClient()
+        client.force_authenticate(user=admin)
+        return client
+
+    @pytest.fixture
+    def catalogue(self, category, genres, user):
+        from reviews.models import Comment, Review, Title
+
+        titles = []
+        for number in range(7):
+            title = Title.objects.create(
+                name=f'Произведение {number}', year=2000, category=category
+            )
+            title.genre.set(genres[:number % 2 + 1])
+            review = Review.objects.create(
+                title=title, author=user, text=f'Отзыв {number}', score=5
+            )
+            Comment.objects.create(review=review, author=user, text='Да')
+            titles.append(title)
+        return titles
+
+    @staticmethod
+    def read(response):
+        return b''.join(response.streaming_content).decode()
+
+    def test_titles_ndjson(self, admin_client, catalogue, settings):
+        settings.EXPORT_CHUNK_SIZE = 3
+        with CaptureQueriesContext(connection) as captured:
+            response = admin_client.get('/api/v1/export/titles.ndjson')
+            lines = self.read(response).splitlines()
+        assert response.status_code == 200
+        assert response['Content-Type'].startswith('application/x-ndjson')
+        rows = [json.loads(line) for line in lines]
+        assert [row['id'] for row in rows] == [
+            title.id for title in catalogue
+        ]
+        assert rows[0]['genre'] == ['drama']
+        assert rows[1]['genre'] == ['comedy', 'drama']
+        assert (rows[0]['rating'], rows[0]['category']) == (5, 'movie')
+        # Основной курсор и по запросу жанров на каждую из трёх пачек.
+        assert len(captured) <= 6, (
+            'Проверьте, что жанры загружаются одним запросом на пачку'
+        )
+
+    def test_reviews_csv(self, admin_client, catalogue):
+        response = admin_client.get('/api/v1/export/reviews.csv')
+        rows = list(csv.DictReader(io.StringIO(self.read(response))))
+        assert response['Content-Type'].startswith('text/csv')
+        assert 'reviews.csv' in response['Content-Disposition']
+        assert len(rows) == 7
+        assert rows[0]['author'] == 'TestUser'
+        assert rows[0]['text'] == 'Отзыв 0'
+
+    def test_since(self, admin_client, catalogue):
+        from reviews.models import Comment, Review
+
+        Review.objects.filter(title=catalogue[0]).update(
+            pub_date=datetime(2020, 1, 1, tzinfo=timezone.utc)
+        )
+        Comment.objects.update(
+            pub_date=datetime(2020, 1, 1, tzinfo=timezone.utc)
+        )
+        response = admin_client.get(
+            '/api/v1/export/reviews.ndjson', {'since': '2021-01-01T00:00'}
+        )
+        assert len(self.read(response).splitlines()) == 6
+        response = admin_client.get(
+            '/api/v1/export/titles.ndjson', {'since': '2021-01-01T00:00'}
+        )
+        assert len(self.read(response).splitlines()) == 6
+        response = admin_client.get(
+            '/api/v1/export/comments.csv', {'since': '2021-01-01T00:00'}
+        )
+        assert self.read(response).splitlines() == [
+            'id,title,review,author,text,pub_date'
+        ]
+        response = admin_client.get(
+            '/api/v1/export/comments.csv', {'since': 'вчера'}
+        )
+        assert response.status_code == 400
+
+    def test_only_admin(self, user_client, client):
+        assert user_client.get(
+            '/api/v1/export/titles.csv'
+        ).status_code == 403
+        assert client.get('/api/v1/export/titles.csv').status_code == 401
+
+    def test_command(self, catalogue, tmp_path):
+        output = tmp_path / 'comments.ndjson'
+        call_command(
+            'export_data', 'comments', output=str(output), chunk_size=2
+        )
+        rows = [
+            json.loads(line)
+            for line in output.read_text(encoding='utf-8').splitlines()
+        ]
+        assert len(rows) == 7
+        assert rows[0]['title'] == catalogue[0].id
@@ -0,0 +1,85 @@
+import io
+
+import pytest
+from django.core.management import call_command
+
+
+@pytest.mark.django_db
+class TestFastRead:
+
+    @pytest.fixture
+    def catalog(self, title, review, another_user):
+        from reviews.models import Comment, Review, Title
+
+        Title.objects.create(name='Без категории', year=2001)
+        Review.objects.create(
+            title=title, author=another_user, text='Второй', score=3
+        )
+        Comment.objects.create(review=review, author=another_user, text='Да')
+        Comment.objects.create(review=review, author=review.author, text='Нет')
+        return title
+
+    @staticmethod
+    def responses(client, settings, url):
+        from django.core.cache import cache
+
+        contents = []
+        for fast in (True, False):
+            settings.API_FAST_READ = fast
+            cache.clear()
+            response = client.get(url)
+            assert response.status_code == 200
+            contents.append(response.content)
+        return contents
+
+    @pytest.mark.parametrize('url', (
+        '/api/v1/titles/',
+        '/api/v1/titles/?cursor=',
+        '/api/v1/titles/?ordering=-rating',
+        '/api/v1/titles/?genre=drama',
+        '/api/v1/titles/top/',
+        '/api/v1/titles/top/?cursor=',
+        '/api/v1/titles/{title}/reviews/',
+        '/api/v1/titles/{title}/reviews/?cursor=',
+        '/api/v1/titles/{title}/reviews/{review}/comments/',
+    ))
+    def test_same_output(self, client, settings, catalog, review, url):
+        url = url.format(title=catalog.id, review=review.id)
+        fast, regular = self.responses(client, settings, url)
+        assert fast == regular, (
+            'Проверьте, что быстрый путь отдаёт тот же JSON, что и '
+            'сериализатор'
+        )
+
+    def test_cursor_pages(self, client, settings, monkeypatch, catalog):
+        from api.paginator import TitlesPagination
+
+        settings.API_FAST_READ = True
+        monkeypatch.setattr(TitlesPagination, 'page_size', 1)
+        first = client.get('/api/v1/titles/?cursor=').json()
+        second = client.get(first['next']).json()
+        assert first['results'][0]['id'] < second['results'][0]['id']
+
+    def test_plans(self):
+        from api.fastread import compile_plan
+        from api.serializers import (CommentSerializer, ReviewSerializer,
+                                     TitlesSerializer, TitleStatsSerializer,
+                                     TitlesViewSerializer)
+
+        for serializer_class in (TitlesViewSerializer, ReviewSerializer,
+                                 CommentSerializer):
+            assert compile_plan(serializer_class) is not None
+        assert compile_plan(TitleStatsSerializer) is None, (
+            'Проверьте, что для полей вне модели план не строится'
+        )
+        assert compile_plan(TitlesSerializer) is None
+
+    def test_genre_query(self, client, django_assert_num_queries, catalog):
+        # COUNT(*), страница, жанры страницы.
+        with django_assert_num_queries(3):
+            client.get('/api/v1/titles/')
+
+    def test_benchmark_command(self):
+        out = io.StringIO()
+        call_command('benchmark_serializers', rows=20, repeat=1, stdout=out)
+        assert out.getvalue().count('fastread') == 3
@@ -0,0 +1,56 @@
+import pytest
+from django.core.management import CommandError, call_command
+
+FILES = {
+    'users.csv': (
+        'id,username,email,role,bio,first_name,last_name\n'
+        '100,bingobongo,bingobongo@yamdb.fake,user,,,\n'
+        '101,capt_obvious,capt_obvious@yamdb.fake,admin,,,\n'
+    ),
+    'category.csv': 'id,name,slug\n1,Фильм,movie\n',
+    'genre.csv': 'id,name,slug\n1,Драма,drama\n',
+    'titles.csv': 'id,name,year,category\n1,Побег из Шоушенка,1994,1\n',
+    'genre_title.csv': 'id,title_id,genre_id\n1,1,1\n',
+    'review.csv': (
+        'id,title_id,text,author,score,pub_date\n'
+        '1,1,Ну такое,100,10,2019-09-24T21:08:21.567Z\n'
+        '2,1,Ну такое,101,{score},2019-09-24T21:08:21.567Z\n'
+    ),
+    'comments.csv': (
+        'id,review_id,text,author,pub_date\n'
+        '1,1,Критик фигов,101,2019-09-24T21:08:21.567Z\n'
+    ),
+}
+
+
+@pytest.mark.django_db
+class TestImportCsv:
+
+    def write_files(self, path, score):
+        for name, content in FILES.items():
+            (path / name).write_text(
+                content.format(score=score), encoding='utf-8'
+            )
+
+    def test_import_and_resume(self, tmp_path):
+        from reviews.models import Comment, Review, Title
+
+        self.write_files(tmp_path, score='плохо')
+        with pytest.raises(CommandError):
+            call_command('import_csv', path=str(tmp_path), batch_size=1)
+        assert Review.objects.count() == 1, (
+            'Проверьте, что пачки до сбойной строки остаются в базе'
+        )
+
+        self.write_files(tmp_path, score='5')
+        call_command('import_csv', path=str(tmp_path), resume=True)
+        assert Review.objects.count() == 2
+        assert Comment.objects.count() == 1
+        title = Title.objects.get(pk=1)
+        assert (title.rating_count, title.rating) == (2, 7), (
+            'Проверьте, что после загрузки пересчитывается рейтинг'
+        )
+        assert Review.objects.get(pk=1).pub_date.year == 2019, (
+            'Проверьте, что дата отзыва берётся из файла'
+        )
+        assert not (tmp_path / '.import_progress.json').exists()
@@ -0,0 +1,123 @@
+from datetime import timedelta
+
+import pytest
+
+
+@pytest.mark.django_db
+class TestLeaderboards:
+
+    @pytest.fixture
+    def titles(self, category, user, another_user):
+        from reviews.models import Category, Review, Title
+
+        other = Category.objects.create(name='Книги', slug='book')
+        good = Title.objects.create(name='Хорошее', year=2000,
+                                    category=category)
+        bad = Title.objects.create(name='Плохое', year=2000,
+                                   category=other)
+        unrated = Title.objects.create(name='Без оценок', year=2000,
+                                       category=category)
+        Review.objects.create(title=good, author=user, text='т', score=9)
+        Review.objects.create(title=bad, author=user, text='т', score=3)
+        return good, bad, unrated
+
+    def names(self, response):
+        assert response.status_code == 200
+        return [title['name'] for title in response.json()['results']]
+
+    def test_top(self, client, titles):
+        assert self.names(client.get('/api/v1/titles/top/')) == [
+            'Хорошее', 'Плохое'
+        ], 'Проверьте, что в лучших только оценённые, по убыванию рейтинга'
+        assert self.names(
+            client.get('/api/v1/titles/top/', {'category': 'book'})
+        ) == ['Плохое']
+
+    def test_top_cursor_follows_rating(self, client, titles, monkeypatch):
+        from api.paginator import TitlesPagination
+
+        monkeypatch.setattr(TitlesPagination, 'page_size', 1)
+        response = client.get('/api/v1/titles/top/', {'cursor': ''})
+        data = response.json()
+        assert [title['name'] for title in data['results']] == ['Хорошее']
+        assert self.names(client.get(data['next'])) == ['Плохое']
+
+    def test_ordering_puts_unrated_last(self, client, titles):
+        for ordering in ('rating', '-rating'):
+            names = self.names(
+                client.get('/api/v1/titles/', {'ordering': ordering})
+            )
+            assert names[-1] == 'Без оценок', (
+                'Проверьте, что произведения без рейтинга идут в конце'
+            )
+        assert client.get(
+            '/api/v1/titles/', {'ordering': 'description'}
+        ).status_code == 400
+
+    def test_trending_prefers_recent_reviews(self, client, titles,
+                                             another_user):
+        from django.utils import timezone
+        from reviews.models import Review, Title
+
+        good, bad, unrated = titles
+        Review.objects.filter(title=good).update(
+            pub_date=timezone.now() - timedelta(days=60)
+        )
+        Title.objects.rebuild_trend()
+        assert self.names(client.get('/api/v1/titles/trending/')) == [
+            'Плохое', 'Хорошее'
+        ], 'Проверьте, что свежие отзывы весят больше старых'
+
+        Review.objects.create(
+            title=unrated, author=another_user, text='т', score=1
+        )
+        assert self.names(
+            client.get('/api/v1/titles/trending/', {'category': 'movie'})
+        ) == ['Без оценок', 'Хорошее'], (
+            'Проверьте, что новый отзыв сразу попадает в тренды'
+        )
+
+    def test_incremental_trend_matches_rebuild(self, titles, another_user):
+        from reviews.models import Review, Title
+
+        good, bad, unrated = titles
+        review = Review.objects.create(
+            title=good, author=another_user, text='т', score=4
+        )
+        review = Review.objects.get(pk=review.pk)
+        review.score = 10
+        review.save()
+        Review.objects.filter(title=bad).delete()
+        incremental = dict(Title.objects.values_list('name', 'trend'))
+        assert incremental['Плохое'] == 0
+
+        Title.objects.rebuild_trend()
+        rebuilt = dict(Title.objects.values_list('name', 'trend'))
+        assert incremental == pytest.approx(rebuilt), (
+            'Проверьте, что тренд при записи отзывов совпадает с пересчётом'
+        )
+
+    def test_rebuild_moves_trend_epoch(self, client, titles, settings):
+        from django.core.management import call_command
+        from django.utils import timezone
+        from reviews.models import Review, Title, TrendEpoch
+
+        settings.TRENDING_HALF_LIFE_DAYS = 2
+        good, bad, unrated = titles
+        TrendEpoch.objects.update(
+            started_at=timezone.now() - timedelta(days=3000)
+        )
+        Review.objects.filter(title=good).update(
+            pub_date=timezone.now() - timedelta(days=4)
+        )
+        call_command('rebuild_ratings')
+        assert TrendEpoch.objects.current() > (
+            timezone.now() - timedelta(minutes=1)
+        ), 'Проверьте, что rebuild_ratings переносит начало отсчёта'
+        trends = dict(Title.objects.values_list('name', 'trend'))
+        assert trends['Хорошее'] == pytest.approx(9 / 4, rel=1e-3), (
+            'Проверьте, что после переноса веса считаются от нового отсчёта'
+        )
+        assert self.names(client.get('/api/v1/titles/trending/')) == [
+            'Плохое', 'Хорошее'
+        ]
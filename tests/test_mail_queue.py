@@ -0,0 +1,102 @@
+import io
+
+import pytest
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+
+
+class FlakyBackend(EmailBackend):
+    """Почтовый бэкенд, который не принимает письма на bad@ и считает
+    открытия соединения."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.opened = 0
+        self.is_open = False
+
+    def open(self):
+        if not self.is_open:
+            self.opened += 1
+            self.is_open = True
+
+    def close(self):
+        self.is_open = False
+
+    def send_messages(self, messages):
+        if any('bad@' in to for message in messages for to in message.to):
+            raise ConnectionError('сервер отклонил письмо')
+        return super().send_messages(messages)
+
+
+@pytest.mark.django_db
+class TestMailQueue:
+
+    def test_signup_queues_email(self, client):
+        from django.core.management import call_command
+        from users.models import OutgoingEmail
+
+        response = client.post('/api/v1/auth/signup/', data={
+            'username': 'newbie', 'email': 'newbie@yamdb.fake',
+        })
+        assert response.status_code == 200
+        assert mail.outbox == [], (
+            'Проверьте, что регистрация не отправляет письмо в запросе'
+        )
+        assert OutgoingEmail.objects.filter(
+            recipient='newbie@yamdb.fake', sent_at__isnull=True
+        ).exists()
+
+        call_command('send_mail_queue', once=True, stdout=io.StringIO())
+        assert len(mail.outbox) == 1
+        assert 'Код подтверждения' in mail.outbox[0].body
+        assert not OutgoingEmail.objects.filter(sent_at__isnull=True).exists()
+
+    def test_batch_reuses_connection_and_retries(self, settings):
+        from django.utils import timezone
+        from users.mail import queue_mail, send_queued
+        from users.models import OutgoingEmail
+
+        settings.MAIL_QUEUE_RETRY_DELAY = 60
+        for recipient in ('one@yamdb.fake', 'bad@yamdb.fake',
+                          'two@yamdb.fake'):
+            queue_mail('Тема', 'Текст', recipient)
+        connection = FlakyBackend()
+
+        assert send_queued(10, connection) == (2, 1)
+        assert connection.opened == 2, (
+            'Проверьте, что пачка идёт через одно соединение, которое '
+            'переоткрывается только после ошибки'
+        )
+        failed = OutgoingEmail.objects.get(recipient='bad@yamdb.fake')
+        assert failed.sent_at is None
+        assert failed.attempts == 1
+        assert 'ConnectionError' in failed.last_error
+        assert failed.send_after > timezone.now(), (
+            'Проверьте, что повтор отложен'
+        )
+        assert send_queued(10, connection) == (0, 0)
+
+    def test_gives_up_after_max_attempts(self, settings):
+        from users.mail import queue_mail, send_queued
+
+        settings.MAIL_QUEUE_RETRY_DELAY = 0
+        settings.MAIL_QUEUE_MAX_ATTEMPTS = 2
+        queue_mail('Тема', 'Текст', 'bad@yamdb.fake')
+        connection = FlakyBackend()
+        assert send_queued(10, connection) == (0, 1)
+        assert send_queued(10, connection) == (0, 1)
+        assert send_queued(10, connection) == (0, 0)
+
+    def test_filebased_backend(self, settings, tmp_path):
+        from users.mail import queue_mail, send_queued
+
+        settings.EMAIL_BACKEND = (
+            'django.core.mail.backends.filebased.EmailBackend'
+        )
+        settings.EMAIL_FILE_PATH = str(tmp_path)
+        queue_mail('Тема', 'Текст', 'one@yamdb.fake')
+        queue_mail('Тема', 'Текст', 'two@yamdb.fake')
+        assert send_queued(10) == (2, 0)
+        files = list(tmp_path.iterdir())
+        assert len(files) == 1, 'Проверьте, что пачка пишется одним файлом'
+        assert 'two@yamdb.fake' in files[0].read_text()
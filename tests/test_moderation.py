@@ -0,0 +1,162 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+@pytest.mark.django_db
+class TestModeration:
+
+    URL = '/api/v1/moderation/'
+
+    @pytest.fixture
+    def moderator_client(self, django_user_model):
+        from rest_framework.test import APIClient
+
+        moderator = django_user_model.objects.create_user(
+            username='TestModerator', email='moderator@yamdb.fake',
+            role='moderator'
+        )
+        client = APIClient()
+        client.force_authenticate(user=moderator)
+        return client
+
+    @pytest.fixture
+    def spam(self, title, category, another_user):
+        from reviews.models import Comment, Review, Title
+
+        reviews = [
+            Review.objects.create(
+                title=Title.objects.create(
+                    name=f'Спам {number}', year=2000, category=category
+                ),
+                author=another_user, text='Спам', score=1,
+            )
+            for number in range(5)
+        ]
+        reviews.append(Review.objects.create(
+            title=title, author=another_user, text='Спам', score=1
+        ))
+        for review in reviews:
+            Comment.objects.create(
+                review=review, author=another_user, text='Спам'
+            )
+        return reviews
+
+    def test_delete_by_author(self, moderator_client, review, spam):
+        from reviews.models import Comment, Review, Title
+
+        with CaptureQueriesContext(connection) as captured:
+            response = moderator_client.post(self.URL, data={
+                'action': 'delete', 'target': 'reviews',
+                'author': 'TestUserAnother',
+            }, format='json')
+        assert response.status_code == 200, response.json()
+        assert response.json()['reviews'] == 6
+        assert response.json()['comments'] == 6
+        assert list(Review.objects.all()) == [review]
+        assert not Comment.objects.exists()
+        assert len(captured) <= 15, (
+            'Проверьте, что удаление выполняется запросами по набору, '
+            'а не по одной записи'
+        )
+        title = Title.objects.get(pk=review.title_id)
+        assert (title.rating, title.rating_count) == (7, 1), (
+            'Проверьте, что рейтинг пересчитан без удалённых отзывов'
+        )
+        assert Title.objects.get(pk=spam[0].title_id).rating is None
+
+    def test_hide_and_unhide(self, moderator_client, review, title, spam):
+        from reviews.models import Title
+
+        response = moderator_client.post(self.URL, data={
+            'action': 'hide', 'target': 'reviews', 'title': title.id,
+            'author': 'TestUserAnother',
+        }, format='json')
+        assert response.json() == {
+            'action': 'hide', 'target': 'reviews',
+            'reviews': 1, 'comments': 0,
+        }
+        assert Title.objects.get(pk=title.id).rating == 7
+        listed = moderator_client.get(f'/api/v1/titles/{title.id}/reviews/')
+        assert [item['id'] for item in listed.json()['results']] == [
+            review.id
+        ]
+        hidden = spam[-1]
+        assert moderator_client.get(
+            f'/api/v1/titles/{title.id}/reviews/{hidden.id}/comments/'
+        ).status_code == 404
+
+        response = moderator_client.post(self.URL, data={
+            'action': 'unhide', 'target': 'reviews', 'ids': [hidden.id],
+        }, format='json')
+        assert response.json()['reviews'] == 1
+        assert Title.objects.get(pk=title.id).rating == 4
+
+    def test_author_deletes_only_own(self, user_client, review, spam):
+        from reviews.models import Comment, Review
+
+        response = user_client.post(self.URL, data={
+            'action': 'delete', 'target': 'comments',
+            'ids': list(Comment.objects.values_list('id', flat=True)),
+        }, format='json')
+        assert response.status_code == 200
+        assert response.json()['comments'] == 0, (
+            'Проверьте, что пользователь не может удалить чужие записи'
+        )
+        assert Comment.objects.count() == 6
+
+        response = user_client.post(self.URL, data={
+            'action': 'delete', 'target': 'reviews', 'title': review.title_id,
+        }, format='json')
+        assert response.json()['reviews'] == 1
+        assert Review.objects.count() == 6
+
+    def test_user_cannot_hide(self, user_client, review):
+        response = user_client.post(self.URL, data={
+            'action': 'hide', 'target': 'reviews', 'ids': [review.id],
+        }, format='json')
+        assert response.status_code == 403
+
+    @pytest.mark.parametrize('data', [
+        {'action': 'delete', 'target': 'reviews'},
+        {'action': 'purge', 'target': 'reviews', 'ids': [1]},
+        {'action': 'delete', 'target': 'reviews',
+         'since': '2022-02-01T00:00:00Z', 'until': '2022-01-01T00:00:00Z'},
+    ])
+    def test_invalid_request(self, moderator_client, data):
+        response = moderator_client.post(self.URL, data=data, format='json')
+        assert response.status_code == 400
+
+    def test_anonymous(self, client):
+        response = client.post(self.URL, data={
+            'action': 'delete', 'target': 'reviews', 'ids': [1],
+        })
+        assert response.status_code == 401
+
+    def test_delete_rows_skips_collector(self, review, spam,
+                                         django_assert_num_queries):
+        from django.db.models.signals import post_delete, pre_delete
+        from reviews.models import Comment, Review, delete_rows
+
+        fired = []
+
+        def receiver(sender, **kwargs):
+            fired.append(sender)
+
+        pre_delete.connect(receiver, sender=Comment)
+        post_delete.connect(receiver, sender=Comment)
+        try:
+            with django_assert_num_queries(1):
+                deleted = delete_rows(Comment.objects.filter(
+                    review__in=[item.id for item in spam]
+                ))
+        finally:
+            pre_delete.disconnect(receiver, sender=Comment)
+            post_delete.disconnect(receiver, sender=Comment)
+        assert deleted == 6
+        assert not Comment.objects.exists()
+        assert not fired, (
+            'Проверьте, что delete_rows не запускает сигналы удаления: '
+            'от этого зависит код, который сам пересчитывает счётчики'
+        )
+        assert Review.objects.get(pk=spam[0].pk).comment_count == 1
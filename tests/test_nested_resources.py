@@ -0,0 +1,38 @@
+import pytest
+
+
+@pytest.mark.django_db
+class TestNestedResources:
+
+    @pytest.fixture
+    def other_title(self, category):
+        from reviews.models import Title
+        return Title.objects.create(name='Другое', year=2000, category=category)
+
+    def test_reviews_of_missing_title(self, client, title):
+        response = client.get(f'/api/v1/titles/{title.id + 100}/reviews/')
+        assert response.status_code == 404, (
+            'Проверьте, что для несуществующего произведения возвращается 404'
+        )
+        response = client.get(f'/api/v1/titles/{title.id}/reviews/')
+        assert response.status_code == 200
+        assert response.json()['results'] == []
+
+    def test_comments_of_review_from_other_title(self, client, user_client,
+                                                 review, other_title):
+        url = f'/api/v1/titles/{other_title.id}/reviews/{review.id}/comments/'
+        assert client.get(url).status_code == 404, (
+            'Проверьте, что отзыв другого произведения возвращает 404'
+        )
+        response = user_client.post(url, {'text': 'Комментарий'})
+        assert response.status_code == 404
+
+    def test_comment_create_resolves_review_once(self, user_client, review,
+                                                 django_assert_num_queries):
+        url = f'/api/v1/titles/{review.title_id}/reviews/{review.id}/comments/'
+        # Поиск отзыва, вставка комментария и обновление счётчика отзыва.
+        with django_assert_num_queries(3):
+            response = user_client.post(url, {'text': 'Комментарий'})
+        assert response.status_code == 201
+        response = user_client.get(url)
+        assert response.json()['results'][0]['text'] == 'Комментарий'
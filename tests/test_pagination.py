@@ -0,0 +1,146 @@
+import base64
+
+import pytest
+
+
+@pytest.mark.django_db
+class TestCursorPagination:
+
+    def url(self, review):
+        return (
+            f'/api/v1/titles/{review.title_id}/reviews/{review.id}/comments/'
+        )
+
+    def create_comments(self, review, user, count):
+        from django.utils import timezone
+        from reviews.models import Comment
+
+        Comment.objects.bulk_create(
+            Comment(review=review, author=user, text=f'Комментарий {number}')
+            for number in range(count)
+        )
+        # Одинаковая дата проверяет порядок по id внутри одной даты.
+        Comment.objects.update(pub_date=timezone.now())
+        return list(
+            Comment.objects.order_by('-pub_date', '-id')
+            .values_list('id', flat=True)
+        )
+
+    def test_cursor_walks_forward_and_back(self, client, review, user):
+        expected = self.create_comments(review, user, 25)
+
+        response = client.get(self.url(review), {'cursor': ''})
+        data = response.json()
+        assert 'count' not in data, (
+            'Проверьте, что в режиме курсора не считается общее количество'
+        )
+        assert data['previous'] is None
+        seen = [item['id'] for item in data['results']]
+        pages = [data]
+        while data['next']:
+            data = client.get(data['next']).json()
+            pages.append(data)
+            seen += [item['id'] for item in data['results']]
+        assert seen == expected, (
+            'Проверьте, что курсор проходит все записи по порядку без повторов'
+        )
+
+        previous = client.get(pages[-1]['previous']).json()
+        assert previous['results'] == pages[-2]['results'], (
+            'Проверьте, что ссылка previous возвращает предыдущую страницу'
+        )
+
+    def test_page_number_still_supported(self, client, review, user):
+        expected = self.create_comments(review, user, 12)
+
+        data = client.get(self.url(review), {'page': 2}).json()
+        assert data['count'] == 12
+        assert [item['id'] for item in data['results']] == expected[10:]
+
+    def test_invalid_cursor(self, client, review):
+        response = client.get(self.url(review), {'cursor': 'broken'})
+        assert response.status_code == 404
+        for payload in (
+            b'{"p": ["date", 1], "r": 0}',
+            b'{"p": [[1], {}], "r": 0}',
+            b'{"p": {"a": 1, "b": 2}, "r": 0}',
+            b'{"p": [null, null], "r": 0}',
+            b'[1, 2]',
+        ):
+            cursor = base64.urlsafe_b64encode(payload).decode()
+            response = client.get(self.url(review), {'cursor': cursor})
+            assert response.status_code == 404, (
+                f'Проверьте, что курсор {payload} отклоняется с кодом 404'
+            )
+
+
+@pytest.mark.django_db
+class TestPageSize:
+
+    @pytest.fixture
+    def comments_url(self, review, user):
+        from reviews.models import Comment
+
+        Comment.objects.bulk_create(
+            Comment(review=review, author=user, text=f'Комментарий {number}')
+            for number in range(25)
+        )
+        return (
+            f'/api/v1/titles/{review.title_id}/reviews/{review.id}/comments/'
+        )
+
+    @pytest.mark.parametrize('params, expected', (
+        ({}, 10),
+        ({'page_size': 20}, 20),
+        ({'limit': 15}, 15),
+        ({'page_size': 'много'}, 10),
+        ({'page_size': 0}, 10),
+        ({'page_size': 1000}, 22),
+    ))
+    def test_page_size(self, client, monkeypatch, comments_url, params,
+                       expected):
+        from api.paginator import CommentPagination
+
+        monkeypatch.setattr(CommentPagination, 'max_page_size', 22)
+        data = client.get(comments_url, params).json()
+        assert len(data['results']) == expected, (
+            'Проверьте, что размер страницы задаётся параметром и не '
+            'превышает max_page_size'
+        )
+
+    def test_cursor_keeps_page_size(self, client, comments_url):
+        data = client.get(comments_url, {'cursor': '', 'limit': 20}).json()
+        assert 'limit=20' in data['next']
+        assert len(client.get(data['next']).json()['results']) == 5
+
+    def test_default_pagination(self, client, genres):
+        data = client.get('/api/v1/genres/', {'page_size': 1}).json()
+        assert data['count'] == 2
+        assert len(data['results']) == 1
+
+    def test_estimated_count(self, client, monkeypatch, category):
+        from api import paginator
+        from reviews.models import Title
+
+        assert paginator.estimated_count(Title.objects.all()) is None, (
+            'Проверьте, что без статистики PostgreSQL count считается точно'
+        )
+        Title.objects.bulk_create(
+            Title(name=f'Произведение {number}', year=2000, category=category)
+            for number in range(7)
+        )
+        monkeypatch.setattr(paginator, 'estimated_count', lambda qs: 1000)
+
+        first = client.get('/api/v1/titles/').json()
+        assert first['count'] == 1000
+        second = client.get(first['next']).json()
+        assert len(second['results']) == 2
+        assert second['next'] is None, (
+            'Проверьте, что следующая страница определяется по данным, а '
+            'не по оценке count'
+        )
+        assert client.get('/api/v1/titles/', {'page': 9}).json()[
+            'results'
+        ] == []
+        response = client.get('/api/v1/titles/', {'page': 0})
+        assert response.status_code == 404
@@ -0,0 +1,63 @@
+import pytest
+
+
+@pytest.mark.django_db
+class TestProfiling:
+
+    @pytest.fixture
+    def admin_client(self, django_user_model):
+        from rest_framework.test import APIClient
+
+        admin = django_user_model.objects.create_user(
+            username='TestAdmin', email='admin@yamdb.fake', role='admin'
+        )
+        client = APIClient()
+        client.force_authenticate(user=admin)
+        return client
+
+    def test_server_timing_header(self, client, title):
+        response = client.get(f'/api/v1/titles/{title.id}/')
+        header = response['Server-Timing']
+        for metric in ('total;dur=', 'sql;dur=', 'serializer;dur='):
+            assert metric in header, (
+                f'Проверьте, что Server-Timing содержит {metric}'
+            )
+
+    def test_route_stats_admin_only(self, client, user_client, admin_client,
+                                    title):
+        admin_client.delete('/api/v1/profiling/')
+        client.get('/api/v1/titles/')
+        client.get('/api/v1/titles/')
+
+        assert client.get('/api/v1/profiling/').status_code == 401
+        assert user_client.get('/api/v1/profiling/').status_code == 403
+        routes = admin_client.get('/api/v1/profiling/').json()['routes']
+        stats = routes['api:title-list']
+        assert stats['count'] == 2
+        assert sum(stats['histogram'].values()) == 2
+        assert stats['avg_queries'] > 0
+        assert stats['avg_serializer_ms'] > 0, (
+            'Проверьте, что время сериализации попадает в сводку'
+        )
+
+    def test_duplicate_queries_logged(self, client, title, caplog,
+                                      settings):
+        from api.profiling import Profile
+        from reviews.models import Title
+
+        settings.PROFILING_DUPLICATE_THRESHOLD = 2
+        profile = Profile()
+        with profile.start():
+            for _ in range(2):
+                list(Title.objects.filter(pk=title.pk))
+        assert list(profile.duplicates().values()) == [2], (
+            'Проверьте, что повторы одного SQL считаются как N+1'
+        )
+
+        settings.PROFILING_SLOW_REQUEST_MS = 0
+        with caplog.at_level('WARNING', logger='api.profiling'):
+            client.get('/api/v1/titles/')
+        assert any(
+            '"view": "api:title-list"' in record.message
+            for record in caplog.records
+        ), 'Проверьте, что медленный запрос попадает в лог'
@@ -0,0 +1,104 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+LARGE_TABLES = (
+    'reviews_title', 'reviews_genretitle', 'reviews_review',
+    'reviews_comment', 'users_user',
+)
+
+
+def explain(sql):
+    """План запроса в виде строк; на PostgreSQL seq scan выключен, поэтому
+    Seq Scan в плане означает, что подходящего индекса нет."""
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute('SET LOCAL enable_seqscan = off')
+            cursor.execute(f'EXPLAIN {sql}')
+            return [row[0] for row in cursor.fetchall()]
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def full_scans(plan):
+    found = []
+    for line in plan:
+        for table in LARGE_TABLES:
+            if connection.vendor == 'postgresql':
+                if f'Seq Scan on {table}' in line:
+                    found.append(line)
+            elif (line.startswith(f'SCAN {table}')
+                  or line.startswith(f'SCAN TABLE {table}')) and (
+                    'INDEX' not in line):
+                found.append(line)
+    return found
+
+
+@pytest.mark.django_db
+class TestQueryPlans:
+
+    @pytest.fixture
+    def dataset(self, django_user_model, category, genres):
+        from reviews.models import Comment, GenreTitle, Review, Title
+
+        django_user_model.objects.bulk_create(
+            django_user_model(username=f'user{number}',
+                              email=f'user{number}@yamdb.fake')
+            for number in range(20)
+        )
+        users = list(django_user_model.objects.all())
+        Title.objects.bulk_create(
+            Title(name=f'Произведение {number}', year=1900 + number % 100,
+                  category=category if number % 2 else None)
+            for number in range(500)
+        )
+        titles = list(Title.objects.order_by('id'))
+        GenreTitle.objects.bulk_create(
+            GenreTitle(title=title, genre=genres[number % 2])
+            for number, title in enumerate(titles)
+        )
+        Review.objects.bulk_create(
+            Review(title=title, author=user, text='Отзыв', score=5)
+            for title in titles[:100] for user in users
+        )
+        review = Review.objects.filter(title=titles[0]).first()
+        Comment.objects.bulk_create(
+            Comment(review=review, author=user, text='Комментарий')
+            for user in users for _ in range(10)
+        )
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE')
+        return titles[0], review
+
+    def test_core_endpoints_use_indexes(self, client, user_client, dataset):
+        title, review = dataset
+        reviews_url = f'/api/v1/titles/{title.id}/reviews/'
+        comments_url = f'{reviews_url}{review.id}/comments/'
+        requests = (
+            ('/api/v1/titles/', {'year': 1950}),
+            ('/api/v1/titles/', {'category': 'movie'}),
+            ('/api/v1/titles/', {'genre': 'drama'}),
+            (f'/api/v1/titles/{title.id}/', {}),
+            (reviews_url, {}),
+            (reviews_url, {'cursor': ''}),
+            (f'{reviews_url}{review.id}/', {}),
+            (comments_url, {}),
+            (comments_url, {'cursor': ''}),
+        )
+        with CaptureQueriesContext(connection) as context:
+            for url, params in requests:
+                assert client.get(url, params).status_code == 200
+            user_client.post(reviews_url, {'text': 'Ещё', 'score': 3})
+
+        scans = {}
+        for query in context.captured_queries:
+            sql = query['sql']
+            if sql.startswith('SELECT') and ' WHERE ' in sql:
+                found = full_scans(explain(sql))
+                if found:
+                    scans[sql] = found
+        assert not scans, (
+            'Проверьте индексы: запросы читают большую таблицу целиком\n'
+            + '\n'.join(f'{sql}\n  {plan}' for sql, plan in scans.items())
+        )
@@ -0,0 +1,50 @@
+import pytest
+from django.core.management import call_command
+
+
+@pytest.mark.django_db
+class TestTitleRating:
+
+    def rating(self, title):
+        title.refresh_from_db()
+        return title.rating_sum, title.rating_count, title.rating
+
+    def test_rating_follows_reviews(self, title, user, another_user):
+        from reviews.models import Review
+
+        assert self.rating(title) == (0, 0, None), (
+            'Проверьте, что у произведения без отзывов нет рейтинга'
+        )
+        review = Review.objects.create(
+            title=title, author=user, text='текст', score=10
+        )
+        Review.objects.create(
+            title=title, author=another_user, text='текст', score=5
+        )
+        assert self.rating(title) == (15, 2, 7), (
+            'Проверьте, что рейтинг обновляется при создании отзыва'
+        )
+        review = Review.objects.get(pk=review.pk)
+        review.score = 1
+        review.save()
+        assert self.rating(title) == (6, 2, 3), (
+            'Проверьте, что рейтинг обновляется при изменении оценки'
+        )
+        another_user.delete()
+        assert self.rating(title) == (1, 1, 1), (
+            'Проверьте, что рейтинг обновляется при каскадном удалении отзыва'
+        )
+        review.delete()
+        assert self.rating(title) == (0, 0, None), (
+            'Проверьте, что рейтинг обновляется при удалении отзыва'
+        )
+
+    def test_rebuild_ratings(self, title, user):
+        from reviews.models import Review, Title
+
+        Review.objects.create(title=title, author=user, text='т', score=4)
+        Title.objects.update(rating_sum=100, rating_count=7, rating=1)
+        call_command('rebuild_ratings')
+        assert self.rating(title) == (4, 1, 4), (
+            'Проверьте, что команда rebuild_ratings пересчитывает рейтинг'
+        )
@@ -0,0 +1,97 @@
+import datetime as dt
+import io
+import json
+import uuid
+from collections import OrderedDict
+from decimal import Decimal
+
+import pytest
+import pytz
+from django.core.management import call_command
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+DATA = OrderedDict([
+    ('pub_date', dt.datetime(2021, 5, 1, 12, 30, 15, 123456, tzinfo=pytz.UTC)),
+    ('moscow', pytz.timezone('Europe/Moscow').localize(
+        dt.datetime(2021, 5, 1, 15, 30)
+    )),
+    ('day', dt.date(2021, 5, 1)),
+    ('rating', Decimal('7.5')),
+    ('id', uuid.UUID(int=1)),
+    ('text', 'Отзыв \u2028 строка \u2029 "кавычки"'),
+    ('lazy', gettext_lazy('Отзыв')),
+    ('scores', {'1': 0, '10': 2}),
+    ('results', [None, True, 1.5, 2 ** 70, (1, 2)]),
+    ('big', {1: 'ключ-число'}),
+])
+
+
+class TestFastJSON:
+
+    @pytest.fixture(params=(True, False), ids=('orjson', 'stdlib'))
+    def renderers(self, request, monkeypatch):
+        from api import renderers
+
+        if request.param and renderers.orjson is None:
+            pytest.skip('orjson не установлен')
+        if not request.param:
+            monkeypatch.setattr(renderers, 'orjson', None)
+        return renderers
+
+    @pytest.mark.parametrize('data', (
+        DATA,
+        {key: value for key, value in DATA.items() if key not in (
+            'results', 'big'
+        )},
+        [],
+        None,
+    ))
+    def test_same_output(self, renderers, data):
+        assert renderers.FastJSONRenderer().render(data) == (
+            JSONRenderer().render(data)
+        ), 'Проверьте, что вывод совпадает с JSONRenderer'
+
+    def test_floats(self, renderers):
+        data = {'values': [1.5, 0.1, 1e16, 1.5e-7, -2.5e300, 7.0]}
+        content = renderers.FastJSONRenderer().render(data)
+        assert json.loads(content) == json.loads(
+            JSONRenderer().render(data)
+        ), 'Проверьте, что float при разборе совпадают с JSONRenderer'
+        assert json.loads(content) == data
+
+    def test_indent(self, renderers):
+        media_type = 'application/json; indent=4'
+        assert renderers.FastJSONRenderer().render(DATA, media_type) == (
+            JSONRenderer().render(DATA, media_type)
+        )
+
+    def test_parser(self, renderers):
+        parser = renderers.FastJSONParser()
+        body = '{"text": "Отзыв", "score": 7, "ids": [1, 2]}'.encode()
+        assert parser.parse(io.BytesIO(body)) == (
+            JSONParser().parse(io.BytesIO(body))
+        )
+        for body in (b'{"score": ', b'{"score": NaN}'):
+            with pytest.raises(ParseError):
+                parser.parse(io.BytesIO(body))
+
+    @pytest.mark.django_db
+    def test_api(self, client, title, review):
+        response = client.post(
+            '/api/v1/auth/signup/', data=b'{"username": ',
+            content_type='application/json',
+        )
+        assert response.status_code == 400
+        response = client.get(f'/api/v1/titles/{title.id}/reviews/')
+        assert response.json()['results'][0]['pub_date'].endswith('Z')
+
+    @pytest.mark.django_db
+    def test_benchmark_command(self, renderers):
+        if renderers.orjson is None:
+            pytest.skip('Команда сравнивает с orjson')
+        out = io.StringIO()
+        call_command('benchmark_json', rows=20, repeat=1, stdout=out)
+        assert 'titles' in out.getvalue() and 'reviews' in out.getvalue()
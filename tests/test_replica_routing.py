@@ -0,0 +1,98 @@
+import pytest
+from django.core.management import call_command
+from django.db import connections
+
+
+@pytest.fixture
+def replica(tmp_path, monkeypatch, settings):
+    """Вторая база SQLite с той же схемой, но без данных default.
+
+    Репликации нет, поэтому по содержимому ответа видно, из какой базы
+    он прочитан.
+    """
+    config = dict(connections.databases['default'])
+    config.update(NAME=str(tmp_path / 'replica.sqlite3'), TEST={})
+    monkeypatch.setitem(connections.databases, 'replica', config)
+    settings.DATABASE_REPLICAS = ['replica']
+    call_command('migrate', database='replica', verbosity=0)
+    yield 'replica'
+    connections['replica'].close()
+    del connections._connections.replica
+
+
+@pytest.mark.django_db
+class TestReplicaRouting:
+
+    def test_router(self, settings):
+        from api import routing
+        from reviews.models import Title
+
+        router = routing.ReplicaRouter()
+        settings.DATABASE_REPLICAS = ['replica']
+        assert router.db_for_read(Title) is None, (
+            'Проверьте, что вне безопасного запроса чтение идёт с default'
+        )
+        token = routing._replica_allowed.set(True)
+        try:
+            assert router.db_for_read(Title) == 'replica'
+            assert router.db_for_write(Title) == 'default'
+        finally:
+            routing._replica_allowed.reset(token)
+
+    def test_safe_requests_read_replica(self, replica, client, title):
+        response = client.get('/api/v1/titles/')
+        assert response.status_code == 200
+        assert response.json()['count'] == 0, (
+            'Проверьте, что GET-запросы читают с реплики'
+        )
+
+    def test_read_your_writes_cookie(self, replica, user, title):
+        from rest_framework.test import APIClient
+
+        client = APIClient()
+        client.force_authenticate(user=user)
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        response = client.post(url, data={'text': 'Отзыв', 'score': 5})
+        assert response.status_code == 201, response.json()
+        assert response.cookies['yamdb_primary']['max-age'] == 5
+        assert client.get(url).json()['count'] == 1, (
+            'Проверьте, что после записи клиент читает с основной базы'
+        )
+
+        client.cookies.clear()
+        assert client.get(url).status_code == 404
+
+    def test_read_your_writes_token(self, replica, user, title):
+        from rest_framework.test import APIClient
+        from users.authentication import ClaimsAccessToken
+
+        token = f'Bearer {ClaimsAccessToken.for_user(user)}'
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        writer = APIClient(HTTP_AUTHORIZATION=token)
+        response = writer.post(url, data={'text': 'Отзыв', 'score': 5})
+        assert response.status_code == 201
+        # Другой клиент с тем же токеном, без cookie.
+        reader = APIClient(HTTP_AUTHORIZATION=token)
+        assert reader.get(url).json()['count'] == 1
+        assert APIClient().get(url).status_code == 404
+
+    def test_stale_replica_reads_not_cached(self, replica, client, title):
+        from api.cache import SETTLING_KEY, get_cache, invalidate
+        from reviews.models import Title
+
+        url = '/api/v1/titles/'
+        invalidate('titles')
+        response = client.get(url)
+        assert response.json()['count'] == 0
+        assert not response.has_header('ETag'), (
+            'Проверьте, что ответ с отстающей реплики не получает ETag'
+        )
+        Title.objects.using(replica).create(name='Догнали', year=2000)
+        assert client.get(url).json()['count'] == 1, (
+            'Проверьте, что ответ с отстающей реплики не кэшируется'
+        )
+
+        get_cache().delete(SETTLING_KEY.format(namespace='titles'))
+        assert client.get(url).has_header('ETag')
+        Title.objects.using(replica).create(name='Из кэша', year=2000)
+        assert client.get(url).json()['count'] == 1
@@ -0,0 +1,64 @@
+import pytest
+
+
+@pytest.mark.django_db
+class TestReviewsQueries:
+
+    @pytest.fixture
+    def authors(self, django_user_model):
+        django_user_model.objects.bulk_create(
+            django_user_model(username=f'author_{number}',
+                              email=f'author_{number}@yamdb.fake')
+            for number in range(100)
+        )
+        return list(django_user_model.objects.filter(
+            username__startswith='author_'
+        ))
+
+    @pytest.fixture
+    def page_size(self, request, monkeypatch):
+        from api.paginator import CommentPagination, ReviewPagination
+
+        for pagination in (ReviewPagination, CommentPagination):
+            monkeypatch.setattr(pagination, 'page_size', request.param)
+        return request.param
+
+    @pytest.mark.parametrize('page_size', (10, 100), indirect=True)
+    def test_reviews_list_queries(self, client, django_assert_num_queries,
+                                  title, authors, page_size):
+        from reviews.models import Review
+
+        Review.objects.bulk_create(
+            Review(title=title, author=author, text='Отзыв', score=5)
+            for author in authors[:page_size]
+        )
+        # Агрегат для ETag, COUNT(*), страница отзывов с авторами.
+        with django_assert_num_queries(3):
+            response = client.get(f'/api/v1/titles/{title.id}/reviews/')
+        results = response.json()['results']
+        assert len(results) == page_size
+        assert {item['author'] for item in results} == {
+            author.username for author in authors[:page_size]
+        }
+
+    @pytest.mark.parametrize('page_size', (10, 100), indirect=True)
+    def test_comments_list_queries(self, client, django_assert_num_queries,
+                                   review, authors, page_size):
+        from reviews.models import Comment
+
+        Comment.objects.bulk_create(
+            Comment(review=review, author=author, text='Комментарий')
+            for author in authors[:page_size]
+        )
+        url = f'/api/v1/titles/{review.title_id}/reviews/{review.id}/comments/'
+        with django_assert_num_queries(3):
+            response = client.get(url)
+        assert len(response.json()['results']) == page_size
+
+    def test_review_detail_queries(self, client, django_assert_num_queries,
+                                   review):
+        url = f'/api/v1/titles/{review.title_id}/reviews/{review.id}/'
+        # Агрегат для ETag и отзыв с автором.
+        with django_assert_num_queries(2):
+            response = client.get(url)
+        assert response.json()['author'] == 'TestUser'
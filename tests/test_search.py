@@ -0,0 +1,49 @@
+import pytest
+
+
+@pytest.mark.django_db
+class TestTitleSearch:
+
+    def test_search_ranks_name_matches_first(self, client, category):
+        from reviews.models import Title
+
+        in_description = Title.objects.create(
+            name='Крестный отец', year=1972, category=category,
+            description='История про побег'
+        )
+        in_name = Title.objects.create(
+            name='Побег из Шоушенка', year=1994, category=category
+        )
+        Title.objects.create(name='Форрест Гамп', year=1994)
+
+        response = client.get('/api/v1/titles/', {'search': 'Побег'})
+        ids = [item['id'] for item in response.json()['results']]
+        assert ids == [in_name.id, in_description.id], (
+            'Проверьте, что поиск находит слово в названии и описании и '
+            'ставит совпадения в названии выше'
+        )
+
+    def test_search_requires_all_words(self, client, title):
+        response = client.get(
+            '/api/v1/titles/', {'search': 'произведение описание'}
+        )
+        assert response.json()['count'] == 1
+        response = client.get(
+            '/api/v1/titles/', {'search': 'произведение отсутствует'}
+        )
+        assert response.json()['count'] == 0
+
+
+class TestInvertedIndex:
+
+    def test_add_replaces_document(self):
+        from reviews.search import InvertedIndex
+
+        index = InvertedIndex()
+        index.add(1, 'старое название')
+        index.add(1, 'новое название')
+        assert index.search('старое') == []
+        assert index.search('новое') == [1]
+        index.remove(1)
+        assert len(index) == 0
+        assert index.search('название') == []
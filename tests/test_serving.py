@@ -0,0 +1,115 @@
+import os
+import runpy
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from django.conf import settings
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        status = 200 if self.path == '/ok/' else 500
+        self.send_response(status)
+        self.send_header('Content-Length', '2')
+        self.end_headers()
+        self.wfile.write(b'{}')
+
+    def log_message(self, *args):
+        pass
+
+
+class TestServing:
+
+    def test_gunicorn_config(self, monkeypatch):
+        monkeypatch.setenv('GUNICORN_WORKERS', '3')
+        monkeypatch.setenv('GUNICORN_THREADS', '8')
+        config = runpy.run_path(
+            os.path.join(settings.BASE_DIR, 'gunicorn.conf.py')
+        )
+        assert config['workers'] == 3
+        assert config['threads'] == 8
+        assert config['worker_class'] == 'gthread', (
+            'Проверьте, что по умолчанию используются воркеры gthread'
+        )
+
+    @pytest.mark.parametrize('backend, many', (
+        (None, False),
+        ('django.core.cache.backends.locmem.LocMemCache', False),
+        ('django.core.cache.backends.memcached.MemcachedCache', True),
+    ))
+    def test_gunicorn_workers_need_shared_cache(self, monkeypatch, backend,
+                                                many):
+        monkeypatch.delenv('GUNICORN_WORKERS', raising=False)
+        if backend is None:
+            monkeypatch.delenv('CACHE_BACKEND', raising=False)
+        else:
+            monkeypatch.setenv('CACHE_BACKEND', backend)
+        monkeypatch.setattr('multiprocessing.cpu_count', lambda: 2)
+        config = runpy.run_path(
+            os.path.join(settings.BASE_DIR, 'gunicorn.conf.py')
+        )
+        assert config['workers'] == (5 if many else 1), (
+            'Проверьте, что без общего кэша запускается один воркер'
+        )
+
+    def test_persistent_connections(self):
+        database = settings.DATABASES['default']
+        assert database['CONN_MAX_AGE'] > 0
+        assert database['DISABLE_SERVER_SIDE_CURSORS'] is False
+
+    def test_run_load(self):
+        from api.management.commands.benchmark_serving import run_load
+
+        server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            latencies, errors, elapsed = run_load(
+                '127.0.0.1', server.server_address[1], ['/ok/', '/fail/'],
+                requests=20, concurrency=4,
+            )
+        finally:
+            server.shutdown()
+            server.server_close()
+        assert len(latencies) == 20
+        assert errors == 10
+        assert elapsed > 0
+
+    @pytest.mark.django_db(transaction=True)
+    def test_health_check_closes_broken_connection(self, monkeypatch,
+                                                   settings):
+        from api.db import check_connection, mark_connections
+        from django.db import connection
+
+        closed, pings = [], []
+        connection.ensure_connection()
+
+        def is_usable():
+            pings.append(1)
+            return False
+
+        monkeypatch.setattr(connection, 'is_usable', is_usable)
+        # Тестовая база SQLite в памяти не закрывается, поэтому
+        # проверяем сам вызов close.
+        monkeypatch.setattr(connection, 'close', lambda: closed.append(1))
+        settings.DB_CONN_HEALTH_CHECKS = False
+        mark_connections()
+        check_connection()
+        assert not pings
+
+        settings.DB_CONN_HEALTH_CHECKS = True
+        mark_connections()
+        assert not pings, (
+            'Проверьте, что в начале запроса соединения не пингуются'
+        )
+        check_connection()
+        check_connection()
+        assert closed, (
+            'Проверьте, что разорванное соединение закрывается до запроса'
+        )
+        assert len(pings) == 1, (
+            'Проверьте, что соединение проверяется один раз за запрос'
+        )
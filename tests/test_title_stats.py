@@ -0,0 +1,98 @@
+import io
+from datetime import datetime, timezone
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+
+@pytest.mark.django_db
+class TestTitleStats:
+
+    @staticmethod
+    def stats(title):
+        from reviews.models import TitleStats
+
+        return TitleStats.objects.get(title=title)
+
+    def test_follows_review_changes(self, title, review, another_user):
+        from reviews.models import Review
+
+        stats = self.stats(title)
+        assert (stats.review_count, stats.score_7) == (1, 1)
+        assert stats.last_review_at == review.pub_date
+
+        other = Review.objects.create(
+            title=title, author=another_user, text='Отзыв', score=3
+        )
+        stats = self.stats(title)
+        assert (stats.review_count, stats.score_3) == (2, 1)
+        assert stats.last_review_at == other.pub_date
+
+        review = Review.objects.get(pk=review.pk)
+        review.score = 3
+        review.save()
+        stats = self.stats(title)
+        assert (stats.score_7, stats.score_3) == (0, 2), (
+            'Проверьте, что изменение оценки переносит её в распределении'
+        )
+
+        other.delete()
+        stats = self.stats(title)
+        assert (stats.review_count, stats.score_3) == (1, 1)
+        assert stats.last_review_at == review.pub_date, (
+            'Проверьте, что после удаления последнего отзыва время '
+            'последнего отзыва пересчитывается'
+        )
+
+    def test_title_delete(self, title, review):
+        from reviews.models import TitleStats
+
+        title.delete()
+        assert not TitleStats.objects.exists()
+
+    def test_endpoint(self, client, title, review, category):
+        from reviews.models import Title
+
+        response = client.get(f'/api/v1/titles/{title.id}/stats/')
+        assert response.status_code == 200
+        data = response.json()
+        assert data['review_count'] == 1
+        assert data['scores']['7'] == 1
+        assert sum(data['scores'].values()) == 1
+        assert len(data['scores']) == 10
+
+        empty = Title.objects.create(name='Пусто', year=2000)
+        response = client.get(f'/api/v1/titles/{empty.id}/stats/')
+        assert response.json()['review_count'] == 0
+        assert response.json()['last_review_at'] is None
+        assert client.get('/api/v1/titles/0/stats/').status_code == 404
+
+    def test_moderation_rebuilds_stats(self, title, review):
+        from reviews.models import Review, TitleStats
+
+        Review.objects.filter(pk=review.pk).set_hidden(True)
+        assert not TitleStats.objects.filter(title=title).exists()
+        Review.objects.filter(pk=review.pk).set_hidden(False)
+        assert self.stats(title).score_7 == 1
+
+    def test_check_command(self, title, review):
+        from reviews.models import TitleStats
+
+        out = io.StringIO()
+        call_command('check_title_stats', stdout=out)
+        assert 'Расхождений нет' in out.getvalue()
+
+        TitleStats.objects.filter(title=title).update(
+            score_7=0, score_2=4,
+            last_review_at=datetime(2020, 1, 1, tzinfo=timezone.utc),
+        )
+        out = io.StringIO()
+        with pytest.raises(CommandError):
+            call_command('check_title_stats', stdout=out)
+        assert 'score_2 4 -> 0' in out.getvalue()
+
+        call_command('check_title_stats', fix=True, stdout=io.StringIO())
+        stats = self.stats(title)
+        assert (stats.score_7, stats.score_2) == (1, 0)
+        assert stats.last_review_at == review.pub_date
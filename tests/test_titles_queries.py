@@ -0,0 +1,36 @@
+import pytest
+
+
+@pytest.mark.django_db
+class TestTitlesQueries:
+
+    url = '/api/v1/titles/'
+
+    def create_titles(self, count, category, genres):
+        from reviews.models import Title
+
+        for number in range(count):
+            title = Title.objects.create(
+                name=f'Произведение {number}', year=2000, category=category
+            )
+            title.genre.set(genres)
+
+    @pytest.mark.parametrize('count', (1, 5))
+    def test_titles_list_queries(self, client, django_assert_num_queries,
+                                 category, genres, count):
+        self.create_titles(count, category, genres)
+        # COUNT(*), страница произведений с категориями, жанры страницы.
+        with django_assert_num_queries(3):
+            response = client.get(self.url)
+        assert response.status_code == 200
+        assert len(response.json()['results']) == count, (
+            'Проверьте, что список произведений возвращает все записи'
+        )
+
+    def test_title_detail_queries(self, client, django_assert_num_queries,
+                                  title):
+        with django_assert_num_queries(2):
+            response = client.get(f'{self.url}{title.id}/')
+        data = response.json()
+        assert data['category'] == {'name': 'Фильмы', 'slug': 'movie'}
+        assert len(data['genre']) == 2